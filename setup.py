@@ -13,7 +13,8 @@ setup(
     license="GPL",
     keywords="xbox one live api",
     url="http://packages.python.org/py-xbox-webapi",
-    packages=find_packages(),
+    packages=find_packages(exclude=['tests', 'tests.*']),
+    python_requires='>=3.6',
     long_description=read('README.md'),
     classifiers=[
         "Development Status :: 3 - Alpha",
@@ -26,4 +27,8 @@ setup(
         'demjson',
         'six'
     ],
+    extras_require={
+        'async': ['aiohttp'],
+        'brotli': ['brotli']
+    },
 )
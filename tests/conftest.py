@@ -0,0 +1,139 @@
+import json
+import time
+import asyncio
+import threading
+from collections import namedtuple
+from datetime import datetime, timedelta
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from socketserver import ThreadingMixIn
+from urllib.parse import urlparse, parse_qsl
+
+import pytest
+from dateutil.tz import tzutc
+
+Request = namedtuple('Request', ['method', 'path', 'headers', 'body'])
+
+
+def json_response(obj, status=200, headers=None):
+    """Response tuple for :class:`LocalServer` handlers"""
+    body = json.dumps(obj).encode('utf-8')
+    headers = dict(headers or {})
+    headers.setdefault('Content-Type', 'application/json')
+    return status, headers, body
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def _handle(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        request = Request(self.command, self.path, dict(self.headers), body)
+        with self.server.lock:
+            self.server.requests.append(request)
+        status, headers, content = self.server.handler(request)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+
+class LocalServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        HTTPServer.__init__(self, ('127.0.0.1', 0), _Handler)
+        self.lock = threading.Lock()
+        self.requests = []
+        self.handler = lambda request: json_response({})
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:%i' % self.server_port
+
+
+@pytest.fixture
+def server():
+    """Local HTTP server, set `server.handler` to a callable taking a `Request` and returning a response tuple"""
+    srv = LocalServer()
+    thread = threading.Thread(target=srv.serve_forever)
+    thread.daemon = True
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+@pytest.fixture
+def eds_server(server, monkeypatch):
+    """:class:`LocalServer` answering the EDS requests of all clients"""
+    from xbox_webapi.api.eds.eds import EDSProvider
+    monkeypatch.setattr(EDSProvider, 'EDS_URL', server.url)
+    return server
+
+
+def token(token_cls, hours):
+    """Token of `token_cls` with an unique value, valid for `hours`"""
+    now = datetime.now(tzutc())
+    return token_cls('%s-%s' % (token_cls.__name__, time.time()), now, now + timedelta(hours=hours))
+
+
+# Display claims of the test account
+XUI = {'xid': '2535', 'uhs': 'hash', 'gtg': 'Gamer', 'agg': 'Adult', 'prv': '191', 'usr': '234'}
+
+
+@pytest.fixture
+def chain(monkeypatch):
+    """Replace the authentication chain by slow fakes, returns the names of the executed steps"""
+    from xbox_webapi.authentication.auth import AuthenticationManager, AsyncAuthenticationManager
+    from xbox_webapi.authentication.token import AccessToken, RefreshToken, UserToken, XSTSToken
+    from xbox_webapi.common.userinfo import XboxLiveUserInfo
+    steps = []
+
+    def refreshed(refresh_token):
+        return AccessToken('access-%s' % time.time(), 3600), RefreshToken(refresh_token.token)
+
+    def refresh(self, refresh_token):
+        steps.append('refresh')
+        time.sleep(0.2)
+        return refreshed(refresh_token)
+
+    def authenticate(self, access_token):
+        steps.append('authenticate')
+        return token(UserToken, 16)
+
+    def authorize(self, user_token):
+        steps.append('authorize')
+        return token(XSTSToken, 16), XboxLiveUserInfo.from_dict(XUI)
+
+    monkeypatch.setattr(AuthenticationManager, '_windows_live_token_refresh', refresh)
+    monkeypatch.setattr(AuthenticationManager, '_xbox_live_authenticate', authenticate)
+    monkeypatch.setattr(AuthenticationManager, '_xbox_live_authorize', authorize)
+
+    async def async_refresh(self, refresh_token):
+        steps.append('refresh')
+        await asyncio.sleep(0.2)
+        return refreshed(refresh_token)
+
+    async def async_authenticate(self, access_token):
+        return authenticate(self, access_token)
+
+    async def async_authorize(self, user_token):
+        return authorize(self, user_token)
+
+    monkeypatch.setattr(AsyncAuthenticationManager, '_windows_live_token_refresh', async_refresh)
+    monkeypatch.setattr(AsyncAuthenticationManager, '_xbox_live_authenticate', async_authenticate)
+    monkeypatch.setattr(AsyncAuthenticationManager, '_xbox_live_authorize', async_authorize)
+    return steps
+
+
+def query(request):
+    """Query parameters of a recorded request, as dict of single values"""
+    return dict(parse_qsl(urlparse(request.path).query, keep_blank_values=True))
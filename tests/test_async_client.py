@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip('aiohttp')
+
+from xbox_webapi.api.provider import AsyncXboxLiveClient
+from xbox_webapi.api.gamerpics.gamerpics import GamerpicsProvider
+
+from tests.conftest import json_response
+
+
+def test_providers_return_awaitables(eds_server, monkeypatch):
+    monkeypatch.setattr(GamerpicsProvider, 'GAMERPICS_URL', eds_server.url)
+    eds_server.handler = lambda request: json_response({'Path': request.path.split('?')[0]})
+
+    async def main():
+        async with AsyncXboxLiveClient('userhash', 'token', '123') as client:
+            assert client.xuid == 123
+            pending = client.eds.get_channel_list_download('lineup')
+            assert asyncio.iscoroutine(pending) or asyncio.isfuture(pending)
+            return await asyncio.gather(pending, client.gamerpics.download_gamerpic())
+
+    channels, gamerpic = asyncio.run(main())
+    assert channels.status_code == 200
+    assert channels.json() == {'Path': '/media/en-US/tvchannels'}
+    assert gamerpic.json() == {'Path': '/users/me/gamerpic'}
+    for request in eds_server.requests:
+        assert request.headers['Authorization'] == 'XBL3.0 x=userhash;token'
+
+
+def test_concurrent_requests_share_the_session(eds_server):
+    async def main():
+        async with AsyncXboxLiveClient('userhash', 'token', 123) as client:
+            responses = await asyncio.gather(*[client.eds.get_channel_list_download(str(i)) for i in range(10)])
+            return responses
+
+    responses = asyncio.run(main())
+    assert [r.status_code for r in responses] == [200] * 10
+    assert len(eds_server.requests) == 10
@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+
+aiohttp = pytest.importorskip('aiohttp')
+
+from xbox_webapi.api.session import AsyncSession, XboxLiveSession
+
+
+def test_request_returns_requests_response(server):
+    async def main():
+        session = AsyncSession(headers={'X-Test': '1'})
+        try:
+            return await session.get(server.url + '/path', params={'a': 1, 'b': None})
+        finally:
+            await session.close()
+
+    response = asyncio.run(main())
+    assert response.status_code == 200
+    assert response.json() == {}
+    assert server.requests[0].path == '/path?a=1'
+    assert server.requests[0].headers['X-Test'] == '1'
+
+
+def test_form_data_encoded_like_requests(server):
+    data = {'SentProofIDE': None, 'GeneralVerify': False, 'type': 'SMS'}
+
+    async def main():
+        session = AsyncSession()
+        try:
+            await session.post(server.url + '/post', data=data)
+        finally:
+            await session.close()
+
+    asyncio.run(main())
+    XboxLiveSession().post(server.url + '/post', data=data)
+
+    async_request, sync_request = server.requests
+    assert async_request.body == sync_request.body == b'GeneralVerify=False&type=SMS'
+    assert async_request.headers['Content-Type'] == 'application/x-www-form-urlencoded'
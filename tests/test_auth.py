@@ -0,0 +1,293 @@
+import json
+import time
+import asyncio
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from dateutil.tz import tzutc
+
+from xbox_webapi.authentication.auth import AuthenticationManager, AsyncAuthenticationManager, AuthenticationStep
+from xbox_webapi.authentication.token import Tokenstore, AccessToken, RefreshToken, UserToken, XSTSToken
+from xbox_webapi.common.exceptions import AuthenticationException
+from xbox_webapi.common.userinfo import XboxLiveUserInfo
+
+from tests.conftest import XUI, token
+from tests.test_claims import jwt
+
+
+class FakeResponse(object):
+    def __init__(self, data):
+        self.data = data
+
+    def json(self):
+        return self.data
+
+
+def expiring(hours):
+    return (datetime.now(tzutc()) + timedelta(hours=hours)).timestamp()
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    """Fail on any authentication request"""
+    def fail(*args, **kwargs):
+        raise AssertionError('Unexpected request')
+    for name in ('_window_live_token_refresh_request', '_xbox_live_authenticate_request',
+                 '_xbox_live_authorize_request', '_window_live_authenticate_request'):
+        monkeypatch.setattr(AuthenticationManager, name, fail)
+
+
+def test_concurrent_authentications_share_one_chain(chain):
+    stores = [Tokenstore(refresh_token=RefreshToken('refresh')) for _ in range(4)]
+    threads = [threading.Thread(target=AuthenticationManager().authenticate, kwargs={'ts': ts}) for ts in stores]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert chain == ['refresh', 'authenticate', 'authorize']
+    # Every caller got the tokens in its own tokenstore
+    assert len(set(str(ts.xsts_token) for ts in stores)) == 1
+    assert all(ts.userinfo.userhash == 'hash' for ts in stores)
+
+    # Different accounts authenticate independently
+    AuthenticationManager().authenticate(ts=Tokenstore(refresh_token=RefreshToken('other')))
+    assert len(chain) == 6
+
+
+def test_shared_authentication_failure(chain, monkeypatch):
+    def authorize(self, user_token):
+        chain.append('authorize')
+        raise AuthenticationException('Denied')
+    monkeypatch.setattr(AuthenticationManager, '_xbox_live_authorize', authorize)
+
+    errors = []
+
+    def run():
+        try:
+            AuthenticationManager().authenticate(ts=Tokenstore(refresh_token=RefreshToken('refresh')))
+        except AuthenticationException as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(errors) == 3
+    assert chain.count('authorize') == 1
+
+
+def test_async_concurrent_authentications_share_one_chain(chain):
+    pytest.importorskip('aiohttp')
+    stores = [Tokenstore(refresh_token=RefreshToken('refresh')) for _ in range(4)]
+
+    async def authenticate(ts):
+        auth_mgr = AsyncAuthenticationManager()
+        try:
+            return await auth_mgr.authenticate(ts=ts)
+        finally:
+            await auth_mgr.close()
+
+    async def main():
+        return await asyncio.gather(*[authenticate(ts) for ts in stores])
+
+    assert asyncio.run(main()) == stores
+    assert chain == ['refresh', 'authenticate', 'authorize']
+    assert len(set(str(ts.xsts_token) for ts in stores)) == 1
+
+
+
+def test_caller_with_credentials_retries_failed_shared_authentication(chain, monkeypatch, tmpdir):
+    def refresh(self, refresh_token):
+        chain.append('refresh')
+        time.sleep(0.2)
+        raise AuthenticationException('No valid refresh token')
+
+    def login(self, email_address, password):
+        chain.append('login')
+        return AccessToken('access', 3600), RefreshToken('refresh')
+    monkeypatch.setattr(AuthenticationManager, '_windows_live_token_refresh', refresh)
+    monkeypatch.setattr(AuthenticationManager, '_windows_live_authenticate', login)
+
+    path = str(tmpdir.join('tokens.json'))
+    errors = []
+
+    def tokens_only():
+        try:
+            AuthenticationManager(path).authenticate()
+        except AuthenticationException as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=tokens_only)
+    thread.start()
+    time.sleep(0.05)
+    auth_mgr = AuthenticationManager(path)
+    ts = auth_mgr.authenticate('user@example.com', 'password')
+    thread.join()
+
+    assert len(errors) == 1
+    assert auth_mgr.authenticated and ts.userinfo.userhash == 'hash'
+    assert chain == ['refresh', 'refresh', 'login', 'authenticate', 'authorize']
+
+
+def test_refreshing_caller_does_not_take_unrefreshed_tokens(chain, monkeypatch):
+    authorize = AuthenticationManager._xbox_live_authorize
+
+    def slow_authorize(self, user_token):
+        time.sleep(0.2)
+        return authorize(self, user_token)
+    monkeypatch.setattr(AuthenticationManager, '_xbox_live_authorize', slow_authorize)
+
+    first, second = valid_tokenstore(), valid_tokenstore()
+    first.xsts_token = token(XSTSToken, -1)
+    thread = threading.Thread(target=AuthenticationManager().authenticate,
+                              kwargs={'ts': first, 'do_refresh': False})
+    thread.start()
+    time.sleep(0.05)
+    AuthenticationManager().authenticate(ts=second, do_refresh=True)
+    thread.join()
+
+    # The second caller refreshed on its own once the first authentication was done
+    assert chain == ['authorize', 'refresh']
+    assert str(second.access_token) != str(first.access_token)
+
+
+def test_async_caller_with_credentials_retries_failed_shared_authentication(chain, monkeypatch):
+    pytest.importorskip('aiohttp')
+
+    async def refresh(self, refresh_token):
+        chain.append('refresh')
+        await asyncio.sleep(0.2)
+        raise AuthenticationException('No valid refresh token')
+
+    async def login(self, email_address, password):
+        chain.append('login')
+        return AccessToken('access', 3600), RefreshToken('refresh')
+    monkeypatch.setattr(AsyncAuthenticationManager, '_windows_live_token_refresh', refresh)
+    monkeypatch.setattr(AsyncAuthenticationManager, '_windows_live_authenticate', login)
+
+    async def authenticate(*args):
+        auth_mgr = AsyncAuthenticationManager()
+        try:
+            return await auth_mgr.authenticate(*args)
+        finally:
+            await auth_mgr.close()
+
+    async def main():
+        tokens_only = asyncio.ensure_future(authenticate('user@example.com'))
+        await asyncio.sleep(0.05)
+        ts = await authenticate('user@example.com', 'password')
+        with pytest.raises(AuthenticationException):
+            await tokens_only
+        return ts
+
+    assert asyncio.run(main()).userinfo.userhash == 'hash'
+    assert chain == ['refresh', 'refresh', 'login', 'authenticate', 'authorize']
+
+
+def valid_tokenstore():
+    return Tokenstore(access_token=AccessToken('access', 3600), refresh_token=RefreshToken('refresh'),
+                      user_token=token(UserToken, 16), xsts_token=token(XSTSToken, 16),
+                      userinfo=XboxLiveUserInfo.from_dict(XUI))
+
+
+def test_plan():
+    auth_mgr = AuthenticationManager()
+    ts = valid_tokenstore()
+    assert auth_mgr.plan(ts) == []
+    assert auth_mgr.plan(ts, do_refresh=True) == [AuthenticationStep.TOKEN_REFRESH]
+
+    # Expiring within MIN_VALIDITY counts as expired
+    ts.xsts_token = token(XSTSToken, 0.01)
+    assert auth_mgr.plan(ts) == [AuthenticationStep.XSTS_AUTHORIZE]
+
+    ts.user_token = None
+    assert auth_mgr.plan(ts) == [AuthenticationStep.USER_AUTHENTICATE, AuthenticationStep.XSTS_AUTHORIZE]
+
+    ts.access_token = AccessToken('access', -3600)
+    assert auth_mgr.plan(ts) == [AuthenticationStep.TOKEN_REFRESH, AuthenticationStep.USER_AUTHENTICATE,
+                                 AuthenticationStep.XSTS_AUTHORIZE]
+
+    # An expired Access-Token does not matter while later tokens are valid
+    ts = valid_tokenstore()
+    ts.access_token = AccessToken('access', -3600)
+    assert auth_mgr.plan(ts) == []
+
+
+def test_authenticate_runs_planned_steps_only(chain):
+    ts = valid_tokenstore()
+    ts.xsts_token = token(XSTSToken, -1)
+    xsts_token = ts.xsts_token
+    user_token = ts.user_token
+
+    assert AuthenticationManager().authenticate(ts=ts, do_refresh=False) is ts
+    assert chain == ['authorize']
+    assert ts.user_token is user_token and ts.xsts_token is not xsts_token
+
+    AuthenticationManager().authenticate(ts=ts, do_refresh=False)
+    assert len(chain) == 1
+
+    # Refreshing is the default
+    AuthenticationManager().authenticate(ts=ts)
+    assert chain == ['authorize', 'refresh']
+
+
+def test_authorize_reads_missing_fields_from_claims(monkeypatch):
+    token = jwt({'exp': expiring(16), 'DisplayClaims': {'xui': [XUI]}})
+    monkeypatch.setattr(AuthenticationManager, '_xbox_live_authorize_request',
+                        lambda self, *args: FakeResponse({'Token': token}))
+    user_token = UserToken('user', datetime.now(tzutc()), datetime.now(tzutc()) + timedelta(hours=1))
+
+    xsts_token, userinfo = AuthenticationManager()._xbox_live_authorize(user_token)
+    assert xsts_token.is_valid_for(timedelta(hours=15))
+    assert userinfo.to_dict() == XUI
+
+    monkeypatch.setattr(AuthenticationManager, '_xbox_live_authorize_request',
+                        lambda self, *args: FakeResponse({'Token': 'opaque'}))
+    with pytest.raises(AuthenticationException):
+        AuthenticationManager()._xbox_live_authorize(user_token)
+
+
+def test_bare_token_file_needs_no_requests(tmpdir, offline):
+    path = str(tmpdir.join('tokens.json'))
+    tokens = [
+        {'name': 'AccessToken', 'token': jwt({'exp': expiring(1)})},
+        {'name': 'RefreshToken', 'token': jwt({'exp': expiring(24 * 14)})},
+        {'name': 'UserToken', 'token': jwt({'exp': expiring(16)})},
+        {'name': 'XSTSToken', 'token': jwt({'exp': expiring(16), 'xui': [XUI]})},
+    ]
+    with open(path, 'w') as f:
+        json.dump({'tokens': tokens}, f)
+
+    auth_mgr = AuthenticationManager(path)
+    ts = auth_mgr.authenticate(do_refresh=False)
+    assert auth_mgr.authenticated
+    assert ts.userinfo.userhash == 'hash'
+
+    # Saved with dates and userinfo
+    with open(path) as f:
+        saved = json.load(f)
+    assert saved['userinfo'] == XUI
+    assert all(token['date_valid'] for token in saved['tokens'])
+
+
+def test_plan_skips_authorization_with_claims_userinfo():
+    xsts_token = XSTSToken.from_jwt(jwt({'exp': expiring(16), 'xui': [XUI]}))
+    ts = Tokenstore(xsts_token=xsts_token)
+    auth_mgr = AuthenticationManager()
+    assert auth_mgr.plan(ts) == [AuthenticationStep.TOKEN_REFRESH, AuthenticationStep.USER_AUTHENTICATE,
+                                 AuthenticationStep.XSTS_AUTHORIZE]
+    auth_mgr._userinfo_from_claims(ts)
+    assert ts.userinfo.xuid == '2535'
+    assert auth_mgr.plan(ts) == []
+
+
+def test_credentials_need_demjson(monkeypatch):
+    from xbox_webapi.authentication import auth
+    monkeypatch.setattr(auth, 'demjson', None)
+    auth_mgr = AuthenticationManager()
+    assert auth_mgr._extract_js_object('<html></html>', 'ServerData') is None
+    with pytest.raises(ImportError):
+        auth_mgr._extract_js_object('var ServerData = {a: 1};', 'ServerData')
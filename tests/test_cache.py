@@ -0,0 +1,163 @@
+import os
+import time
+
+from xbox_webapi.api.cache import cache_key, auth_identity, CacheEntry, ResponseCache, DiskResponseCache
+from xbox_webapi.api.provider import XboxLiveClient
+from xbox_webapi.api.session import XboxLiveSession
+
+from tests.conftest import json_response
+
+
+def entry(content, ttl=60):
+    return CacheEntry(200, 'OK', {'Content-Type': 'application/json'}, content, time.time() + ttl)
+
+
+def stored_size(cache):
+    conn = cache._connection()
+    return conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+
+def test_cache_key_includes_host():
+    a = cache_key('https://eds.xboxlive.com/media/en-US/details?ids=1&desired=A')
+    b = cache_key('https://eds.xboxlive.com/media/en-US/details?desired=A&ids=1')
+    c = cache_key('https://other.example.com/media/en-US/details?ids=1&desired=A')
+    assert a == b
+    assert a != c
+    assert a[:3] == ('eds.xboxlive.com', 'en-US', 'details')
+    assert cache_key('https://eds.xboxlive.com/users/me') is None
+
+
+def test_hosts_do_not_share_entries(server):
+    session = XboxLiveSession(cache=ResponseCache(ttl=60))
+    server.handler = lambda request: json_response({'host': request.headers['Host']})
+    other = server.url.replace('127.0.0.1', 'localhost')
+
+    first = session.get(server.url + '/media/en-US/details?ids=1').json()
+    second = session.get(other + '/media/en-US/details?ids=1').json()
+    assert first != second
+    assert len(server.requests) == 2
+
+
+def test_users_do_not_share_entries(server, tmpdir):
+    assert auth_identity({'authorization': 'XBL3.0 x=hash;token'}) == 'hash'
+    assert auth_identity({'Authorization': 'Bearer token'}) == 'Bearer token'
+    assert auth_identity({}) is None
+
+    server.handler = lambda request: json_response({'auth': request.headers['Authorization']})
+    cache = DiskResponseCache(str(tmpdir.join('cache.sqlite')), ttl=60)
+    first = XboxLiveClient('first', 'token', 1, cache=cache)
+    second = XboxLiveClient('second', 'token', 2, cache=cache)
+    url = server.url + '/media/en-US/details?ids=1'
+
+    assert first.session.get(url).json() == {'auth': 'XBL3.0 x=first;token'}
+    assert second.session.get(url).json() == {'auth': 'XBL3.0 x=second;token'}
+    assert len(server.requests) == 2
+
+    # A refreshed XSTS-Token keeps the entries of its user
+    first.session.auth.update('first', 'refreshed')
+    assert first.session.get(url).json() == {'auth': 'XBL3.0 x=first;token'}
+    assert len(server.requests) == 2
+
+
+def test_disk_cache_tracks_size(tmpdir):
+    cache = DiskResponseCache(str(tmpdir.join('cache.sqlite')), max_size=10 ** 9)
+    key = cache_key('https://eds.xboxlive.com/media/en-US/details?ids=1')
+    cache.set(key, entry(b'a' * 1000))
+    cache.set(key, entry(os.urandom(2000)))
+    cache.set(cache_key('https://eds.xboxlive.com/media/en-US/details?ids=2'), entry(b'b'))
+    assert len(cache) == 2
+    assert cache.size() == stored_size(cache)
+    assert cache.get(key).content == cache.get(key).content
+
+    # Totals of an existing database are picked up
+    reopened = DiskResponseCache(cache.path)
+    assert reopened.size() == stored_size(cache)
+
+    cache.clear()
+    assert cache.size() == 0
+
+
+def test_disk_cache_evicts_lru_in_batches(tmpdir):
+    cache = DiskResponseCache(str(tmpdir.join('cache.sqlite')), max_size=20000, compress_level=0)
+    keys = [cache_key('https://eds.xboxlive.com/media/en-US/details?ids=%i' % i) for i in range(30)]
+    for i, key in enumerate(keys):
+        cache.set(key, entry(os.urandom(1000)))
+        # Distinct access times, the oldest entries get evicted first
+        cache._connection().execute('UPDATE responses SET accessed = ? WHERE key = ?',
+                                    (i, cache._serialize_key(key)))
+
+    assert cache.size() <= cache.max_size
+    assert cache.size() == stored_size(cache)
+    assert cache.stats.evictions == 30 - len(cache)
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[-1]) is not None
+
+
+def etag_handler(request):
+    if request.headers.get('If-None-Match') == '"v1"':
+        return 304, {'ETag': '"v1"'}, b''
+    return json_response({'path': request.path}, headers={'ETag': '"v1"'})
+
+
+def test_memory_cache_hits_and_revalidation(server):
+    cache = ResponseCache(ttl=60, endpoint_ttls={'tvchannels': None})
+    session = XboxLiveSession(cache=cache)
+    server.handler = etag_handler
+    url = server.url + '/media/en-US/details?ids=1'
+
+    assert session.get(url).json() == {'path': '/media/en-US/details?ids=1'}
+    assert session.get(url).json() == {'path': '/media/en-US/details?ids=1'}
+    assert len(server.requests) == 1
+
+    # Expired: revalidated with the ETag, the cached body is handed out
+    cache.get(cache_key(url)).expires = 0
+    response = session.get(url)
+    assert response.status_code == 200 and response.json() == {'path': '/media/en-US/details?ids=1'}
+    assert server.requests[-1].headers['If-None-Match'] == '"v1"'
+    assert cache.get(cache_key(url)).is_fresh
+
+    # Disabled endpoints and other methods are not cached
+    session.get(server.url + '/media/en-US/tvchannels')
+    session.get(server.url + '/media/en-US/tvchannels')
+    session.post(url)
+    assert len(server.requests) == 5
+    assert cache.stats.to_dict() == {'hits': 1, 'misses': 1, 'revalidated': 1, 'evictions': 0, 'hit_ratio': 2 / 3.0}
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = ResponseCache(max_entries=2)
+    keys = [cache_key('https://eds.xboxlive.com/media/en-US/details?ids=%i' % i) for i in range(3)]
+    cache.set(keys[0], entry(b'0'))
+    cache.set(keys[1], entry(b'1'))
+    cache.get(keys[0])
+    cache.set(keys[2], entry(b'2'))
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]).content == b'0' and cache.get(keys[2]).content == b'2'
+    assert len(cache) == 2 and cache.stats.evictions == 1
+
+
+def test_revalidation_only_touches_the_entry(server, tmpdir):
+    stored = []
+
+    class CountingCache(DiskResponseCache):
+        def set(self, key, entry):
+            stored.append(key)
+            super(CountingCache, self).set(key, entry)
+
+    path = str(tmpdir.join('cache.sqlite'))
+    cache = CountingCache(path, ttl=60)
+    session = XboxLiveSession(cache=cache)
+    server.handler = etag_handler
+    url = server.url + '/media/en-US/details?ids=1'
+    key = cache_key(url)
+
+    session.get(url)
+    cache.touch(key, 0)
+    assert not cache.get(key).is_fresh
+    assert session.get(url).json() == {'path': '/media/en-US/details?ids=1'}
+    assert server.requests[-1].headers['If-None-Match'] == '"v1"'
+
+    # The body was stored once, the new expiry is visible to other processes
+    assert stored == [key]
+    assert DiskResponseCache(path).get(key).is_fresh
+    assert cache.stats.revalidated == 1
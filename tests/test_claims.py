@@ -0,0 +1,63 @@
+import json
+import base64
+from datetime import datetime, timedelta
+
+import pytest
+from dateutil.tz import tzutc
+
+from xbox_webapi.authentication.claims import decode_claims, claim_datetime
+from xbox_webapi.authentication.token import Token, XSTSToken, UserToken
+from xbox_webapi.common.userinfo import XboxLiveUserInfo
+
+from tests.conftest import XUI
+
+
+def segment(obj):
+    return base64.urlsafe_b64encode(json.dumps(obj).encode('utf-8')).rstrip(b'=').decode('ascii')
+
+
+def jwt(claims):
+    return '%s.%s.sig' % (segment({'alg': 'RS256'}), segment(claims))
+
+
+def test_decode_claims():
+    claims = {'exp': 1500000000, 'xui': [XUI]}
+    assert decode_claims(jwt(claims)) == claims
+    for token in ('opaque', 'a.b.c.d.e', 'a.!!.c', '%s.%s.sig' % (segment({}), segment([1]))):
+        assert decode_claims(token) is None
+
+
+@pytest.mark.parametrize('value', [1e20, -1e20, float('nan'), 10 ** 30, 'soon', True, None])
+def test_malformed_dates(value):
+    assert claim_datetime({'exp': value}, 'exp') is None
+
+
+def test_from_jwt():
+    now = datetime.now(tzutc()).replace(microsecond=0)
+    exp = now + timedelta(hours=16)
+    token = XSTSToken.from_jwt(jwt({'iat': now.timestamp(), 'exp': exp.timestamp()}))
+    assert type(token) is XSTSToken
+    assert token.date_issued == now and token.date_valid == exp
+    assert token.is_valid
+
+    with pytest.raises(ValueError):
+        XSTSToken.from_jwt(jwt({'exp': 1e20}))
+    with pytest.raises(ValueError):
+        XSTSToken.from_jwt('opaque')
+
+
+def test_from_dict_reads_missing_dates_from_claims():
+    exp = datetime(2030, 1, 1, tzinfo=tzutc())
+    token = Token.from_dict({'name': 'UserToken', 'token': jwt({'exp': exp.timestamp()})})
+    assert type(token) is UserToken and token.date_valid == exp
+
+    with pytest.raises(ValueError):
+        Token.from_dict({'name': 'UserToken', 'token': 'opaque'})
+
+
+def test_userinfo_from_claims():
+    userinfo = XboxLiveUserInfo.from_claims(XSTSToken.from_jwt(jwt({'exp': 2e9, 'DisplayClaims': {'xui': [XUI]}}))
+                                            .claims)
+    assert userinfo.to_dict() == XUI
+    assert XboxLiveUserInfo.from_claims({'xui': [{'xid': '1'}]}) is None
+    assert XboxLiveUserInfo.from_claims(None) is None
@@ -0,0 +1,142 @@
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from xbox_webapi.api.coalesce import SingleFlight, AsyncSingleFlight
+from xbox_webapi.api.provider import XboxLiveClient, AsyncXboxLiveClient
+from xbox_webapi.api.session import XboxLiveSession, AsyncSession
+
+from tests.conftest import json_response
+
+
+def slow_handler(request):
+    time.sleep(0.2)
+    return json_response({'path': request.path})
+
+
+def test_single_flight_shares_results_and_errors():
+    group = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def work(value):
+        calls.append(value)
+        started.set()
+        release.wait()
+        if value == 'fail':
+            raise ValueError(value)
+        return value
+
+    with ThreadPoolExecutor(4) as executor:
+        leader = executor.submit(group.do, 'key', work, 'a')
+        started.wait()
+        followers = [executor.submit(group.do, 'key', work, 'b') for _ in range(3)]
+        while group.coalesced < 3:
+            time.sleep(0.01)
+        release.set()
+        assert leader.result() == ('a', False)
+        assert [f.result() for f in followers] == [('a', True)] * 3
+    assert calls == ['a']
+
+    # Errors reach every caller, the next call runs again
+    release.clear()
+    started.clear()
+    with ThreadPoolExecutor(2) as executor:
+        leader = executor.submit(group.do, 'key', work, 'fail')
+        started.wait()
+        follower = executor.submit(group.do, 'key', work, 'b')
+        while group.coalesced < 4:
+            time.sleep(0.01)
+        release.set()
+        for future in (leader, follower):
+            with pytest.raises(ValueError):
+                future.result()
+    assert group.do('key', lambda: 'again') == ('again', False)
+
+
+def test_async_single_flight_survives_cancelled_waiter():
+    group = AsyncSingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.1)
+        return 'done'
+
+    async def main():
+        first = asyncio.ensure_future(group.do('key', work))
+        second = asyncio.ensure_future(group.do('key', work))
+        await asyncio.sleep(0.01)
+        second.cancel()
+        return await first, group.coalesced
+
+    assert asyncio.run(main()) == (('done', False), 1)
+
+
+def test_session_coalesces_identical_requests(eds_server):
+    eds_server.handler = slow_handler
+    client = XboxLiveClient('userhash', 'token', 1, coalesce=True)
+
+    with ThreadPoolExecutor(5) as executor:
+        responses = list(executor.map(lambda _: client.eds.get_channel_list_download('lineup'), range(5)))
+    assert len(eds_server.requests) == 1
+    assert [r.json() for r in responses] == [{'path': '/media/en-US/tvchannels?channelLineupId=lineup'}] * 5
+    # Every caller gets its own response object
+    assert len(set(id(r) for r in responses)) == 5
+
+    # Different requests are not coalesced
+    with ThreadPoolExecutor(2) as executor:
+        list(executor.map(client.eds.get_channel_list_download, ['a', 'b']))
+    assert len(eds_server.requests) == 3
+
+
+def test_async_session_coalesces_identical_requests(eds_server):
+    pytest.importorskip('aiohttp')
+    eds_server.handler = slow_handler
+
+    async def main():
+        async with AsyncXboxLiveClient('userhash', 'token', 1, coalesce=True) as client:
+            return await asyncio.gather(*[client.eds.get_channel_list_download('lineup') for _ in range(5)])
+
+    responses = asyncio.run(main())
+    assert len(eds_server.requests) == 1
+    assert len(set(id(r) for r in responses)) == 5
+    assert all(r.json() == responses[0].json() for r in responses)
+
+
+HEADERS = [
+    {'Authorization': 'XBL3.0 x=a;token', 'Accept-Language': 'en-US', 'x-xbl-contract-version': '2'},
+    {'Authorization': 'XBL3.0 x=b;token', 'Accept-Language': 'en-US', 'x-xbl-contract-version': '2'},
+    {'Authorization': 'XBL3.0 x=a;token', 'Accept-Language': 'de-DE', 'x-xbl-contract-version': '2'},
+    {'Authorization': 'XBL3.0 x=a;token', 'Accept-Language': 'en-US', 'x-xbl-contract-version': '3'},
+    {'authorization': 'XBL3.0 x=a;token', 'accept-language': 'en-US', 'x-xbl-contract-version': '2'},
+]
+
+
+def test_session_coalesces_requests_of_one_identity_only(server):
+    server.handler = slow_handler
+    session = XboxLiveSession(coalesce=True)
+
+    with ThreadPoolExecutor(len(HEADERS)) as executor:
+        list(executor.map(lambda headers: session.get(server.url + '/profile', headers=headers), HEADERS))
+    # Only the last request, differing in header case, shares the response of the first
+    assert len(server.requests) == 4
+    assert session.single_flight.coalesced == 1
+
+
+def test_async_session_coalesces_requests_of_one_identity_only(server):
+    pytest.importorskip('aiohttp')
+    server.handler = slow_handler
+
+    async def main():
+        session = AsyncSession(coalesce=True)
+        try:
+            await asyncio.gather(*[session.get(server.url + '/profile', headers=headers) for headers in HEADERS])
+            return session.single_flight.coalesced
+        finally:
+            await session.close()
+
+    assert asyncio.run(main()) == 1
+    assert len(server.requests) == 4
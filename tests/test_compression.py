@@ -0,0 +1,72 @@
+import gzip
+import json
+import zlib
+import asyncio
+
+import pytest
+
+from xbox_webapi.api.compression import decompress, Decompressor
+from xbox_webapi.api.provider import XboxLiveClient, AsyncXboxLiveClient
+
+BODY = json.dumps({'Channels': [{'Id': 'c%i' % i, 'Name': 'Channel'} for i in range(500)]}).encode('utf-8')
+
+
+def deflate(data, wbits=zlib.MAX_WBITS):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, wbits)
+    return compressor.compress(data) + compressor.flush()
+
+
+def gzip_handler(request):
+    assert 'gzip' in request.headers['Accept-Encoding']
+    return 200, {'Content-Type': 'application/json', 'Content-Encoding': 'gzip'}, gzip.compress(BODY)
+
+
+def test_decompress():
+    assert decompress(gzip.compress(BODY), 'gzip') == BODY
+    assert decompress(deflate(BODY), 'deflate') == BODY
+    # Raw deflate without zlib header
+    assert decompress(deflate(BODY, -zlib.MAX_WBITS), 'deflate') == BODY
+    # Applied in order: deflate, then gzip
+    assert decompress(gzip.compress(deflate(BODY)), 'deflate, gzip') == BODY
+    assert decompress(BODY, None) == BODY
+    assert decompress(BODY, 'identity') == BODY
+    with pytest.raises(ValueError):
+        Decompressor('compress')
+
+
+def test_incremental_decompression():
+    data = gzip.compress(BODY)
+    decompressor = Decompressor('gzip')
+    chunks = [decompressor.decompress(data[i:i + 100]) for i in range(0, len(data), 100)]
+    assert b''.join(chunks) + decompressor.flush() == BODY
+
+
+def test_session_counts_transferred_and_decoded_bytes(eds_server):
+    eds_server.handler = gzip_handler
+    client = XboxLiveClient('userhash', 'token', 1)
+
+    assert client.eds.get_channel_list_download('lineup').content == BODY
+    assert len(list(client.eds.stream_channel_list_download('lineup'))) == 500
+    stats = client.transfer_stats.snapshot()['127.0.0.1/tvchannels']
+    assert stats['responses'] == 2
+    assert stats['decoded_bytes'] == 2 * len(BODY)
+    assert stats['transferred_bytes'] == 2 * len(gzip.compress(BODY))
+    assert stats['ratio'] > 5
+
+
+def test_async_session_counts_transferred_and_decoded_bytes(eds_server):
+    pytest.importorskip('aiohttp')
+    eds_server.handler = gzip_handler
+
+    async def main():
+        async with AsyncXboxLiveClient('userhash', 'token', 1) as client:
+            response = await client.eds.get_channel_list_download('lineup')
+            channels = [c async for c in client.eds.stream_channel_list_download('lineup')]
+            return response, channels, client.transfer_stats.snapshot()
+
+    response, channels, snapshot = asyncio.run(main())
+    assert response.content == BODY and len(channels) == 500
+    stats = snapshot['127.0.0.1/tvchannels']
+    assert stats['responses'] == 2
+    assert stats['decoded_bytes'] == 2 * len(BODY)
+    assert stats['transferred_bytes'] < stats['decoded_bytes'] / 5
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from xbox_webapi.api.provider import XboxLiveClient, AsyncXboxLiveClient
+from xbox_webapi.api.eds.types import MediaGroup
+
+from tests.conftest import json_response, query
+
+
+def details_handler(request):
+    """Answers with an item per requested ID, except for IDs starting with 'missing', fails on 'broken' IDs"""
+    ids = query(request)['ids'].split('.')
+    if any(id.startswith('broken') for id in ids):
+        return json_response({}, status=500)
+    items = [{'ID': id.upper(), 'Name': 'Item %s' % id} for id in ids if not id.startswith('missing')]
+    # One item known by an alternate ID
+    for item in items:
+        if item['ID'] == 'ALT':
+            item['ID'] = 'canonical'
+            item['AlternateIds'] = [{'IdType': 'Other', 'Value': 'alt'}]
+    return json_response({'Items': items[::-1]})
+
+
+def requested_ids(server):
+    return [query(r)['ids'].split('.') for r in server.requests]
+
+
+def test_chunks_respect_count_and_length():
+    client = XboxLiveClient('userhash', 'token', 1)
+    chunks = client.eds._chunk_ids(['a%i' % i for i in range(25)] + ['a0'], chunk_size=10)
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+
+    long_ids = ['x' * 600 + str(i) for i in range(5)]
+    for chunk in client.eds._chunk_ids(long_ids):
+        assert len('.'.join(chunk)) <= client.eds.DETAILS_MAX_IDS_LENGTH
+
+
+def test_details_bulk_merges_in_input_order(eds_server):
+    eds_server.handler = details_handler
+    client = XboxLiveClient('userhash', 'token', 1)
+    ids = ['id%i' % i for i in range(12)] + ['missing', 'alt', 'id3']
+
+    result = client.eds.get_details_bulk(ids, MediaGroup.GAME_TYPE, chunk_size=5, max_workers=3)
+    assert len(eds_server.requests) == 3
+    assert sorted(len(chunk) for chunk in requested_ids(eds_server)) == [4, 5, 5]
+    assert result.ids == ids
+    assert [item and item['Name'] for item in result.items] == \
+        ['Item id%i' % i for i in range(12)] + [None, 'Item alt', 'Item id3']
+    assert result.failures == {'missing': 'Not returned by server'}
+    assert dict(result)['alt']['ID'] == 'canonical'
+
+
+def test_failed_chunks_are_reported(eds_server):
+    eds_server.handler = details_handler
+    client = XboxLiveClient('userhash', 'token', 1)
+
+    result = client.eds.get_details_bulk(['a', 'b', 'broken', 'c'], MediaGroup.GAME_TYPE, chunk_size=2)
+    assert result.failures == {'broken': 'HTTP 500', 'c': 'HTTP 500'}
+    assert [item is not None for item in result.items] == [True, True, False, False]
+
+
+def test_async_details_bulk(eds_server):
+    pytest.importorskip('aiohttp')
+    eds_server.handler = details_handler
+    ids = ['id%i' % i for i in range(20)] + ['broken']
+
+    async def main():
+        async with AsyncXboxLiveClient('userhash', 'token', 1) as client:
+            return await client.eds.get_details_bulk(ids, MediaGroup.GAME_TYPE, chunk_size=10, max_workers=2)
+
+    result = asyncio.run(main())
+    assert len(eds_server.requests) == 3
+    assert [item['Name'] for item in result.items[:20]] == ['Item id%i' % i for i in range(20)]
+    assert result.failures == {'broken': 'HTTP 500'}
@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from xbox_webapi.api.provider import XboxLiveClient, AsyncXboxLiveClient
+
+from tests.conftest import json_response, query
+
+
+def capped_pages(items, cap, total=True):
+    """Handler serving `items` in pages of at most `cap` items, regardless of the requested page size"""
+    def handler(request):
+        params = query(request)
+        skip = int(params['skipItems'])
+        page = items[skip:skip + min(cap, int(params['maxItems']))]
+        body = {'Items': page}
+        if total:
+            body['TotalItems'] = len(items)
+        return json_response(body)
+    return handler
+
+
+@pytest.mark.parametrize('total', [True, False])
+def test_paging_continues_when_server_caps_page_size(eds_server, total):
+    items = [{'Id': str(i)} for i in range(23)]
+    eds_server.handler = capped_pages(items, 5, total)
+    client = XboxLiveClient('userhash', 'token', 1)
+
+    result = list(client.eds.iter_browse_query('MostPopular', page_size=10))
+    assert result == items
+    skips = [int(query(r)['skipItems']) for r in eds_server.requests]
+    # Without a total, an empty page ends the iteration
+    assert skips == ([0, 5, 10, 15, 20] if total else [0, 5, 10, 15, 20, 23])
+
+
+def test_paging_stops_at_total_items(eds_server):
+    items = [{'Id': str(i)} for i in range(20)]
+    eds_server.handler = capped_pages(items, 10)
+    client = XboxLiveClient('userhash', 'token', 1)
+
+    assert len(list(client.eds.iter_browse_query('MostPopular', page_size=10))) == 20
+    assert len(eds_server.requests) == 2
+
+
+def test_async_paging(eds_server):
+    pytest.importorskip('aiohttp')
+    items = [{'Id': str(i)} for i in range(12)]
+    eds_server.handler = capped_pages(items, 4)
+
+    async def main():
+        async with AsyncXboxLiveClient('userhash', 'token', 1) as client:
+            return [item async for item in client.eds.iter_browse_query('MostPopular', page_size=10)]
+
+    assert asyncio.run(main()) == items
+    assert len(eds_server.requests) == 3
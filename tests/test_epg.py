@@ -0,0 +1,69 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from dateutil.tz import tzutc
+
+from xbox_webapi.api.provider import XboxLiveClient, AsyncXboxLiveClient
+from xbox_webapi.api.eds.epg import EPGDownloader, split_time_range, format_time, to_datetime
+
+from tests.conftest import json_response, query
+
+START = datetime(2018, 1, 1, tzinfo=tzutc())
+CHANNELS = ['c%i' % i for i in range(5)]
+# Programs every 90 minutes, so many of them cross a window boundary
+PROGRAMS = [(START + timedelta(minutes=90 * i), START + timedelta(minutes=90 * (i + 1))) for i in range(16)]
+
+
+def schedule_handler(request):
+    params = query(request)
+    start, end = to_datetime(params['startTime']), to_datetime(params['endTime'])
+    skip, count = int(params['skipItems']), int(params['maxItems'])
+    channels = []
+    for cid in CHANNELS[skip:skip + count]:
+        programs = [{'Id': '%s-%i' % (cid, i), 'StartTime': format_time(s), 'EndTime': format_time(e)}
+                    for i, (s, e) in enumerate(PROGRAMS) if s < end and e > start]
+        channels.append({'Id': cid, 'Name': cid.upper(), 'Programs': programs})
+    return json_response({'Channels': channels, 'TotalItems': len(CHANNELS)})
+
+
+def check_guide(guide):
+    assert [channel['Id'] for channel in guide['Channels']] == CHANNELS
+    for channel in guide['Channels']:
+        assert [p['Id'] for p in channel['Programs']] == ['%s-%i' % (channel['Id'], i) for i in range(16)]
+
+
+def test_split_time_range():
+    assert split_time_range(START, START + timedelta(hours=5), timedelta(hours=2)) == [
+        ('2018-01-01T00:00:00.000Z', '2018-01-01T02:00:00.000Z'),
+        ('2018-01-01T02:00:00.000Z', '2018-01-01T04:00:00.000Z'),
+        ('2018-01-01T04:00:00.000Z', '2018-01-01T05:00:00.000Z'),
+    ]
+
+
+def test_download_schedule_merges_windows(eds_server):
+    eds_server.handler = schedule_handler
+    client = XboxLiveClient('userhash', 'token', 1)
+    progress = []
+
+    downloader = EPGDownloader(client.eds, timedelta(hours=6), page_size=2, max_workers=4,
+                               progress=lambda done, total: progress.append((done, total)))
+    check_guide(downloader.download('lineup', START, START + timedelta(hours=24)))
+    assert progress == [(i, 4) for i in range(5)]
+    # 4 windows, 5 channels in pages of 2
+    windows = set(query(r)['startTime'] for r in eds_server.requests)
+    assert len(windows) == 4
+    assert len(eds_server.requests) == 4 * 3
+
+
+def test_async_download_schedule(eds_server):
+    pytest.importorskip('aiohttp')
+    eds_server.handler = schedule_handler
+
+    async def main():
+        async with AsyncXboxLiveClient('userhash', 'token', 1) as client:
+            return await client.eds.download_schedule('lineup', START, START + timedelta(hours=24),
+                                                      window=timedelta(hours=4), max_workers=3)
+
+    check_guide(asyncio.run(main()))
+    assert len(set(query(r)['startTime'] for r in eds_server.requests)) == 6
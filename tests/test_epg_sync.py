@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta
+
+import pytest
+from dateutil.tz import tzutc
+
+from xbox_webapi.api.eds.epg import format_time, to_datetime
+from xbox_webapi.api.eds.schedule import ScheduleStore
+from xbox_webapi.api.eds.sync import EPGSync
+
+# Aligned to the sync windows, in the future so no window is near the current time
+NOW = datetime.now(tzutc()).replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=2)
+
+
+class FakeEDS(object):
+    """Hourly programs on a few channels, titles can be changed per start time"""
+    def __init__(self, channels=('a', 'b', 'c')):
+        self.channels = channels
+        self.titles = {}
+        self.calls = []
+
+    def iter_schedule_download(self, lineup_id, start_time, end_time, page_size, projection=None):
+        self.calls.append(start_time)
+        start, end = to_datetime(start_time), to_datetime(end_time)
+        result = []
+        for cid in self.channels:
+            programs = []
+            t = start
+            while t < end:
+                programs.append({'Id': '%s-%s' % (cid, format_time(t)),
+                                 'Name': self.titles.get((cid, t), 'Program'),
+                                 'StartTime': format_time(t), 'EndTime': format_time(t + timedelta(hours=1))})
+                t += timedelta(hours=1)
+            result.append({'Id': cid, 'Name': cid.upper(), 'Programs': programs})
+        return iter(result)
+
+
+class CountingStore(ScheduleStore):
+    def __init__(self):
+        super(CountingStore, self).__init__()
+        self.calls = []
+
+    def add_programs(self, channel, programs):
+        self.calls.append(('add', channel['Id'], len(programs)))
+        super(CountingStore, self).add_programs(channel, programs)
+
+    def remove_programs(self, channel_id, programs):
+        self.calls.append(('remove', channel_id, len(programs)))
+        super(CountingStore, self).remove_programs(channel_id, programs)
+
+
+def test_sync_applies_changes_once_per_channel():
+    eds = FakeEDS()
+    store = CountingStore()
+    sync = EPGSync(eds, store=store, ttl=timedelta(0), max_workers=2)
+
+    changes = sync.sync('L', NOW, NOW + timedelta(days=1))
+    assert len(changes.added) == 3 * 24
+    assert len(store) == 3 * 24
+    assert sorted(store.calls) == [('add', cid, 24) for cid in 'abc']
+
+    # Change one program, drop the first day by moving the span forward
+    store.calls = []
+    eds.titles[('b', NOW + timedelta(days=1, hours=2))] = 'Changed'
+    changes = sync.sync('L', NOW + timedelta(days=1), NOW + timedelta(days=2))
+    assert len(changes.removed) == 3 * 24
+    assert len(changes.changed) == 0
+    assert sorted(store.calls) == sorted([('remove', cid, 24) for cid in 'abc'] +
+                                         [('add', cid, 24) for cid in 'abc'])
+    assert store.at('b', NOW + timedelta(days=1, hours=2, minutes=5))[0]['Name'] == 'Changed'
+
+    store.calls = []
+    eds.titles[('b', NOW + timedelta(days=1, hours=2))] = 'Changed again'
+    changes = sync.sync('L', NOW + timedelta(days=1), NOW + timedelta(days=2))
+    assert len(changes.changed) == 1 and not changes.added and not changes.removed
+    assert store.calls == [('remove', 'b', 1), ('add', 'b', 1)]
+    assert len(store) == 3 * 24
+    assert [p['Name'] for p in store.at('b', NOW + timedelta(days=1, hours=2))] == ['Changed again']
+
+
+def test_sync_skips_fresh_windows():
+    eds = FakeEDS(channels=('a',))
+    sync = EPGSync(eds, store=ScheduleStore(), near_now=timedelta(0))
+    sync.sync('L', NOW + timedelta(days=1), NOW + timedelta(days=2))
+    eds.calls = []
+
+    changes = sync.sync('L', NOW + timedelta(days=1), NOW + timedelta(days=2))
+    assert eds.calls == []
+    assert not changes
+    assert len(changes.skipped) == 4
+    assert len(sync.guide('L')['Channels'][0]['Programs']) == 24
+
+
+def test_sync_keeps_store_to_one_lineup():
+    sync = EPGSync(FakeEDS(), store=ScheduleStore())
+    sync.sync('L', NOW, NOW + timedelta(hours=6))
+    with pytest.raises(ValueError):
+        sync.sync('M', NOW, NOW + timedelta(hours=6))
+    assert sync.guide('M') == {'Channels': []}
+
+    # Without a store, lineups are kept apart
+    sync = EPGSync(FakeEDS())
+    sync.sync('L', NOW, NOW + timedelta(hours=6))
+    sync.sync('M', NOW, NOW + timedelta(hours=12))
+    assert len(sync.guide('L')['Channels'][0]['Programs']) == 6
+    assert len(sync.guide('M')['Channels'][0]['Programs']) == 12
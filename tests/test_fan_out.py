@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from xbox_webapi.api.language import XboxLiveLanguage
+from xbox_webapi.api.provider import XboxLiveClient, AsyncXboxLiveClient
+from xbox_webapi.api.eds.types import MediaGroup
+
+from tests.conftest import json_response
+
+LANGUAGES = [XboxLiveLanguage.Germany, 'ja-JP', 'fr_FR', XboxLiveLanguage.Germany]
+
+
+def locale_handler(request):
+    locale = request.path.split('/')[2]
+    if locale == 'fr-FR':
+        return json_response({}, status=500)
+    return json_response({'Locale': locale})
+
+
+def check(results):
+    assert list(dict(results)) == ['de-DE', 'ja-JP', 'fr-FR']
+    assert results['de-DE'] == {'Locale': 'de-DE'}
+    assert results['ja-JP'] == {'Locale': 'ja-JP'}
+    assert results['fr-FR'] is None
+    assert list(results.failures) == ['fr-FR']
+
+
+def test_fan_out(eds_server):
+    eds_server.handler = locale_handler
+    client = XboxLiveClient('userhash', 'token', 1)
+
+    def details(eds):
+        response = eds.get_details('id', MediaGroup.GAME_TYPE)
+        response.raise_for_status()
+        return response.json()
+
+    check(client.eds.fan_out(LANGUAGES, details, max_workers=2))
+    assert len(eds_server.requests) == 3
+    # The client's own provider keeps its language
+    assert client.eds.locale == 'en-US'
+    assert client.eds.localized('de_DE').base_path == eds_server.url + '/media/de-DE'
+    with pytest.raises(KeyError):
+        client.eds.localized('xx-XX')
+
+
+def test_async_fan_out(eds_server):
+    pytest.importorskip('aiohttp')
+    eds_server.handler = locale_handler
+
+    async def details(eds):
+        response = await eds.get_details('id', MediaGroup.GAME_TYPE)
+        response.raise_for_status()
+        return response.json()
+
+    async def main():
+        async with AsyncXboxLiveClient('userhash', 'token', 1) as client:
+            return await client.eds.fan_out(LANGUAGES, details)
+
+    check(asyncio.run(main()))
@@ -0,0 +1,47 @@
+import pytest
+
+from xbox_webapi.api.language import XboxLiveLanguage, XboxLiveLanguageRegistry, language_registry
+from xbox_webapi.api.provider import XboxLiveClient
+
+
+def test_lookup_by_locale():
+    for locale in ('de-DE', 'de_DE', 'DE-de', ' de_de '):
+        assert language_registry.get(locale) is XboxLiveLanguage.Germany
+    assert language_registry['en_GB'] is XboxLiveLanguage.Great_Britain
+    assert 'fr-ca' in language_registry
+    assert 'xx-XX' not in language_registry
+    assert language_registry.get('xx-XX') is None
+    assert language_registry.get('xx-XX', XboxLiveLanguage.United_States) is XboxLiveLanguage.United_States
+    with pytest.raises(KeyError):
+        language_registry['xx-XX']
+
+
+def test_lookup_by_name_and_short_id():
+    assert language_registry.by_name('great britain') is XboxLiveLanguage.Great_Britain
+    assert language_registry.by_short_id('de') is XboxLiveLanguage.Germany
+    # Shared short IDs resolve to the primary locale
+    assert language_registry.by_short_id('CA').locale == 'en-CA'
+    assert language_registry.by_short_id('CH') is XboxLiveLanguage.Switzerland
+    assert set(l.locale for l in language_registry.all_by_short_id('ca')) == {'en-CA', 'fr-CA'}
+    assert language_registry.all_by_short_id('XX') == []
+    assert language_registry.by_short_id('XX') is None
+
+
+def test_registry_covers_all_languages():
+    languages = [v for v in vars(XboxLiveLanguage).values() if isinstance(v, type(XboxLiveLanguage.Germany))]
+    assert len(language_registry) == len(languages)
+    assert set(language_registry) == set(languages)
+    assert len(XboxLiveLanguageRegistry()) == len(language_registry)
+
+
+def test_resolve():
+    assert language_registry.resolve(XboxLiveLanguage.Japan) is XboxLiveLanguage.Japan
+    assert language_registry.resolve('ja_JP') is XboxLiveLanguage.Japan
+    with pytest.raises(KeyError):
+        language_registry.resolve('Japan')
+
+    client = XboxLiveClient('userhash', 'token', 1, language='de_DE')
+    assert client.lang is XboxLiveLanguage.Germany
+    assert client.eds.locale == 'de-DE'
+    with pytest.raises(KeyError):
+        XboxLiveClient('userhash', 'token', 1, language='xx-XX')
@@ -0,0 +1,87 @@
+import json
+import asyncio
+from datetime import timedelta
+
+from xbox_webapi.api.provider import XboxLiveClient, AsyncXboxLiveClient
+from xbox_webapi.api.eds.models import Channel, MediaItem, ScheduleEntry
+from xbox_webapi.api.eds.stream import ItemStreamParser, iter_items
+from xbox_webapi.api.eds.types import MediaGroup
+
+from tests.conftest import json_response
+
+PROGRAM = {
+    'ID': 'p1',
+    'Name': 'Episode',
+    'MediaItemType': 'TVEpisode',
+    'Images': [{'ID': 'i1', 'Purpose': 'BoxArt', 'Url': 'http://img/1'}],
+    'ParentSeries': {'ID': 's1', 'Name': 'Series', 'ParentSeries': {'ID': 'root'}},
+    'ParentalRating': {'RatingId': 'r1', 'Rating': 'TV-14', 'RatingSystem': 'TVPG'},
+    'ParentalRatings': [{'RatingId': 'r1', 'Rating': 'TV-14'},
+                        {'RatingId': 'r2', 'Rating': '12', 'RatingSystem': 'FSK'}],
+    'ScheduleInformation': {'StartTime': '2018-01-01T20:00:00.000Z', 'EndTime': '2018-01-01T20:30:00.000Z'},
+}
+CHANNELS = [{'Id': 'c%i' % i, 'Name': 'Channel %i' % i, 'Programs': [PROGRAM]} for i in range(3)]
+
+
+def test_fields_and_nested_models():
+    channel = Channel(CHANNELS[0])
+    assert channel.id == 'c0' and channel.name == 'Channel 0'
+    program = channel.programs[0]
+    assert isinstance(program, ScheduleEntry)
+    assert program.id == 'p1'
+    assert program.media_group == MediaGroup.TV_TYPE
+    assert program.image('BoxArt').url == 'http://img/1'
+    assert program.image('Logo') is None
+    assert type(program.parent_series) is MediaItem
+    assert program.parent_series.parent_series.id == 'root'
+    assert program.schedule_information.duration == timedelta(minutes=30)
+    assert program.parental_rating.rating == 'TV-14'
+    assert [rating.system for rating in program.parental_ratings] == [None, 'FSK']
+    # Models declared by name stay names on the shared descriptor
+    assert MediaItem.parent_series.model == 'MediaItem'
+    assert program.end - program.start == timedelta(minutes=30)
+    # Nested models are created once
+    assert channel.programs[0] is program
+
+
+def test_raw_text_is_decoded_on_first_access():
+    text = json.dumps(CHANNELS[1])
+    channel = Channel(text.encode('utf-8'))
+    assert channel.raw == text.encode('utf-8')
+    assert channel._data is None
+    assert channel.name == 'Channel 1'
+    assert channel == Channel(CHANNELS[1])
+
+
+def test_raw_parser_items():
+    data = json.dumps({'Channels': CHANNELS, 'Count': 3}).encode('utf-8')
+    parser = ItemStreamParser('Channels', raw=True)
+    items = list(iter_items([data[i:i + 10] for i in range(0, len(data), 10)], 'Channels', parser))
+    assert items == [json.dumps(channel) for channel in CHANNELS]
+    assert parser.document == {'Count': 3}
+
+
+def test_stream_models(eds_server):
+    eds_server.handler = lambda request: json_response({'Channels': CHANNELS})
+    client = XboxLiveClient('userhash', 'token', 1)
+
+    channels = list(client.eds.stream_channel_list_download('lineup', model=Channel))
+    assert [type(c) for c in channels] == [Channel] * 3
+    assert [c.id for c in channels] == ['c0', 'c1', 'c2']
+    assert channels[2].programs[0].parent_series.name == 'Series'
+
+    schedule = client.eds.stream_schedule_download('lineup', 'a', 'b', 10, 0, model=Channel)
+    assert [c.data for c in schedule] == CHANNELS
+    # Without a model, decoded dicts as before
+    assert list(client.eds.stream_channel_list_download('lineup')) == CHANNELS
+
+
+def test_async_stream_models(eds_server):
+    eds_server.handler = lambda request: json_response({'Channels': CHANNELS})
+
+    async def main():
+        async with AsyncXboxLiveClient('userhash', 'token', 1) as client:
+            return [channel async for channel in client.eds.stream_channel_list_download('lineup', model=Channel)]
+
+    channels = asyncio.run(main())
+    assert [c.name for c in channels] == ['Channel 0', 'Channel 1', 'Channel 2']
@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+from xbox_webapi.api.pool import ConnectionPools, PoolConfig
+from xbox_webapi.api.provider import XboxLiveClient, AsyncXboxLiveClient
+
+
+def test_clients_share_keepalive_connections(eds_server):
+    pools = ConnectionPools()
+    clients = [XboxLiveClient('userhash', 'token', 1, pools=pools) for _ in range(2)]
+    for i in range(6):
+        assert clients[i % 2].eds.get_channel_list_download('lineup').status_code == 200
+
+    assert pools.stats.snapshot() == {'127.0.0.1': {'new': 1, 'reused': 5}}
+    pools.close()
+
+
+def test_idle_connections_expire(eds_server):
+    pools = ConnectionPools(hosts={eds_server.url: PoolConfig(keepalive_timeout=0)})
+    client = XboxLiveClient('userhash', 'token', 1, pools=pools)
+    for _ in range(3):
+        client.eds.get_channel_list_download('lineup')
+
+    assert pools.stats.snapshot() == {'127.0.0.1': {'new': 3, 'reused': 0}}
+    pools.stats.reset()
+    assert pools.stats.snapshot() == {}
+
+
+def test_async_clients_share_the_connector(eds_server):
+    pytest.importorskip('aiohttp')
+    pools = ConnectionPools()
+
+    async def main():
+        clients = [AsyncXboxLiveClient('userhash', 'token', 1, pools=pools) for _ in range(2)]
+        for i in range(4):
+            await clients[i % 2].eds.get_channel_list_download('lineup')
+        for client in clients:
+            await client.close()
+        # Closing a client keeps the shared connector open
+        assert not pools.connector().closed
+        await pools.close_async()
+
+    asyncio.run(main())
+    assert pools.stats.snapshot() == {'127.0.0.1': {'new': 1, 'reused': 3}}
@@ -0,0 +1,45 @@
+from xbox_webapi.api.provider import XboxLiveClient
+from xbox_webapi.api.eds.types import FieldPreset, MediaItemField, MediaGroup, ScheduleDetailsField
+
+from tests.conftest import query
+
+
+def last_query(server):
+    return query(server.requests[-1])
+
+
+def test_media_item_projections(eds_server):
+    eds = XboxLiveClient('userhash', 'token', 1).eds
+
+    eds.get_details(['a', 'b'], MediaGroup.GAME_TYPE, projection=FieldPreset.MINIMAL)
+    assert last_query(eds_server)['fields'] == 'ID.Name.MediaItemType'
+    assert last_query(eds_server)['ids'] == 'a.b'
+
+    eds.get_details('a', MediaGroup.GAME_TYPE, projection=[MediaItemField.ID, MediaItemField.NAME])
+    assert last_query(eds_server)['fields'] == 'ID.Name'
+
+    # Complete payload: no restriction sent
+    for projection in (None, FieldPreset.FULL):
+        eds.get_details('a', MediaGroup.GAME_TYPE, projection=projection)
+        assert 'fields' not in last_query(eds_server)
+
+    eds.get_browse_query('MostPopular', 10, 0, projection=FieldPreset.LISTING)
+    assert last_query(eds_server)['fields'].split('.')[:3] == ['ID', 'Name', 'MediaItemType']
+
+
+def test_schedule_projections(eds_server):
+    eds = XboxLiveClient('userhash', 'token', 1).eds
+
+    eds.get_schedule_download('lineup', 'a', 'b', 10, 0)
+    assert last_query(eds_server)['desired'] == 'Id.Name.Images.Description.ParentalRating.ParentSeries.' \
+                                                'ScheduleInformation'
+
+    eds.get_schedule_download('lineup', 'a', 'b', 10, 0, projection=FieldPreset.MINIMAL)
+    assert last_query(eds_server)['desired'] == 'Id.Name.ScheduleInformation'
+
+    eds.get_schedule_download('lineup', 'a', 'b', 10, 0, projection=[ScheduleDetailsField.ID])
+    assert last_query(eds_server)['desired'] == 'Id'
+
+    # An empty projection is not the full one
+    eds.get_schedule_download('lineup', 'a', 'b', 10, 0, projection=[])
+    assert 'desired' not in last_query(eds_server)
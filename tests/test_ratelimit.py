@@ -0,0 +1,67 @@
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from xbox_webapi.api.provider import XboxLiveClient
+from xbox_webapi.api.ratelimit import RateLimiter, RateLimit, TokenBucket, parse_retry_after, endpoint_key
+from xbox_webapi.api.resilience import RetryPolicy
+
+from tests.conftest import json_response
+
+
+def test_parse_retry_after():
+    assert parse_retry_after('3') == 3.0
+    assert parse_retry_after('-3') == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('soon') is None
+    later = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert 25 < parse_retry_after(later) <= 30
+
+
+def test_endpoint_key_ignores_locale():
+    assert endpoint_key('https://eds.xboxlive.com/media/en-US/details?ids=1') == ('eds.xboxlive.com', 'details')
+    assert endpoint_key('https://eds.xboxlive.com/media/de-DE/details/') == ('eds.xboxlive.com', 'details')
+
+
+def test_bucket_bursts_then_paces():
+    bucket = TokenBucket(RateLimit(rate=10.0, burst=3))
+    assert [bucket.reserve() for _ in range(3)] == [0.0] * 3
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+
+def test_throttling_halves_rate_and_recovers():
+    bucket = TokenBucket(RateLimit(rate=10.0, burst=5, min_rate=4.0))
+    bucket.throttled(retry_after=2.0)
+    assert bucket.rate == 5.0
+    assert bucket.reserve() == pytest.approx(2.0, abs=0.01)
+    bucket.throttled()
+    assert bucket.rate == 4.0
+    for _ in range(200):
+        bucket.succeeded()
+    assert bucket.rate == 10.0
+
+
+def test_limits_per_host_and_endpoint():
+    details, other = RateLimit(rate=1.0), RateLimit(rate=2.0)
+    limiter = RateLimiter(limits={'eds.xboxlive.com/details': details, 'eds.xboxlive.com': other})
+    assert limiter.bucket('https://eds.xboxlive.com/media/en-US/details').limit is details
+    assert limiter.bucket('https://eds.xboxlive.com/media/de-DE/details').limit is details
+    assert limiter.bucket('https://eds.xboxlive.com/media/en-US/browse').limit is other
+    assert limiter.bucket('https://other.xboxlive.com/x').limit is limiter.default
+
+
+def test_session_waits_for_retry_after(eds_server):
+    responses = [json_response({}, status=429, headers={'Retry-After': '0.3'}), json_response({'ok': True})]
+    eds_server.handler = lambda request: responses.pop(0)
+    limiter = RateLimiter()
+    client = XboxLiveClient('userhash', 'token', 1, rate_limiter=limiter, retry=RetryPolicy(backoff_factor=0))
+
+    start = time.monotonic()
+    response = client.eds.get_channel_list_download('lineup')
+    assert response.json() == {'ok': True}
+    assert time.monotonic() - start >= 0.3
+    assert len(eds_server.requests) == 2
+    assert limiter.bucket(eds_server.url + '/media/en-US/tvchannels').rate < limiter.default.rate
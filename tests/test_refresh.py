@@ -0,0 +1,120 @@
+import json
+import time
+import asyncio
+import threading
+from datetime import datetime, timedelta
+
+from dateutil.tz import tzutc
+
+from xbox_webapi.authentication.auth import AuthenticationManager, AsyncAuthenticationManager
+from xbox_webapi.authentication.refresh import TokenRefresher, AsyncTokenRefresher
+from xbox_webapi.authentication.token import Tokenstore, AccessToken, RefreshToken, UserToken, XSTSToken
+from xbox_webapi.common.userinfo import XboxLiveUserInfo
+
+from tests.conftest import XUI, token
+
+
+def tokenstore(xsts_hours=16):
+    return Tokenstore(access_token=AccessToken('access', 3600), refresh_token=RefreshToken('refresh'),
+                      user_token=token(UserToken, 16), xsts_token=token(XSTSToken, xsts_hours),
+                      userinfo=XboxLiveUserInfo.from_dict(XUI))
+
+
+def test_refresh_renews_stale_tokens_only(chain, tmpdir):
+    path = str(tmpdir.join('tokens.json'))
+    ts = tokenstore(xsts_hours=2 / 60.0)
+    user_token = ts.user_token
+    renewed = []
+    refresher = TokenRefresher(AuthenticationManager(path), ts, callback=renewed.append)
+
+    assert refresher.next_refresh() < datetime.now(tzutc())
+    assert refresher.refresh() == ['xsts_token']
+    assert chain == ['authorize']
+    assert ts.user_token is user_token
+    assert ts.xsts_token.is_valid_for(timedelta(hours=1))
+    assert renewed == [ts]
+    with open(path) as f:
+        assert json.load(f)['userinfo'] == XUI
+
+    # Everything is fresh now
+    assert refresher.refresh() == []
+    assert refresher.next_refresh() > datetime.now(tzutc()) + timedelta(hours=15)
+    assert chain == ['authorize'] and len(renewed) == 1
+
+
+def test_forced_refresh_and_failing_callback(chain):
+    ts = tokenstore()
+    refresher = TokenRefresher(AuthenticationManager(), ts, callback=lambda ts: 1 / 0)
+    seen = []
+    refresher.add_callback(seen.append)
+
+    assert refresher.refresh(force=True) == ['access_token']
+    assert chain == ['refresh']
+    # Callbacks run despite an earlier failure
+    assert seen == [ts]
+
+
+def test_refresh_joins_authentication_in_flight(chain):
+    """A refresher tick and a concurrent `authenticate` of the same account share one chain"""
+    ts = tokenstore(xsts_hours=0)
+    ts.access_token = AccessToken('access', -3600)
+    ts.user_token = None
+    other = Tokenstore(refresh_token=RefreshToken('refresh'))
+
+    thread = threading.Thread(target=AuthenticationManager().authenticate, kwargs={'ts': other})
+    thread.start()
+    time.sleep(0.05)
+    renewed = TokenRefresher(AuthenticationManager(), ts).refresh()
+    thread.join()
+
+    assert chain == ['refresh', 'authenticate', 'authorize']
+    assert renewed == ['access_token', 'user_token', 'xsts_token']
+    assert str(ts.xsts_token) == str(other.xsts_token)
+
+
+def test_background_thread(chain):
+    ts = tokenstore(xsts_hours=0)
+    with TokenRefresher(AuthenticationManager(), ts) as refresher:
+        for _ in range(100):
+            if chain:
+                break
+            time.sleep(0.01)
+    assert refresher._thread is None
+    assert chain == ['authorize']
+    assert ts.xsts_token.is_valid_for(timedelta(hours=1))
+
+
+def test_async_refresher(chain, tmpdir, monkeypatch):
+    path = str(tmpdir.join('tokens.json'))
+    ts = tokenstore(xsts_hours=0)
+    threads = []
+    save_token_files = AsyncAuthenticationManager.save_token_files
+
+    def save(self, ts):
+        threads.append(threading.current_thread())
+        save_token_files(self, ts)
+    monkeypatch.setattr(AsyncAuthenticationManager, 'save_token_files', save)
+
+    async def main():
+        auth_mgr = AsyncAuthenticationManager(path)
+        try:
+            refresher = AsyncTokenRefresher(auth_mgr, ts)
+            assert await refresher.refresh(force=True) == ['access_token', 'xsts_token']
+
+            # Expired in memory only, the background task picks up the token saved to the file
+            ts.xsts_token = token(XSTSToken, 0)
+            async with refresher:
+                for _ in range(100):
+                    if ts.xsts_token.is_valid_for(timedelta(hours=1)):
+                        break
+                    await asyncio.sleep(0.01)
+            return refresher
+        finally:
+            await auth_mgr.close()
+
+    refresher = asyncio.run(main())
+    assert chain == ['refresh', 'authorize']
+    assert ts.xsts_token.is_valid_for(timedelta(hours=1))
+    assert refresher._task is None and refresher.last_error is None
+    # The token file is written off the event loop
+    assert threads and threading.main_thread() not in threads
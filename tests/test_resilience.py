@@ -0,0 +1,153 @@
+import time
+import asyncio
+
+import pytest
+import requests
+
+from xbox_webapi.api.resilience import RetryPolicy, CircuitBreaker, CircuitBreakers, CircuitState
+from xbox_webapi.api.session import XboxLiveSession, AsyncSession
+from xbox_webapi.common.exceptions import CircuitOpenException
+
+from tests.conftest import json_response
+
+
+def test_retry_policy():
+    policy = RetryPolicy(total=2, backoff_factor=1.0, max_backoff=3.0)
+    assert policy.should_retry('GET', 0)
+    assert policy.should_retry('get', 1, 503)
+    assert not policy.should_retry('GET', 2, 503)
+    assert not policy.should_retry('GET', 0, 404)
+    assert not policy.should_retry('POST', 0)
+    assert all(0 <= policy.backoff(5) <= 3.0 for _ in range(100))
+    assert policy.backoff(0, retry_after=2.5) >= 2.5
+
+
+def test_breaker_opens_and_recovers():
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=0.1)
+    breaker.record_failure()
+    assert breaker.acquire() == 0
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.acquire() > 0
+
+    time.sleep(0.1)
+    assert breaker.acquire() == 0
+    assert breaker.state == CircuitState.HALF_OPEN
+    # Only a single trial request
+    assert breaker.acquire() > 0
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+
+    time.sleep(0.1)
+    assert breaker.acquire() == 0
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.acquire() == 0
+
+
+def test_breaker_replaces_lost_trial():
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.1)
+    breaker.record_failure()
+    time.sleep(0.1)
+    assert breaker.acquire() == 0
+    assert breaker.acquire() > 0
+    # The trial never reports back
+    time.sleep(0.1)
+    assert breaker.acquire() == 0
+    assert breaker.state == CircuitState.HALF_OPEN
+
+
+def test_sync_session_retries_and_opens_circuit(server):
+    server.handler = lambda request: json_response({}, 503, {'Retry-After': '0'})
+    breakers = CircuitBreakers(failure_threshold=3, recovery_timeout=60)
+    session = XboxLiveSession(retry=RetryPolicy(total=2, backoff_factor=0.01), circuit_breakers=breakers)
+
+    assert session.get(server.url + '/a').status_code == 503
+    assert len(server.requests) == 3
+    assert breakers.states() == {server.url: CircuitState.OPEN}
+    with pytest.raises(CircuitOpenException):
+        session.get(server.url + '/a')
+    assert len(server.requests) == 3
+
+
+def test_sync_trial_ending_in_other_exception_reopens(server):
+    server.handler = lambda request: (200, {'Content-Encoding': 'gzip'}, b'not gzip')
+    breakers = CircuitBreakers(failure_threshold=1, recovery_timeout=0.1)
+    breaker = breakers.get(server.url)
+    breaker.record_failure()
+    time.sleep(0.1)
+
+    session = XboxLiveSession(circuit_breakers=breakers)
+    with pytest.raises(requests.exceptions.ContentDecodingError):
+        session.get(server.url + '/broken')
+    assert breaker.state == CircuitState.OPEN
+
+
+def test_async_cancelled_trial_does_not_block_host(server):
+    def handler(request):
+        if request.path == '/slow':
+            time.sleep(0.5)
+        return json_response({})
+    server.handler = handler
+    breakers = CircuitBreakers(failure_threshold=1, recovery_timeout=0.1)
+    breaker = breakers.get(server.url)
+    breaker.record_failure()
+
+    async def main():
+        session = AsyncSession(circuit_breakers=breakers)
+        try:
+            await asyncio.sleep(0.1)
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(session.get(server.url + '/slow'), 0.05)
+            assert breaker.state == CircuitState.OPEN
+
+            await asyncio.sleep(0.1)
+            response = await session.get(server.url + '/fast')
+            assert response.status_code == 200
+            assert breaker.state == CircuitState.CLOSED
+        finally:
+            await session.close()
+
+    pytest.importorskip('aiohttp')
+    asyncio.run(main())
+
+
+def test_breaker_release_gives_up_trial_only():
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=60)
+    breaker.release()
+    assert breaker.state == CircuitState.CLOSED and breaker.failures == 0
+
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker._opened_at -= 60
+    assert breaker.acquire() == 0
+    assert breaker.state == CircuitState.HALF_OPEN
+    breaker.release()
+    assert breaker.failures == 2
+    # The next request takes over the trial
+    assert breaker.acquire() == 0
+    assert breaker.acquire() > 0
+
+
+def test_async_cancellations_are_not_failures(server):
+    def handler(request):
+        time.sleep(0.3)
+        return json_response({})
+    server.handler = handler
+    breakers = CircuitBreakers(failure_threshold=3, recovery_timeout=60)
+    breaker = breakers.get(server.url)
+
+    async def main():
+        session = AsyncSession(circuit_breakers=breakers)
+        try:
+            for _ in range(3):
+                with pytest.raises(asyncio.TimeoutError):
+                    await asyncio.wait_for(session.get(server.url + '/slow'), 0.05)
+            assert breaker.state == CircuitState.CLOSED and breaker.failures == 0
+            response = await session.get(server.url + '/slow')
+            assert response.status_code == 200
+        finally:
+            await session.close()
+
+    pytest.importorskip('aiohttp')
+    asyncio.run(main())
@@ -0,0 +1,68 @@
+import random
+from datetime import datetime, timedelta
+
+from dateutil.tz import tzutc
+
+from xbox_webapi.api.eds.schedule import ScheduleStore
+
+BASE = datetime(2018, 1, 1, tzinfo=tzutc())
+
+
+def iso(minutes):
+    return (BASE + timedelta(minutes=minutes)).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+
+def program(pid, start, end):
+    return {'Id': pid, 'StartTime': iso(start), 'EndTime': iso(end)}
+
+
+def expected(programs, start, end):
+    def overlaps(p):
+        p_start, p_end = p['_range']
+        return p_start < end and p_end > start if end > start else p_start <= start < p_end
+    return [p['Id'] for p in sorted(programs, key=lambda p: p['_range'][0]) if overlaps(p)]
+
+
+def test_queries_match_brute_force():
+    rnd = random.Random(1)
+    programs = []
+    for i in range(400):
+        start = rnd.randrange(0, 10000)
+        # Mostly short programs, a few running for days
+        length = rnd.choice([30, 60, 90]) if rnd.random() > 0.02 else rnd.randrange(3000, 9000)
+        p = program('p%i' % i, start, start + length)
+        p['_range'] = (start, start + length)
+        programs.append(p)
+
+    store = ScheduleStore()
+    store.add_programs({'Id': 'ch'}, programs)
+    assert len(store) == 400
+
+    for _ in range(300):
+        start = rnd.randrange(-100, 10100)
+        end = start + rnd.choice([0, 1, 30, 600])
+        if end == start:
+            result = store.at('ch', iso(start))
+        else:
+            result = store.between(iso(start), iso(end)).get('ch', [])
+        assert [p['Id'] for p in result] == expected(programs, start, end)
+
+
+def test_channels_and_removal():
+    store = ScheduleStore()
+    store.add({'Channels': [
+        {'Id': 'a', 'Name': 'A', 'Programs': [program('1', 0, 60), program('2', 60, 120), {'Id': 'no-times'}]},
+        {'Id': 'b', 'Name': 'B', 'Programs': [program('3', 0, 600)]},
+    ]})
+    assert store.channels() == {'a': {'Id': 'a', 'Name': 'A'}, 'b': {'Id': 'b', 'Name': 'B'}}
+    assert len(store) == 3
+    assert [p['Id'] for p in store.at('a', iso(30))] == ['1']
+    assert [p['Id'] for p in store.at('a', iso(60))] == ['2']
+    assert store.at('a', iso(120)) == []
+    assert sorted(store.between(iso(50), iso(70))) == ['a', 'b']
+    assert list(store.between(iso(50), iso(70), channel_ids=['b'])) == ['b']
+
+    store.remove_programs('a', [program('1', 0, 60)])
+    assert store.at('a', iso(30)) == []
+    assert [p['Id'] for p in store.at('a', iso(90))] == ['2']
+    assert len(store) == 2
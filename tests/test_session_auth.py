@@ -0,0 +1,51 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from dateutil.tz import tzutc
+
+from xbox_webapi.api.provider import XboxLiveClient, AsyncXboxLiveClient
+from xbox_webapi.api.session import XboxLiveAuth
+from xbox_webapi.authentication.token import Tokenstore, XSTSToken
+from xbox_webapi.common.userinfo import XboxLiveUserInfo
+
+
+def tokenstore(userhash, token):
+    now = datetime.now(tzutc())
+    return Tokenstore(xsts_token=XSTSToken(token, now, now + timedelta(hours=16)),
+                      userinfo=XboxLiveUserInfo('2535', userhash, 'Gamer', 'Adult', '191', '234'))
+
+
+def authorization(server):
+    return [r.headers['Authorization'] for r in server.requests]
+
+
+def test_auth_header():
+    auth = XboxLiveAuth('userhash', 'token')
+    assert auth.apply({}) == {'Authorization': 'XBL3.0 x=userhash;token'}
+    auth.update_from_tokenstore(tokenstore('newhash', 'newtoken'))
+    assert auth.header == 'XBL3.0 x=newhash;newtoken'
+
+
+def test_update_tokens(eds_server):
+    client = XboxLiveClient('userhash', 'token', 1)
+    session = client.session
+    client.eds.get_channel_list_download('lineup')
+    client.update_tokens(tokenstore('newhash', 'newtoken'))
+    client.eds.get_channel_list_download('lineup')
+
+    assert client.session is session
+    assert authorization(eds_server) == ['XBL3.0 x=userhash;token', 'XBL3.0 x=newhash;newtoken']
+
+
+def test_async_update_tokens(eds_server):
+    pytest.importorskip('aiohttp')
+
+    async def main():
+        async with AsyncXboxLiveClient('userhash', 'token', 1) as client:
+            await client.eds.get_channel_list_download('lineup')
+            client.update_tokens(tokenstore('newhash', 'newtoken'))
+            await client.eds.get_channel_list_download('lineup')
+
+    asyncio.run(main())
+    assert authorization(eds_server) == ['XBL3.0 x=userhash;token', 'XBL3.0 x=newhash;newtoken']
@@ -0,0 +1,85 @@
+import json
+import random
+
+import pytest
+
+from xbox_webapi.api.eds.stream import ItemStreamParser, iter_items
+from xbox_webapi.common.exceptions import XboxException
+
+DOCUMENT = {
+    'Paging': {'TotalItems': 3},
+    'Channels': [
+        {'Id': 'c%i' % i, 'Name': u'Kanäl "%i" \\ [{' % i, 'Programs': [{'n': 1.5e3, 'x': None, 'b': True}] * 3}
+        for i in range(200)
+    ] + [None, 12, u'☃'],
+    'Count': 12345,
+}
+
+
+def split(data, rnd, max_size):
+    chunks, pos = [], 0
+    while pos < len(data):
+        size = rnd.randint(1, max_size)
+        chunks.append(data[pos:pos + size])
+        pos += size
+    return chunks
+
+
+def counting_parser(items_key):
+    parser = ItemStreamParser(items_key)
+    decoder = parser._decoder
+    calls = []
+
+    def raw_decode(s, idx=0):
+        calls.append(idx)
+        return json.JSONDecoder.raw_decode(decoder, s, idx)
+    decoder.raw_decode = raw_decode
+    return parser, calls
+
+
+@pytest.mark.parametrize('indent', [None, 2])
+def test_random_chunking(indent):
+    rnd = random.Random(indent)
+    data = json.dumps(DOCUMENT, ensure_ascii=False, indent=indent).encode('utf-8')
+    for max_size in (1, 7, 700, len(data)):
+        parser = ItemStreamParser('Channels')
+        items = list(iter_items(split(data, rnd, max_size), 'Channels', parser))
+        assert items == DOCUMENT['Channels']
+        assert parser.document == {'Paging': {'TotalItems': 3}, 'Count': 12345}
+
+
+def test_every_value_is_decoded_once():
+    item = {'Id': 'big', 'Programs': [{'Name': 'Program "%i" {' % i, 'Start': i} for i in range(20000)]}
+    data = json.dumps({'Channels': [item, item], 'Count': 1}).encode('utf-8')
+
+    parser, calls = counting_parser('Channels')
+    items = list(iter_items(split(data, random.Random(0), 512), 'Channels', parser))
+    assert items == [item, item]
+    # Keys 'Channels' and 'Count', two items and the value of 'Count'
+    assert len(calls) == 5
+
+
+def test_scalars_split_at_chunk_boundary():
+    parser = ItemStreamParser('Channels')
+    chunks = [b'{"Count": 12', b'34, "Flag": tr', b'ue, "Channels": [1', b'2, nu', b'll]}']
+    assert list(iter_items(chunks, 'Channels', parser)) == [12, None]
+    assert parser.document == {'Count': 1234, 'Flag': True}
+
+
+def test_null_and_empty_lists():
+    parser = ItemStreamParser('Channels')
+    assert list(iter_items([b'{"Channels": null}'], 'Channels', parser)) == []
+    assert parser.document == {'Channels': None}
+    assert list(iter_items([b'{"Channels": []}'], 'Channels')) == []
+
+
+@pytest.mark.parametrize('data', [b'{"Channels": [1, 2', b'{"Channels": [{"a": "b\\"}]}', b'{"Count": 1'])
+def test_truncated(data):
+    with pytest.raises(XboxException):
+        list(iter_items([data[:-3], data[-3:]], 'Channels'))
+
+
+@pytest.mark.parametrize('data', [b'{"Channels": [}', b'[1]', b'{"Channels": [{"a" 1}]}', b'{"Count": 12x}'])
+def test_malformed(data):
+    with pytest.raises(XboxException):
+        list(iter_items([data], 'Channels'))
@@ -0,0 +1,55 @@
+import json
+
+from xbox_webapi.api.provider import XboxLiveClient
+from xbox_webapi.api.eds.strings import StringPool
+
+from tests.conftest import json_response
+
+ITEMS = [{'MediaItemType': 'TVEpisode', 'Genres': ['Drama', 'Crime'], 'Description': 'x' * 300 + str(i)}
+         for i in range(3)]
+
+
+def text(obj):
+    # Fresh string objects on every decode
+    return json.dumps(obj).encode('utf-8')
+
+
+def test_loads_shares_equal_strings():
+    pool = StringPool()
+    items = pool.loads(text({'Items': ITEMS}))['Items']
+    assert items == ITEMS
+    assert items[0]['MediaItemType'] is items[2]['MediaItemType']
+    assert items[0]['Genres'][1] is items[1]['Genres'][1]
+    assert list(items[0])[0] is list(items[1])[0]
+    # Long strings are not pooled
+    assert sorted(pool._strings) == ['Crime', 'Description', 'Drama', 'Genres', 'Items', 'MediaItemType', 'TVEpisode']
+
+    report = pool.report()
+    assert report['strings'] == len(pool)
+    assert report['deduplicated'] > 0 and report['bytes_saved'] > 0
+
+
+def test_dedupe_in_place_and_limits():
+    pool = StringPool()
+    first, second = json.loads(text(ITEMS[0])), json.loads(text(ITEMS[0]))
+    assert pool.dedupe(first) is first
+    pool.dedupe(second)
+    assert first['MediaItemType'] is second['MediaItemType']
+    assert first['Description'] is not second['Description']
+
+    limited = StringPool(max_strings=2)
+    assert [limited.intern(s) for s in ('a', 'b', 'c')] == ['a', 'b', 'c']
+    assert len(limited) == 2
+    limited.clear()
+    assert len(limited) == 0
+
+
+def test_client_decodes_with_pool(eds_server):
+    pool = StringPool()
+    eds_server.handler = lambda request: json_response({'Items': ITEMS, 'TotalItems': 3})
+    client = XboxLiveClient('userhash', 'token', 1, string_pool=pool)
+
+    items = list(client.eds.iter_browse_query('MostPopular', page_size=10))
+    streamed = list(client.eds.stream_channel_list_download('lineup', items_key='Items'))
+    assert items == streamed == ITEMS
+    assert items[0]['MediaItemType'] is streamed[2]['MediaItemType']
@@ -0,0 +1,89 @@
+import struct
+import asyncio
+
+import pytest
+
+pytest.importorskip('aiohttp')
+
+from xbox_webapi.api.session import AsyncSession
+from xbox_webapi.authentication.two_factor import AsyncTwoFactorAuthentication, AuthSessionState
+
+
+def gif(width, height):
+    return b'GIF87a' + struct.pack('<HH', width, height) + b'\x00' * 30
+
+
+def gif_sequence(*images):
+    """Handler answering poll requests with the given images, the last one repeated"""
+    images = list(images)
+
+    def handler(request):
+        image = images.pop(0) if len(images) > 1 else images[0]
+        return 200, {'Content-Type': 'image/gif'}, image
+    return handler
+
+
+class FastPolling(AsyncTwoFactorAuthentication):
+    POLL_INTERVAL = 0.01
+    POLL_TIMEOUT = 5.0
+
+
+def poll(server, auth_cls=FastPolling, side_task=None):
+    async def main():
+        session = AsyncSession()
+        try:
+            two_factor = auth_cls(session)
+            polling = asyncio.ensure_future(two_factor.poll_session_state({'Ac': server.url + '/poll'}, 'key'))
+            side = await side_task(polling) if side_task else None
+            return await polling, side
+        finally:
+            await session.close()
+    return asyncio.run(main())
+
+
+def test_poll_until_approved(server):
+    server.handler = gif_sequence(gif(1, 1), gif(1, 1), gif(1, 2))
+    state, _ = poll(server)
+    assert state == AuthSessionState.APPROVED
+    assert len(server.requests) == 3
+    assert server.requests[0].path == '/poll?slk=key'
+
+
+def test_poll_rejected_and_garbage(server):
+    server.handler = gif_sequence(gif(2, 2))
+    assert poll(server)[0] == AuthSessionState.REJECTED
+    server.handler = gif_sequence(b'no gif' * 10)
+    assert poll(server)[0] == AuthSessionState.ERROR
+    server.handler = gif_sequence(b'GIF87a')
+    assert poll(server)[0] == AuthSessionState.ERROR
+
+
+def test_poll_does_not_block_the_loop(server):
+    server.handler = gif_sequence(gif(1, 1))
+
+    class SlowPolling(AsyncTwoFactorAuthentication):
+        POLL_INTERVAL = 0.05
+        POLL_TIMEOUT = 0.3
+
+    async def count_ticks(polling):
+        ticks = 0
+        while not polling.done():
+            ticks += 1
+            await asyncio.sleep(0.01)
+        return ticks
+
+    state, ticks = poll(server, SlowPolling, count_ticks)
+    assert state == AuthSessionState.PENDING
+    assert ticks >= 10
+
+
+def test_poll_stops_when_cancelled(server):
+    server.handler = gif_sequence(gif(1, 1))
+
+    async def cancel(polling):
+        await asyncio.sleep(0.1)
+        polling.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        poll(server, side_task=cancel)
+    assert len(server.requests) > 0
@@ -0,0 +1,462 @@
+"""
+Response caching for EDS (`/media/<locale>/<endpoint>`) read requests.
+
+Entries are keyed on (host, locale, endpoint, normalized query parameters, user). The user is the userhash of the
+request's `Authorization` header, so one cache can be shared by the clients of several accounts without handing
+out one account's responses to another. Once an entry's TTL has passed, it is
+revalidated via `If-None-Match` if the server sent an `ETag`, so an unchanged response costs a bodiless 304.
+
+:class:`ResponseCache` keeps entries in memory, :class:`DiskResponseCache` persists them in SQLite for sharing
+between processes and across restarts.
+"""
+import re
+import json
+import time
+import zlib
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+
+try:
+    # Python 3
+    from urllib.parse import urlparse, parse_qsl
+except ImportError:
+    # Python 2
+    from urlparse import urlparse, parse_qsl
+
+from requests.structures import CaseInsensitiveDict
+
+from xbox_webapi.api.session import build_response
+
+log = logging.getLogger('xbox.api.cache')
+
+
+XBL_AUTHORIZATION = re.compile(r'^XBL3\.0 x=([^;]*);')
+
+
+def cache_key(url, identity=None):
+    """
+    Get the cache key of an EDS request URL.
+
+    Args:
+        url (str): Fully encoded request URL
+        identity (str): User the request is sent as, see :func:`auth_identity`
+
+    Returns:
+        tuple: (host, locale, endpoint, params, identity) with `params` being a sorted tuple of query pairs, `None`
+        if the URL is not an EDS media endpoint
+    """
+    parsed = urlparse(url)
+    parts = parsed.path.strip('/').split('/')
+    if len(parts) != 3 or parts[0] != 'media':
+        return None
+    params = tuple(sorted(parse_qsl(parsed.query, keep_blank_values=True)))
+    return parsed.netloc.lower(), parts[1], parts[2], params, identity
+
+
+def auth_identity(headers):
+    """
+    Get the user a request is sent as.
+
+    The userhash stays the same when the XSTS-Token gets refreshed, so cached entries survive a token refresh.
+
+    Args:
+        headers (dict): Request headers
+
+    Returns:
+        str: Userhash of an Xbox Live `Authorization` header, the whole header if it has another format, `None`
+        for anonymous requests
+    """
+    authorization = CaseInsensitiveDict(headers or {}).get('Authorization')
+    if not authorization:
+        return None
+    match = XBL_AUTHORIZATION.match(authorization)
+    return match.group(1) if match else authorization
+
+
+class CacheEntry(object):
+    def __init__(self, status_code, reason, headers, content, expires):
+        """
+        Cached response.
+
+        Args:
+            status_code (int): HTTP status code
+            reason (str): HTTP reason phrase
+            headers (dict): Response headers
+            content (bytes): Response body
+            expires (float): Unix timestamp after which the entry needs revalidation
+        """
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+        self.content = content
+        self.expires = expires
+
+    @classmethod
+    def from_response(cls, response, ttl):
+        return cls(response.status_code, response.reason, dict(response.headers), response.content,
+                   time.time() + ttl)
+
+    @property
+    def is_fresh(self):
+        return self.expires > time.time()
+
+    @property
+    def etag(self):
+        return self.headers.get('ETag') or self.headers.get('etag')
+
+    def to_response(self, method, url):
+        """
+        Returns:
+            requests.Response: New response object holding the cached data
+        """
+        return build_response(method, url, self.status_code, self.reason, self.headers, self.content)
+
+
+class CacheStats(object):
+    def __init__(self):
+        """
+        Counters of a response cache.
+
+        Attributes:
+            hits (int): Requests answered from cache without network access
+            misses (int): Cacheable requests that were not cached (or expired without ETag)
+            revalidated (int): Expired entries confirmed unchanged by HTTP 304
+            evictions (int): Entries dropped to stay within the size limit
+        """
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.evictions = 0
+
+    @property
+    def hit_ratio(self):
+        total = self.hits + self.misses + self.revalidated
+        return float(self.hits + self.revalidated) / total if total else 0.0
+
+    def to_dict(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidated': self.revalidated,
+            'evictions': self.evictions,
+            'hit_ratio': self.hit_ratio
+        }
+
+
+class ResponseCache(object):
+    def __init__(self, ttl=300, endpoint_ttls=None, max_entries=10000):
+        """
+        Thread-safe in-memory LRU cache for successful EDS GET responses.
+
+        Entries are kept per user, so a cache may be shared by the clients of several accounts.
+
+        Example:
+            cache = ResponseCache(ttl=300, endpoint_ttls={'details': 3600, 'fields': 86400})
+            client = XboxLiveClient(userhash, token, xuid, cache=cache)
+
+        Args:
+            ttl (float): Seconds a response is served without revalidation, `None` to only cache endpoints listed
+                in `endpoint_ttls`
+            endpoint_ttls (dict): Mapping of endpoint name (e.g. 'details', 'tvchannels') to TTL in seconds,
+                a TTL of `None` disables caching for that endpoint
+            max_entries (int): Maximum number of cached responses
+        """
+        self.ttl = ttl
+        self.endpoint_ttls = dict(endpoint_ttls or {})
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, method, url, headers=None):
+        """
+        Get the cache key of a request, `None` if the request must not be cached.
+
+        Args:
+            method (str): HTTP method
+            url (str): Fully encoded request URL
+            headers (dict): Request headers, the user they authenticate becomes part of the key
+
+        Returns:
+            tuple: Cache key
+        """
+        if method.upper() != 'GET':
+            return None
+        key = cache_key(url, auth_identity(headers))
+        if key is None or self.endpoint_ttl(key[2]) is None:
+            return None
+        return key
+
+    def endpoint_ttl(self, endpoint):
+        return self.endpoint_ttls.get(endpoint, self.ttl)
+
+    def get(self, key):
+        """
+        Look up a cached entry, fresh or expired.
+
+        Args:
+            key (tuple): Cache key
+
+        Returns:
+            CacheEntry: Cached entry or `None`
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        """
+        Store an entry, evict the least recently used entries if needed.
+
+        Args:
+            key (tuple): Cache key
+            entry (CacheEntry): Entry to store
+        """
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def touch(self, key, expires):
+        """
+        Extend the lifetime of an entry, without storing its response again.
+
+        Args:
+            key (tuple): Cache key
+            expires (float): New unix timestamp after which the entry needs revalidation
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.expires = expires
+                self._entries.move_to_end(key)
+
+    def lookup(self, method, url, headers):
+        """
+        Serve a request from cache, or prepare it for revalidation.
+
+        Args:
+            method (str): HTTP method
+            url (str): Fully encoded request URL
+            headers (dict): Request headers, `If-None-Match` gets added to revalidate an expired entry
+
+        Returns:
+            tuple: (key, entry, response) - `response` is set if the request was answered from cache,
+            `key` is `None` if the request is not cacheable
+        """
+        key = self.key(method, url, headers)
+        if key is None:
+            return None, None, None
+
+        entry = self.get(key)
+        if entry is not None and entry.is_fresh:
+            self._count('hits')
+            return key, entry, entry.to_response(method, url)
+
+        if entry is not None and entry.etag:
+            headers['If-None-Match'] = entry.etag
+        else:
+            entry = None
+            self._count('misses')
+        return key, entry, None
+
+    def update(self, key, entry, method, url, response):
+        """
+        Update the cache with the response of a request prepared by `lookup`.
+
+        Args:
+            key (tuple): Cache key returned by `lookup`
+            entry (CacheEntry): Entry returned by `lookup`
+            method (str): HTTP method
+            url (str): Fully encoded request URL
+            response (requests.Response): Received response
+
+        Returns:
+            requests.Response: Response to hand out - the cached one on HTTP 304
+        """
+        if key is None:
+            return response
+
+        ttl = self.endpoint_ttl(key[2])
+        if response.status_code == 304 and entry is not None:
+            self._count('revalidated')
+            entry.expires = time.time() + ttl
+            self.touch(key, entry.expires)
+            return entry.to_response(method, url)
+
+        if entry is not None:
+            # Revalidation returned a new representation
+            self._count('misses')
+        if response.status_code == 200:
+            self.set(key, CacheEntry.from_response(response, ttl))
+        return response
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self.stats, counter, getattr(self.stats, counter) + 1)
+
+    def clear(self):
+        """Drop all entries"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class DiskResponseCache(ResponseCache):
+    ACCESS_UPDATE_INTERVAL = 60.0
+    # Eviction frees space down to this share of `max_size`, so it runs once per batch of inserts, not on each
+    EVICT_TO = 0.9
+    EVICT_BATCH = 256
+
+    def __init__(self, path, ttl=300, endpoint_ttls=None, max_size=512 * 1024 * 1024, compress_level=6):
+        """
+        Persistent cache for successful EDS GET responses, stored in a SQLite database.
+
+        Response bodies are stored zlib-compressed. The database runs in WAL mode, so several processes on one host
+        can read and write the same file concurrently; a restarted worker starts with the cache contents of its
+        predecessors. Once the stored (compressed) size exceeds `max_size`, least recently used entries are evicted.
+        The total size is kept up to date by triggers, so checking it costs no table scan.
+
+        Example:
+            cache = DiskResponseCache('/var/cache/xbox/eds.sqlite', endpoint_ttls={'tvchannels': 86400})
+            client = XboxLiveClient(userhash, token, xuid, cache=cache)
+
+        Args:
+            path (str): Path of the SQLite database file, created if missing
+            ttl (float): Seconds a response is served without revalidation, `None` to only cache endpoints listed
+                in `endpoint_ttls`
+            endpoint_ttls (dict): Mapping of endpoint name (e.g. 'details', 'tvchannels') to TTL in seconds,
+                a TTL of `None` disables caching for that endpoint
+            max_size (int): Maximum size of all stored entries in bytes
+            compress_level (int): zlib compression level, 1 (fastest) to 9 (smallest)
+        """
+        super(DiskResponseCache, self).__init__(ttl, endpoint_ttls)
+        self.path = path
+        self.max_size = max_size
+        self.compress_level = compress_level
+        self._local = threading.local()
+
+        with self._connection() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                'key TEXT PRIMARY KEY, status_code INTEGER, reason TEXT, headers TEXT, content BLOB, '
+                'expires REAL, size INTEGER, accessed REAL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)')
+            conn.execute('CREATE TABLE IF NOT EXISTS responses_size (total INTEGER NOT NULL)')
+            conn.execute('INSERT INTO responses_size (total) SELECT COALESCE(SUM(size), 0) FROM responses '
+                         'WHERE NOT EXISTS (SELECT 1 FROM responses_size)')
+            conn.execute('CREATE TRIGGER IF NOT EXISTS responses_insert AFTER INSERT ON responses BEGIN '
+                         'UPDATE responses_size SET total = total + NEW.size; END')
+            conn.execute('CREATE TRIGGER IF NOT EXISTS responses_delete AFTER DELETE ON responses BEGIN '
+                         'UPDATE responses_size SET total = total - OLD.size; END')
+            conn.execute('CREATE TRIGGER IF NOT EXISTS responses_update AFTER UPDATE OF size ON responses BEGIN '
+                         'UPDATE responses_size SET total = total - OLD.size + NEW.size; END')
+
+    def _connection(self):
+        # sqlite3 connections must not be shared between threads, so every thread opens its own
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30.0)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            # Let INSERT OR REPLACE fire the delete trigger for the replaced row
+            conn.execute('PRAGMA recursive_triggers=ON')
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _serialize_key(key):
+        return json.dumps(key, separators=(',', ':'))
+
+    def get(self, key):
+        conn = self._connection()
+        row = conn.execute(
+            'SELECT status_code, reason, headers, content, expires, accessed FROM responses WHERE key = ?',
+            (self._serialize_key(key),)
+        ).fetchone()
+        if row is None:
+            return None
+
+        status_code, reason, headers, content, expires, accessed = row
+        now = time.time()
+        if now - accessed > self.ACCESS_UPDATE_INTERVAL:
+            # Keep LRU order approximately, without turning every read into a write
+            with conn:
+                conn.execute('UPDATE responses SET accessed = ? WHERE key = ?', (now, self._serialize_key(key)))
+        return CacheEntry(status_code, reason, json.loads(headers), zlib.decompress(content), expires)
+
+    def set(self, key, entry):
+        content = zlib.compress(entry.content, self.compress_level)
+        headers = json.dumps(entry.headers)
+        size = len(content) + len(headers)
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO responses '
+                '(key, status_code, reason, headers, content, expires, size, accessed) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (self._serialize_key(key), entry.status_code, entry.reason, headers, sqlite3.Binary(content),
+                 entry.expires, size, time.time())
+            )
+            self._evict(conn)
+
+    def touch(self, key, expires):
+        conn = self._connection()
+        with conn:
+            conn.execute('UPDATE responses SET expires = ?, accessed = ? WHERE key = ?',
+                         (expires, time.time(), self._serialize_key(key)))
+
+    def _evict(self, conn):
+        total = self.size(conn)
+        if total <= self.max_size:
+            return
+
+        target = self.max_size * self.EVICT_TO
+        evicted = 0
+        while total > target:
+            rows = conn.execute('SELECT key, size FROM responses ORDER BY accessed LIMIT ?',
+                                (self.EVICT_BATCH,)).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if total <= target:
+                    break
+                conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                total -= size
+                evicted += 1
+
+        with self._lock:
+            self.stats.evictions += evicted
+        log.debug('Evicted %i entries from %s' % (evicted, self.path))
+
+    def size(self, conn=None):
+        """
+        Returns:
+            int: Stored size of all entries in bytes
+        """
+        conn = conn or self._connection()
+        return conn.execute('SELECT total FROM responses_size').fetchone()[0]
+
+    def clear(self):
+        """Drop all entries"""
+        conn = self._connection()
+        with conn:
+            conn.execute('DELETE FROM responses')
+
+    def close(self):
+        """Close the database connection of the calling thread"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def __len__(self):
+        return self._connection().execute('SELECT COUNT(*) FROM responses').fetchone()[0]
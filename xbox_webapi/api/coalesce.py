@@ -0,0 +1,93 @@
+"""
+Single-flight execution: concurrent calls with the same key share the work of the first one.
+"""
+import asyncio
+import threading
+
+
+class _Call(object):
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    def __init__(self):
+        """
+        Thread-safe single-flight group.
+
+        While a call for a key is in flight, further calls for the same key wait for it and receive its result
+        (or exception) instead of running their own.
+        """
+        self.coalesced = 0
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        Run `func(*args, **kwargs)` unless a call for `key` is already in flight.
+
+        Args:
+            key (hashable): Identity of the call
+            func (callable): Function to run
+
+        Returns:
+            tuple: (result, shared) - `shared` is `True` if the result came from another caller's call
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result, False
+
+
+class AsyncSingleFlight(object):
+    def __init__(self):
+        """
+        Single-flight group for coroutines running on one event loop.
+
+        Cancelling a waiting caller does not cancel the shared call.
+        """
+        self.coalesced = 0
+        self._calls = {}
+
+    async def do(self, key, coro_func, *args, **kwargs):
+        """
+        Await `coro_func(*args, **kwargs)` unless a call for `key` is already in flight.
+
+        Args:
+            key (hashable): Identity of the call
+            coro_func (callable): Coroutine function to run
+
+        Returns:
+            tuple: (result, shared) - `shared` is `True` if the result came from another caller's call
+        """
+        future = self._calls.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future), True
+
+        future = asyncio.ensure_future(coro_func(*args, **kwargs))
+        self._calls[key] = future
+        future.add_done_callback(lambda f: self._calls.pop(key, None))
+        return await asyncio.shield(future), False
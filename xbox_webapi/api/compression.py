@@ -0,0 +1,145 @@
+"""
+Compressed transfer: `Accept-Encoding` negotiation, response decompression and per-endpoint transfer statistics.
+
+Brotli is supported if the optional `brotli` (or `brotlicffi`) package is installed.
+"""
+import zlib
+import threading
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+from xbox_webapi.api.ratelimit import endpoint_key
+
+ACCEPT_ENCODING = 'gzip, deflate, br' if brotli else 'gzip, deflate'
+
+
+class _ZlibDecoder(object):
+    def __init__(self, wbits):
+        self._obj = zlib.decompressobj(wbits)
+        self._first = wbits == zlib.MAX_WBITS
+
+    def decompress(self, data):
+        if not self._first:
+            return self._obj.decompress(data)
+        self._first = False
+        try:
+            return self._obj.decompress(data)
+        except zlib.error:
+            # Some servers send raw deflate data without zlib header
+            self._obj = zlib.decompressobj(-zlib.MAX_WBITS)
+            return self._obj.decompress(data)
+
+    def flush(self):
+        return self._obj.flush()
+
+
+class _BrotliDecoder(object):
+    def __init__(self):
+        self._obj = brotli.Decompressor()
+
+    def decompress(self, data):
+        process = getattr(self._obj, 'process', None) or self._obj.decompress
+        return process(data)
+
+    def flush(self):
+        return b''
+
+
+class Decompressor(object):
+    def __init__(self, content_encoding):
+        """
+        Incremental decoder for a response body.
+
+        Args:
+            content_encoding (str): Value of the `Content-Encoding` header, may list several encodings
+
+        Raises:
+            ValueError: If an encoding is not supported
+        """
+        self._decoders = []
+        encodings = [e.strip().lower() for e in (content_encoding or '').split(',') if e.strip()]
+        # Encodings are listed in the order they were applied
+        for encoding in reversed(encodings):
+            if encoding in ('gzip', 'x-gzip'):
+                self._decoders.append(_ZlibDecoder(16 + zlib.MAX_WBITS))
+            elif encoding == 'deflate':
+                self._decoders.append(_ZlibDecoder(zlib.MAX_WBITS))
+            elif encoding == 'br' and brotli:
+                self._decoders.append(_BrotliDecoder())
+            elif encoding != 'identity':
+                raise ValueError('Unsupported content encoding: %s' % encoding)
+
+    def decompress(self, data):
+        for decoder in self._decoders:
+            data = decoder.decompress(data)
+        return data
+
+    def flush(self):
+        data = b''
+        for decoder in self._decoders:
+            data = decoder.decompress(data) + decoder.flush()
+        return data
+
+
+def decompress(data, content_encoding):
+    """
+    Args:
+        data (bytes): Response body as transferred
+        content_encoding (str): Value of the `Content-Encoding` header
+
+    Returns:
+        bytes: Decoded body
+    """
+    if not content_encoding:
+        return data
+    decompressor = Decompressor(content_encoding)
+    return decompressor.decompress(data) + decompressor.flush()
+
+
+class TransferStats(object):
+    def __init__(self):
+        """
+        Thread-safe counters of transferred (compressed) and decoded response bytes per host and endpoint.
+        """
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, url, transferred, decoded):
+        """
+        Args:
+            url (str): Request URL
+            transferred (int): Body bytes received over the wire
+            decoded (int): Body bytes after decompression
+        """
+        key = '%s/%s' % endpoint_key(url)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = [0, 0, 0]
+            stats[0] += 1
+            stats[1] += transferred
+            stats[2] += decoded
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: Mapping of 'host/endpoint' to a dict of 'responses', 'transferred_bytes', 'decoded_bytes' and
+            'ratio' (decoded / transferred)
+        """
+        with self._lock:
+            return dict((key, {
+                'responses': responses,
+                'transferred_bytes': transferred,
+                'decoded_bytes': decoded,
+                'ratio': float(decoded) / transferred if transferred else 1.0
+            }) for key, (responses, transferred, decoded) in self._stats.items())
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
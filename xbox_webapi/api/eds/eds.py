@@ -1,4 +1,61 @@
-from xbox_webapi.api.eds.types import ScheduleDetailsField, MediaGroup
+import asyncio
+import logging
+from datetime import timedelta
+from collections import OrderedDict
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
+
+from xbox_webapi.api.eds.epg import EPGDownloader, AsyncEPGDownloader
+from xbox_webapi.api.eds.stream import ItemStreamParser, iter_items, aiter_items
+from xbox_webapi.api.eds.types import ScheduleDetailsField, MediaGroup, MediaItemField, FieldPreset
+from xbox_webapi.api.language import language_registry
+from xbox_webapi.common.exceptions import InvalidRequest
+
+log = logging.getLogger('xbox.api.eds')
+
+
+class DetailsResult(object):
+    def __init__(self, ids, items, failures):
+        """
+        Merged result of :meth:`EDSProvider.get_details_bulk`.
+
+        Args:
+            ids (list): Requested IDs, in input order
+            items (list): Item `dict` for each requested ID (same order), `None` where it failed
+            failures (dict): Mapping of failed ID to a reason string
+        """
+        self.ids = ids
+        self.items = items
+        self.failures = failures
+
+    def __iter__(self):
+        return iter(zip(self.ids, self.items))
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class LocaleResults(object):
+    def __init__(self, results, failures):
+        """
+        Result of :meth:`EDSProvider.fan_out`.
+
+        Args:
+            results (OrderedDict): Mapping of locale (e.g. 'en-US') to the call's result, in input order
+            failures (dict): Mapping of locale to a reason string, for calls that raised
+        """
+        self.results = results
+        self.failures = failures
+
+    def __getitem__(self, locale):
+        return self.results[locale]
+
+    def __iter__(self):
+        return iter(self.results.items())
+
+    def __len__(self):
+        return len(self.results)
+
 
 class EDSProvider(object):
     EDS_URL = "https://eds.xboxlive.com"
@@ -14,19 +71,42 @@ class EDSProvider(object):
     }
 
     SEPERATOR = "."
-
-    def __init__(self, client):
-        self.client = client
-
-    def get_channel_list_download(self, lineup_id):
-        url = self.EDS_URL + "/media/%s/tvchannels?" % self.client.lang.locale
-        params = {"channelLineupId": lineup_id}
-        return self.client.session.get(url, params=params, headers=self.HEADERS_EDS)
-
-    # start/endTime format: "2016-07-11T21:50:00.000Z"
-    def get_schedule_download(self, lineup_id, start_time, end_time, max_items, skip_items):
-        url = self.EDS_URL + "/media/%s/tvchannellineupguide?" % self.client.lang.locale
-        desired = [
+    # Shared cache of base paths per (EDS_URL, locale)
+    _base_paths = {}
+    # Projections sent as `fields` by the media item methods, `None` requests the complete payload
+    FIELD_PRESETS = {
+        FieldPreset.MINIMAL: [
+            MediaItemField.ID,
+            MediaItemField.NAME,
+            MediaItemField.MEDIA_ITEM_TYPE
+        ],
+        FieldPreset.LISTING: [
+            MediaItemField.ID,
+            MediaItemField.NAME,
+            MediaItemField.MEDIA_ITEM_TYPE,
+            MediaItemField.MEDIA_GROUP,
+            MediaItemField.IMAGES,
+            MediaItemField.RELEASE_DATE,
+            MediaItemField.PARENTAL_RATINGS,
+            MediaItemField.GENRES
+        ],
+        FieldPreset.FULL: None
+    }
+    # Projections sent as `desired` by the schedule methods
+    SCHEDULE_FIELD_PRESETS = {
+        FieldPreset.MINIMAL: [
+            ScheduleDetailsField.ID,
+            ScheduleDetailsField.NAME,
+            ScheduleDetailsField.SCHEDULE_INFO
+        ],
+        FieldPreset.LISTING: [
+            ScheduleDetailsField.ID,
+            ScheduleDetailsField.NAME,
+            ScheduleDetailsField.IMAGES,
+            ScheduleDetailsField.PARENT_SERIES,
+            ScheduleDetailsField.SCHEDULE_INFO
+        ],
+        FieldPreset.FULL: [
             ScheduleDetailsField.ID,
             ScheduleDetailsField.NAME,
             ScheduleDetailsField.IMAGES,
@@ -35,73 +115,518 @@ class EDSProvider(object):
             ScheduleDetailsField.PARENT_SERIES,
             ScheduleDetailsField.SCHEDULE_INFO
         ]
+    }
+    DETAILS_CHUNK_SIZE = 10
+    DETAILS_MAX_IDS_LENGTH = 1500
+    BULK_MAX_WORKERS = 8
+    # requests keeps 10 connections per host by default, more workers would not reuse connections
+    FAN_OUT_MAX_WORKERS = 10
+    PAGE_SIZE = 25
+    STREAM_CHUNK_SIZE = 65536
+
+    def __init__(self, client, language=None):
+        """
+        Args:
+            client (XboxLiveClient): Client to send requests with
+            language (XboxLiveLocale): Member of :class:`XboxLiveLanguage` overriding the client's `lang`
+        """
+        self.client = client
+        self.language = language
+
+    @property
+    def locale(self):
+        """str: Locale of the requests, e.g. 'en-US'"""
+        return (self.language or self.client.lang).locale
+
+    @property
+    def base_path(self):
+        """str: Base URL of the locale's media endpoints, e.g. 'https://eds.xboxlive.com/media/en-US'"""
+        key = (self.EDS_URL, self.locale)
+        base_path = self._base_paths.get(key)
+        if base_path is None:
+            base_path = self._base_paths[key] = "%s/media/%s" % key
+        return base_path
+
+    def localized(self, language):
+        """
+        Get a provider for another language, sharing this provider's client, session and connections.
+
+        Args:
+            language (XboxLiveLocale/str): Member of :class:`XboxLiveLanguage`, or its locale / identifier
+
+        Raises:
+            KeyError: If the locale is unknown
+
+        Returns:
+            EDSProvider: Provider bound to `language`
+        """
+        return type(self)(self.client, language_registry.resolve(language))
+
+    def _fan_out_calls(self, languages, func):
+        languages = [language_registry.resolve(language) for language in languages]
+        languages = list(OrderedDict((language.locale, language) for language in languages).values())
+        return [(language.locale, self.localized(language), func) for language in languages]
+
+    def fan_out(self, languages, func, max_workers=None):
+        """
+        Run the same EDS call for several languages concurrently.
+
+        Example:
+            snapshot = client.eds.fan_out(
+                [XboxLiveLanguage.Germany, XboxLiveLanguage.Japan],
+                lambda eds: eds.get_details(ids, MediaGroup.GAME_TYPE).json()
+            )
+            snapshot['ja-JP']
+
+        Args:
+            languages (list): Members of :class:`XboxLiveLanguage`, or their locales / identifiers
+            func (callable): Called with an :class:`EDSProvider` bound to each language
+            max_workers (int): Maximum number of concurrent calls
+
+        Returns:
+            LocaleResults: Results keyed by locale, in input order, and reasons for calls that raised
+        """
+        def run(call):
+            locale, eds, func = call
+            try:
+                return locale, func(eds), None
+            except Exception as e:
+                log.warning('Fan-out call for %s failed: %s' % (locale, e))
+                return locale, None, str(e) or e.__class__.__name__
+
+        calls = self._fan_out_calls(languages, func)
+        with ThreadPoolExecutor(max_workers or self.FAN_OUT_MAX_WORKERS) as executor:
+            return self._merge_locales(executor.map(run, calls))
+
+    @staticmethod
+    def _merge_locales(outcomes):
+        results = OrderedDict()
+        failures = {}
+        for locale, result, error in outcomes:
+            results[locale] = result
+            if error:
+                failures[locale] = error
+        return LocaleResults(results, failures)
+
+    def _fields(self, projection, presets):
+        """
+        Resolve a projection to the value of the `fields` / `desired` query parameter.
+
+        Args:
+            projection (str/list): Member of :class:`FieldPreset`, list of :class:`MediaItemField` /
+                :class:`ScheduleDetailsField` members or an already joined field string
+            presets (dict): Preset table, `FIELD_PRESETS` or `SCHEDULE_FIELD_PRESETS`
+
+        Returns:
+            str: Joined field names, `None` to not restrict the fields
+        """
+        if projection is None:
+            return None
+        if isinstance(projection, (list, tuple)):
+            fields = projection
+        elif projection in presets:
+            fields = presets[projection]
+        else:
+            return projection
+        return self.SEPERATOR.join(fields) if fields else None
+
+    def _project(self, params, projection):
+        fields = self._fields(projection, self.FIELD_PRESETS)
+        if fields:
+            params["fields"] = fields
+        return params
+
+    def _chunk_ids(self, ids, chunk_size=None):
+        """
+        Split IDs into chunks the details endpoint accepts: at most `chunk_size` IDs and `DETAILS_MAX_IDS_LENGTH`
+        characters once joined. Duplicates are requested only once.
+        """
+        chunk_size = chunk_size or self.DETAILS_CHUNK_SIZE
+        chunks = []
+        chunk = []
+        length = 0
+        for id in OrderedDict.fromkeys(ids):
+            added = len(id) + (len(self.SEPERATOR) if chunk else 0)
+            if chunk and (len(chunk) >= chunk_size or length + added > self.DETAILS_MAX_IDS_LENGTH):
+                chunks.append(chunk)
+                chunk = []
+                length = 0
+                added = len(id)
+            chunk.append(id)
+            length += added
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    def _json(self, response):
+        """Decode a response, sharing repeated strings if the client has a :class:`StringPool`"""
+        if self.client.string_pool is not None:
+            return self.client.string_pool.loads(response.content)
+        return response.json()
+
+    def _parse_details_chunk(self, chunk, response):
+        """Returns tuple of (chunk, items, error)"""
+        if response.status_code != 200:
+            return chunk, None, 'HTTP %i' % response.status_code
+        return chunk, self._json(response).get('Items', []), None
+
+    @staticmethod
+    def _merge_details(ids, chunk_results):
+        """
+        Assign returned items to requested IDs, via their 'ID' or any of their 'AlternateIds'.
+        """
+        found = {}
+        failures = {}
+        for chunk, items, error in chunk_results:
+            if error:
+                for id in chunk:
+                    failures[id] = error
+                continue
+
+            by_id = {}
+            for item in items:
+                item_ids = [item.get('ID') or item.get('Id')]
+                item_ids.extend(alt.get('Value') for alt in item.get('AlternateIds', []))
+                for item_id in item_ids:
+                    if item_id:
+                        by_id[str(item_id).lower()] = item
+            for id in chunk:
+                item = by_id.get(id.lower())
+                if item is None:
+                    failures[id] = 'Not returned by server'
+                else:
+                    found[id] = item
+
+        return DetailsResult(list(ids), [found.get(id) for id in ids], failures)
+
+    def _channel_list_request(self, lineup_id):
+        url = self.base_path + "/tvchannels?"
+        params = {"channelLineupId": lineup_id}
+        return url, params
+
+    def get_channel_list_download(self, lineup_id):
+        """
+        Get the channels of a lineup.
+
+        Takes no `projection`: channel items are not media items, neither :class:`FieldPreset` nor the field
+        enums describe their fields.
+
+        Args:
+            lineup_id (str): Channel lineup ID
+
+        Returns:
+            requests.Response: Response with the channels in 'Channels'
+        """
+        url, params = self._channel_list_request(lineup_id)
+        return self.client.session.get(url, params=params, headers=self.HEADERS_EDS)
+
+    def stream_channel_list_download(self, lineup_id, items_key='Channels', model=None):
+        """
+        Decode the channel list of a lineup while it is downloaded, see :meth:`get_channel_list_download`.
+
+        Args:
+            lineup_id (str): Channel lineup ID
+            items_key (str): Key of the item list in the response json
+            model (type): :class:`EDSModel` subclass, e.g. :class:`Channel`, to yield the channels as models that
+                decode their json text on first access
+
+        Raises:
+            InvalidRequest: When the request fails
+            XboxException: When the response is malformed or truncated
+
+        Returns:
+            generator: Yields the channels one by one
+        """
+        url, params = self._channel_list_request(lineup_id)
+        return self._stream_items(url, params, items_key, model)
+
+    def _stream_items(self, url, params, items_key, model=None):
+        """
+        Yield the items of a response as they arrive, without holding the whole body.
+        """
+        response = self.client.session.get(url, params=params, headers=self.HEADERS_EDS, stream=True)
+
+        def chunks():
+            decoded = 0
+            for chunk in response.iter_content(self.STREAM_CHUNK_SIZE):
+                decoded += len(chunk)
+                yield chunk
+            self.client.session.record_transfer(response.url, response, decoded)
+
+        with closing(response):
+            if response.status_code != 200:
+                raise InvalidRequest('Streaming request failed with HTTP %i' % response.status_code, response)
+            for item in iter_items(chunks(), items_key, self._item_parser(items_key, model is not None)):
+                yield model(item) if model else item
+
+    def _page_items(self, response, items_key):
+        """
+        Returns:
+            tuple: (items, total) - `total` is the 'TotalItems' count of the response, `None` if not sent
+        """
+        if response.status_code != 200:
+            raise InvalidRequest('Fetching page failed with HTTP %i' % response.status_code, response)
+        data = self._json(response)
+        total = data.get('TotalItems')
+        return data.get(items_key) or [], total if isinstance(total, int) else None
+
+    @staticmethod
+    def _next_page(skip_items, items, total):
+        """
+        Offset of the page after `items`, `None` if it was the last one.
+
+        The server may return less than the requested number of items per page, so only an empty page or
+        reaching 'TotalItems' ends the iteration.
+        """
+        skip_items += len(items)
+        if not items or (total is not None and skip_items >= total):
+            return None
+        return skip_items
+
+    def _item_parser(self, items_key, raw=False):
+        pool = self.client.string_pool
+        return ItemStreamParser(items_key, pool.object_pairs_hook if pool is not None else None, raw)
+
+    def _paginate(self, fetch_page, page_size, items_key):
+        """
+        Yield the items of all pages, fetching the next page in a background thread while the current one is
+        consumed. Stops after an empty page or once 'TotalItems' items were received.
+
+        Args:
+            fetch_page (callable): Called with (max_items, skip_items), returns :class:`requests.Response`
+            page_size (int): Number of items per request
+            items_key (str): Key of the item list in the response json
+        """
+        with ThreadPoolExecutor(1) as executor:
+            skip_items = 0
+            future = executor.submit(fetch_page, page_size, skip_items)
+            while future:
+                items, total = self._page_items(future.result(), items_key)
+                skip_items = self._next_page(skip_items, items, total)
+                future = executor.submit(fetch_page, page_size, skip_items) if skip_items is not None else None
+                for item in items:
+                    yield item
+
+    def _schedule_request(self, lineup_id, start_time, end_time, max_items, skip_items, projection=None):
+        url = self.base_path + "/tvchannellineupguide?"
+        desired = self._fields(FieldPreset.FULL if projection is None else projection, self.SCHEDULE_FIELD_PRESETS)
         params = {
             "startTime": start_time,
             "endTime": end_time,
             "maxItems": max_items,
             "skipItems": skip_items,
             "channelLineupId": lineup_id,
-            "desired": self.SEPERATOR.join(desired)
+            "desired": desired
         }
+        return url, params
+
+    # start/endTime format: "2016-07-11T21:50:00.000Z"
+    def get_schedule_download(self, lineup_id, start_time, end_time, max_items, skip_items, projection=None):
+        url, params = self._schedule_request(lineup_id, start_time, end_time, max_items, skip_items, projection)
         return self.client.session.get(url, params=params, headers=self.HEADERS_EDS)
 
-    def get_browse_query(self, order_by, max_items, skip_items, **kwargs):
-        url = self.EDS_URL + "/media/%s/browse?" % self.client.lang.locale
+    def stream_schedule_download(self, lineup_id, start_time, end_time, max_items, skip_items, items_key='Channels',
+                                 projection=None, model=None):
+        """
+        Decode a schedule page while it is downloaded, see :meth:`get_schedule_download`.
+
+        Channels are handed out as soon as they are complete, so processing starts before the download finishes
+        and memory use stays independent of the page size.
+
+        Args:
+            lineup_id (str): Channel lineup ID
+            start_time (str): Start of the time range, format: "2016-07-11T21:50:00.000Z"
+            end_time (str): End of the time range, same format
+            max_items (int): Maximum number of channels
+            skip_items (int): Number of channels to skip
+            items_key (str): Key of the item list in the response json
+            projection (str/list): Program fields, member of :class:`FieldPreset` or list of
+                :class:`ScheduleDetailsField` members, default: `FieldPreset.FULL`, an empty list sends no
+                restriction
+            model (type): :class:`EDSModel` subclass, e.g. :class:`Channel`, to yield the channels as models that
+                decode their json text on first access
+
+        Raises:
+            InvalidRequest: When the request fails
+            XboxException: When the response is malformed or truncated
+
+        Returns:
+            generator: Yields the channels one by one
+        """
+        url, params = self._schedule_request(lineup_id, start_time, end_time, max_items, skip_items, projection)
+        return self._stream_items(url, params, items_key, model)
+
+    def iter_schedule_download(self, lineup_id, start_time, end_time, page_size=None, items_key='Channels',
+                               projection=None):
+        """
+        Iterate over the complete schedule of a lineup, see :meth:`get_schedule_download`.
+
+        Pages are requested automatically, the next one already while the current one gets consumed.
+
+        Args:
+            lineup_id (str): Channel lineup ID
+            start_time (str): Start of the time range, format: "2016-07-11T21:50:00.000Z"
+            end_time (str): End of the time range, same format
+            page_size (int): Number of items per request
+            items_key (str): Key of the paged item list in the response json
+            projection (str/list): Program fields, member of :class:`FieldPreset` or list of
+                :class:`ScheduleDetailsField` members, default: `FieldPreset.FULL`, an empty list sends no
+                restriction
+
+        Raises:
+            InvalidRequest: When a page can not be fetched
+
+        Returns:
+            generator: Yields the items of all pages
+        """
+        def fetch_page(max_items, skip_items):
+            return self.get_schedule_download(lineup_id, start_time, end_time, max_items, skip_items, projection)
+
+        return self._paginate(fetch_page, page_size or self.PAGE_SIZE, items_key)
+
+    def download_schedule(self, lineup_id, start_time, end_time, window=timedelta(hours=6), max_workers=8,
+                          progress=None, projection=None):
+        """
+        Download the guide of a lineup for a long time span, see :class:`EPGDownloader`.
+
+        The span is split into windows that are downloaded concurrently, programs returned for several windows
+        are merged.
+
+        Args:
+            lineup_id (str): Channel lineup ID
+            start_time (str/datetime): Start of the time span
+            end_time (str/datetime): End of the time span
+            window (timedelta): Length of the time windows
+            max_workers (int): Maximum number of windows downloaded concurrently
+            progress (callable): Called with (windows_done, windows_total) after each finished window
+            projection (str/list): Program fields, member of :class:`FieldPreset` or list of
+                :class:`ScheduleDetailsField` members, default: `FieldPreset.FULL`, an empty list sends no
+                restriction
+
+        Returns:
+            dict: Merged guide: {'Channels': [...]}, each channel holding its 'Programs'
+        """
+        downloader = EPGDownloader(self, window, max_workers=max_workers, progress=progress, projection=projection)
+        return downloader.download(lineup_id, start_time, end_time)
+
+    def get_browse_query(self, order_by, max_items, skip_items, projection=None, **kwargs):
+        url = self.base_path + "/browse?"
         params = {
             "orderBy": order_by,
             "maxItems": max_items,
             "skipItems": skip_items
         }
+        self._project(params, projection)
         params.update(kwargs)
         return self.client.session.get(url, params=params, headers=self.HEADERS_EDS)
 
-    def get_recommendations(self, desired, **kwargs):
+    def iter_browse_query(self, order_by, page_size=None, items_key='Items', projection=None, **kwargs):
+        """
+        Iterate over all results of a browse query, see :meth:`get_browse_query`.
+
+        Pages are requested automatically, the next one already while the current one gets consumed.
+
+        Args:
+            order_by (str): Sort order
+            page_size (int): Number of items per request
+            items_key (str): Key of the paged item list in the response json
+            projection (str/list): Member of :class:`FieldPreset` or list of :class:`MediaItemField` members,
+                default: complete payload
+            **kwargs: Additional query parameters
+
+        Raises:
+            InvalidRequest: When a page can not be fetched
+
+        Returns:
+            generator: Yields the items of all pages
+        """
+        def fetch_page(max_items, skip_items):
+            return self.get_browse_query(order_by, max_items, skip_items, projection, **kwargs)
+
+        return self._paginate(fetch_page, page_size or self.PAGE_SIZE, items_key)
+
+    def get_recommendations(self, desired, projection=None, **kwargs):
         if isinstance(desired, list):
             desired = self.SEPERATOR.join(desired)
-        url = self.EDS_URL + "/media/%s/recommendations?" % self.client.lang.locale
+        url = self.base_path + "/recommendations?"
         params = {
             "desiredMediaItemTypes": desired
         }
+        self._project(params, projection)
         params.update(kwargs)
         return self.client.session.get(url, params=params, headers=self.HEADERS_EDS)
 
-    def get_related(self, id, desired, media_item_type, **kwargs):
+    def get_related(self, id, desired, media_item_type, projection=None, **kwargs):
         if isinstance(desired, list):
             desired = self.SEPERATOR.join(desired)
-        url = self.EDS_URL + "/media/%s/related?" % self.client.lang.locale
+        url = self.base_path + "/related?"
         params = {
             "id": id,
             "desiredMediaItemTypes": desired,
             "MediaItemType": media_item_type
         }
+        self._project(params, projection)
         params.update(kwargs)
         return self.client.session.get(url, params=params, headers=self.HEADERS_EDS)
 
     def get_fields(self, desired, **kwargs):
         if isinstance(desired, list):
             desired = self.SEPERATOR.join(desired)
-        url = self.EDS_URL + "/media/%s/fields?" % self.client.lang.locale
+        url = self.base_path + "/fields?"
         params = {
             "desired": desired
         }
         params.update(kwargs)
         return self.client.session.get(url, params=params, headers=self.HEADERS_EDS)
 
-    def get_details(self, ids, mediagroup, **kwargs):
+    def get_details(self, ids, mediagroup, projection=None, **kwargs):
         if isinstance(ids, list):
             ids = self.SEPERATOR.join(ids)
-        url = self.EDS_URL + "/media/%s/details?" % self.client.lang.locale
+        url = self.base_path + "/details?"
         params = {
             "ids": ids,
             "MediaGroup": mediagroup
         }
+        self._project(params, projection)
         params.update(kwargs)
         return self.client.session.get(url, params=params, headers=self.HEADERS_EDS)
 
-    def get_crossmediagroup_search(self, search_query, max_items, desired, target_devices, **kwargs):
+    def get_details_bulk(self, ids, mediagroup, chunk_size=None, max_workers=None, projection=None, **kwargs):
+        """
+        Get details for any number of IDs.
+
+        IDs are split into chunks the server accepts (see `DETAILS_CHUNK_SIZE`), chunks are fetched concurrently by
+        up to `max_workers` threads.
+
+        Args:
+            ids (list): IDs to look up
+            mediagroup (str): Member of :class:`MediaGroup`
+            chunk_size (int): Maximum number of IDs per request
+            max_workers (int): Maximum number of concurrent requests
+            projection (str/list): Member of :class:`FieldPreset` or list of :class:`MediaItemField` members,
+                default: complete payload
+            **kwargs: Additional query parameters, passed to :meth:`get_details`
+
+        Returns:
+            DetailsResult: Items in input order and reasons for IDs that could not be fetched
+        """
+        def fetch(chunk):
+            try:
+                return self._parse_details_chunk(chunk, self.get_details(chunk, mediagroup, projection, **kwargs))
+            except Exception as e:
+                log.warning('Fetching details chunk failed: %s' % e)
+                return chunk, None, str(e) or e.__class__.__name__
+
+        chunks = self._chunk_ids(ids, chunk_size)
+        with ThreadPoolExecutor(max_workers or self.BULK_MAX_WORKERS) as executor:
+            results = list(executor.map(fetch, chunks))
+        return self._merge_details(ids, results)
+
+    def get_crossmediagroup_search(self, search_query, max_items, desired, target_devices, projection=None,
+                                   **kwargs):
         if isinstance(desired, list):
             desired = self.SEPERATOR.join(desired)
-        url = self.EDS_URL + "/media/%s/crossMediaGroupSearch?" % self.client.lang.locale
+        url = self.base_path + "/crossMediaGroupSearch?"
         params = {
             "q": search_query,
             "maxItems": max_items,
@@ -109,17 +634,144 @@ class EDSProvider(object):
             "targetDevices": target_devices
 
         }
+        self._project(params, projection)
         params.update(kwargs)
         return self.client.session.get(url, params=params, headers=self.HEADERS_EDS)
 
-    def get_singlemediagroup_search(self, search_query, max_items, media_item_types, **kwargs):
+    def get_singlemediagroup_search(self, search_query, max_items, media_item_types, projection=None, **kwargs):
         if isinstance(media_item_types, list):
             media_item_types = self.SEPERATOR.join(media_item_types)
-        url = self.EDS_URL + "/media/%s/singleMediaGroupSearch?" % self.client.lang.locale
+        url = self.base_path + "/singleMediaGroupSearch?"
         params = {
             "q": search_query,
             "maxItems": max_items,
             "desiredMediaItemTypes": media_item_types
         }
+        self._project(params, projection)
         params.update(kwargs)
         return self.client.session.get(url, params=params, headers=self.HEADERS_EDS)
+
+
+class AsyncEDSProvider(EDSProvider):
+    """
+    EDS provider of :class:`AsyncXboxLiveClient`.
+
+    Plain request methods are inherited and return awaitables; methods combining several requests are overridden
+    with coroutines. The `iter_*` and `stream_*` methods return async iterators, to be used with `async for`.
+    """
+    async def _paginate(self, fetch_page, page_size, items_key):
+        """
+        Yield the items of all pages, requesting the next page while the current one is consumed.
+        Stops after an empty page or once 'TotalItems' items were received.
+
+        Args:
+            fetch_page (callable): Called with (max_items, skip_items), returns an awaitable
+            page_size (int): Number of items per request
+            items_key (str): Key of the item list in the response json
+        """
+        skip_items = 0
+        task = asyncio.ensure_future(fetch_page(page_size, skip_items))
+        try:
+            while task:
+                items, total = self._page_items(await task, items_key)
+                skip_items = self._next_page(skip_items, items, total)
+                task = asyncio.ensure_future(fetch_page(page_size, skip_items)) if skip_items is not None else None
+                for item in items:
+                    yield item
+        finally:
+            if task and not task.done():
+                task.cancel()
+
+    async def _stream_items(self, url, params, items_key, model=None):
+        """
+        Yield the items of a response as they arrive, without holding the whole body.
+        """
+        chunks = self.client.session.iter_content('GET', url, params=params, headers=self.HEADERS_EDS,
+                                                  chunk_size=self.STREAM_CHUNK_SIZE)
+        async for item in aiter_items(chunks, items_key, self._item_parser(items_key, model is not None)):
+            yield model(item) if model else item
+
+    async def download_schedule(self, lineup_id, start_time, end_time, window=timedelta(hours=6), max_workers=8,
+                                progress=None, projection=None):
+        """
+        Download the guide of a lineup for a long time span, see :class:`AsyncEPGDownloader`.
+
+        Args:
+            lineup_id (str): Channel lineup ID
+            start_time (str/datetime): Start of the time span
+            end_time (str/datetime): End of the time span
+            window (timedelta): Length of the time windows
+            max_workers (int): Maximum number of windows downloaded concurrently
+            progress (callable): Called with (windows_done, windows_total) after each finished window
+            projection (str/list): Program fields, member of :class:`FieldPreset` or list of
+                :class:`ScheduleDetailsField` members, default: `FieldPreset.FULL`, an empty list sends no
+                restriction
+
+        Returns:
+            dict: Merged guide: {'Channels': [...]}, each channel holding its 'Programs'
+        """
+        downloader = AsyncEPGDownloader(self, window, max_workers=max_workers, progress=progress, projection=projection)
+        return await downloader.download(lineup_id, start_time, end_time)
+
+    async def fan_out(self, languages, func, max_workers=None):
+        """
+        Run the same EDS call for several languages concurrently, see :meth:`EDSProvider.fan_out`.
+
+        Args:
+            languages (list): Members of :class:`XboxLiveLanguage`, or their locales / identifiers
+            func (callable): Called with an :class:`AsyncEDSProvider` bound to each language, returns an awaitable
+            max_workers (int): Maximum number of concurrent calls
+
+        Returns:
+            LocaleResults: Results keyed by locale, in input order, and reasons for calls that raised
+        """
+        semaphore = asyncio.Semaphore(max_workers or self.FAN_OUT_MAX_WORKERS)
+
+        async def run(call):
+            locale, eds, func = call
+            async with semaphore:
+                try:
+                    return locale, await func(eds), None
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    log.warning('Fan-out call for %s failed: %s' % (locale, e))
+                    return locale, None, str(e) or e.__class__.__name__
+
+        calls = self._fan_out_calls(languages, func)
+        return self._merge_locales(await asyncio.gather(*[run(call) for call in calls]))
+
+    async def get_details_bulk(self, ids, mediagroup, chunk_size=None, max_workers=None, projection=None, **kwargs):
+        """
+        Get details for any number of IDs.
+
+        IDs are split into chunks the server accepts (see `DETAILS_CHUNK_SIZE`), up to `max_workers` chunks are
+        fetched concurrently.
+
+        Args:
+            ids (list): IDs to look up
+            mediagroup (str): Member of :class:`MediaGroup`
+            chunk_size (int): Maximum number of IDs per request
+            max_workers (int): Maximum number of concurrent requests
+            projection (str/list): Member of :class:`FieldPreset` or list of :class:`MediaItemField` members,
+                default: complete payload
+            **kwargs: Additional query parameters, passed to :meth:`get_details`
+
+        Returns:
+            DetailsResult: Items in input order and reasons for IDs that could not be fetched
+        """
+        semaphore = asyncio.Semaphore(max_workers or self.BULK_MAX_WORKERS)
+
+        async def fetch(chunk):
+            async with semaphore:
+                try:
+                    response = await self.get_details(chunk, mediagroup, projection, **kwargs)
+                    return self._parse_details_chunk(chunk, response)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    log.warning('Fetching details chunk failed: %r' % e)
+                    return chunk, None, str(e) or e.__class__.__name__
+
+        results = await asyncio.gather(*[fetch(chunk) for chunk in self._chunk_ids(ids, chunk_size)])
+        return self._merge_details(ids, results)
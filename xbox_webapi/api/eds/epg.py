@@ -0,0 +1,231 @@
+"""
+Bulk download of electronic program guides (EPG) via :meth:`EDSProvider.get_schedule_download`.
+
+The requested time span is split into windows which are downloaded concurrently, each with automatic paging.
+Programs crossing a window boundary are returned for both windows, they get merged into a single entry.
+"""
+import asyncio
+import logging
+import threading
+from datetime import datetime, timedelta
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from dateutil.parser import parse
+from dateutil.tz import tzutc
+from six import string_types
+
+log = logging.getLogger('xbox.api.eds.epg')
+
+TIME_FORMAT = "%Y-%m-%dT%H:%M:%S.000Z"
+
+
+def to_datetime(value):
+    """
+    Args:
+        value (str/datetime): Timestamp like "2016-07-11T21:50:00.000Z" or :class:`datetime`, naive is taken as UTC
+
+    Returns:
+        datetime: Timezone-aware timestamp in UTC
+    """
+    if isinstance(value, string_types):
+        value = parse(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=tzutc())
+    return value.astimezone(tzutc())
+
+
+def format_time(value):
+    """Format a timestamp the way `get_schedule_download` expects it"""
+    return to_datetime(value).strftime(TIME_FORMAT)
+
+
+def split_time_range(start_time, end_time, window):
+    """
+    Split a time range into consecutive windows.
+
+    Args:
+        start_time (str/datetime): Start of the range
+        end_time (str/datetime): End of the range
+        window (timedelta): Length of a window, the last one may be shorter
+
+    Returns:
+        list: List of (start, end) tuples of formatted timestamps
+    """
+    start = to_datetime(start_time)
+    end = to_datetime(end_time)
+    windows = []
+    while start < end:
+        window_end = min(start + window, end)
+        windows.append((format_time(start), format_time(window_end)))
+        start = window_end
+    return windows
+
+
+def channel_id(channel):
+    return channel.get('Id') or channel.get('ID') or channel.get('ChannelId')
+
+
+def program_start(program):
+    schedule = program.get('ScheduleInformation') or {}
+    return program.get('StartTime') or schedule.get('StartTime')
+
+
+def program_end(program):
+    schedule = program.get('ScheduleInformation') or {}
+    return program.get('EndTime') or schedule.get('EndTime')
+
+
+def program_key(program):
+    """Identity of a program slot: (program id, start time)"""
+    return program.get('Id') or program.get('ID'), program_start(program)
+
+
+class GuideMerger(object):
+    CHANNELS_KEY = 'Channels'
+    PROGRAMS_KEY = 'Programs'
+
+    def __init__(self):
+        """
+        Thread-safe merge of schedule channel items into one guide, dropping duplicate program slots.
+        """
+        self.channels = OrderedDict()
+        self._programs = {}
+        self._lock = threading.Lock()
+
+    def add(self, channels):
+        """
+        Args:
+            channels (iter): Channel items as returned by the schedule download
+        """
+        with self._lock:
+            for channel in channels:
+                cid = channel_id(channel)
+                if cid not in self.channels:
+                    merged = dict(channel)
+                    merged[self.PROGRAMS_KEY] = []
+                    self.channels[cid] = merged
+                    self._programs[cid] = set()
+
+                seen = self._programs[cid]
+                for program in channel.get(self.PROGRAMS_KEY) or []:
+                    key = program_key(program)
+                    if key not in seen:
+                        seen.add(key)
+                        self.channels[cid][self.PROGRAMS_KEY].append(program)
+
+    def guide(self):
+        """
+        Returns:
+            dict: Merged guide, shaped like a schedule response: {'Channels': [...]}, programs sorted by start
+        """
+        with self._lock:
+            for channel in self.channels.values():
+                channel[self.PROGRAMS_KEY].sort(key=lambda p: to_datetime(program_start(p) or datetime.min))
+            return {self.CHANNELS_KEY: list(self.channels.values())}
+
+
+class EPGDownloader(object):
+    def __init__(self, eds, window=timedelta(hours=6), page_size=None, max_workers=8, progress=None, projection=None):
+        """
+        Download the guide of a lineup for a long time span, with concurrent requests.
+
+        Args:
+            eds (EDSProvider): EDS provider to download with
+            window (timedelta): Length of the time windows the span is split into
+            page_size (int): Number of channels per request
+            max_workers (int): Maximum number of windows downloaded concurrently
+            progress (callable): Called with (windows_done, windows_total) after each finished window
+            projection (str/list): Program fields, see :meth:`EDSProvider.iter_schedule_download`
+        """
+        self.eds = eds
+        self.window = window
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.progress = progress
+        self.projection = projection
+
+    def _report(self, done, total):
+        if self.progress:
+            self.progress(done, total)
+
+    def download(self, lineup_id, start_time, end_time):
+        """
+        Download and merge the guide.
+
+        Args:
+            lineup_id (str): Channel lineup ID
+            start_time (str/datetime): Start of the time span
+            end_time (str/datetime): End of the time span
+
+        Raises:
+            InvalidRequest: When a page can not be fetched
+
+        Returns:
+            dict: Merged guide: {'Channels': [...]}, each channel holding its 'Programs'
+        """
+        merger = GuideMerger()
+        windows = split_time_range(start_time, end_time, self.window)
+        self._download_windows(lineup_id, windows, lambda window, channels: merger.add(channels))
+        return merger.guide()
+
+    def _download_windows(self, lineup_id, windows, handle):
+        """
+        Download windows concurrently, call `handle(window, channels)` for each one as it finishes.
+        """
+        def fetch(window):
+            return list(self.eds.iter_schedule_download(lineup_id, window[0], window[1], self.page_size,
+                                                        projection=self.projection))
+
+        self._report(0, len(windows))
+        if not windows:
+            return
+        with ThreadPoolExecutor(self.max_workers) as executor:
+            futures = dict((executor.submit(fetch, window), window) for window in windows)
+            for done, future in enumerate(as_completed(futures), 1):
+                handle(futures[future], future.result())
+                self._report(done, len(windows))
+
+
+class AsyncEPGDownloader(EPGDownloader):
+    """
+    :class:`EPGDownloader` for :class:`AsyncEDSProvider`, `download` is a coroutine.
+    """
+    async def download(self, lineup_id, start_time, end_time):
+        """
+        Download and merge the guide.
+
+        Args:
+            lineup_id (str): Channel lineup ID
+            start_time (str/datetime): Start of the time span
+            end_time (str/datetime): End of the time span
+
+        Raises:
+            InvalidRequest: When a page can not be fetched
+
+        Returns:
+            dict: Merged guide: {'Channels': [...]}, each channel holding its 'Programs'
+        """
+        merger = GuideMerger()
+        windows = split_time_range(start_time, end_time, self.window)
+        await self._download_windows(lineup_id, windows, lambda window, channels: merger.add(channels))
+        return merger.guide()
+
+    async def _download_windows(self, lineup_id, windows, handle):
+        semaphore = asyncio.Semaphore(self.max_workers)
+
+        async def fetch(window):
+            async with semaphore:
+                return window, [channel async for channel in
+                                self.eds.iter_schedule_download(lineup_id, window[0], window[1], self.page_size,
+                                                                projection=self.projection)]
+
+        self._report(0, len(windows))
+        tasks = [asyncio.ensure_future(fetch(window)) for window in windows]
+        try:
+            for done, task in enumerate(asyncio.as_completed(tasks), 1):
+                handle(*(await task))
+                self._report(done, len(windows))
+        finally:
+            for task in tasks:
+                task.cancel()
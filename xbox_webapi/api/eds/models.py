@@ -0,0 +1,250 @@
+"""
+Typed, lightweight views on EDS items.
+
+A model wraps the item as received - parsed dict or raw json text - without copying it. The json text is only
+decoded when a field is first read, nested fields like images, ratings or the parent series are turned into
+models on first access. Instances use `__slots__`, so wrapping an item costs a few dozen bytes.
+
+Example:
+    for channel in client.eds.stream_channel_list_download(lineup_id, model=Channel):
+        print(channel.id, channel.name)
+"""
+import json
+
+from xbox_webapi.api.eds.epg import to_datetime
+from xbox_webapi.api.eds.types import MediaItemType, MediaGroup, MediaItemField, ScheduleDetailsField
+
+MEDIA_ITEM_GROUPS = {}
+for _group, _types in (
+    (MediaGroup.GAME_TYPE, (
+        MediaItemType.XBOX360_GAME, MediaItemType.XBOX_GAME_TRIAL, MediaItemType.XBOX360_GAME_CONTENT,
+        MediaItemType.XBOX360_GAME_DEMO, MediaItemType.XBOX_THEME, MediaItemType.XBOX_ORIGINAL_GAME,
+        MediaItemType.XBOX_GAMER_TILE, MediaItemType.XBOX_ARCADE_GAME, MediaItemType.XBOX_GAME_CONSUMABLE,
+        MediaItemType.XBOX_GAME_VIDEO, MediaItemType.XBOX_GAME_TRAILER, MediaItemType.XBOX_BUNDLE,
+        MediaItemType.XBOX_XNA_GAME, MediaItemType.XBOX_MARKETPLACE, MediaItemType.AVATAR_ITEM,
+        MediaItemType.MOBILE_GAME, MediaItemType.XBOX_MOBILE_PDLC, MediaItemType.XBOX_MOBILE_CONSUMABLE,
+        MediaItemType.WEB_GAME, MediaItemType.METRO_GAME, MediaItemType.METRO_GAME_CONTENT,
+        MediaItemType.METRO_GAME_CONSUMABLE, MediaItemType.XBOXONE_GAME, MediaItemType.XBOXONE_GAME_DEMO,
+        MediaItemType.XBOXONE_CONSUMABLE, MediaItemType.XBOXONE_DURABLE)),
+    (MediaGroup.APP_TYPE, (MediaItemType.XBOX_APP, MediaItemType.XBOXONE_APP)),
+    (MediaGroup.MOVIE_TYPE, ('Movie',)),
+    (MediaGroup.TV_TYPE, (MediaItemType.TV_SHOW, MediaItemType.TV_EPISODE, MediaItemType.TV_SERIES,
+                          MediaItemType.TV_SEASON)),
+    (MediaGroup.MUSIC_TYPE, (MediaItemType.MUSIC_ALBUM, MediaItemType.MUSIC_TRACK, MediaItemType.MUSIC_VIDEO)),
+    (MediaGroup.MUSIC_ARTIST_TYPE, (MediaItemType.MUSIC_ARTIST,)),
+    (MediaGroup.WEB_VIDEO_TYPE, (MediaItemType.WEB_VIDEO, MediaItemType.WEB_VIDEO_COLLECTION)),
+    (MediaGroup.ENHANCED_CONTENT_TYPE, (
+        MediaItemType.GAME_LAYER, MediaItemType.GAME_ACTIVITY, MediaItemType.APP_ACTIVITY,
+        MediaItemType.VIDEO_LAYER, MediaItemType.VIDEO_ACTIVITY, MediaItemType.XBOXONE_ACTIVITY,
+        MediaItemType.XBOXONE_NATIVE_APP)),
+    (MediaGroup.SUBSCRIPTION_TYPE, (MediaItemType.SUBSCRIPTION,))
+):
+    for _type in _types:
+        MEDIA_ITEM_GROUPS[_type] = _group
+
+
+class Field(object):
+    def __init__(self, *keys, **kwargs):
+        """
+        Descriptor reading a field of the wrapped item.
+
+        Args:
+            *keys (str): Json keys to try, in order
+            model (type/str): :class:`EDSModel` subclass to wrap the value in, decoded on first access. Name of a
+                class of this module for models declared later, e.g. a model referring to itself
+            many (bool): The value is a list of `model` items
+        """
+        self.keys = keys
+        self.model = kwargs.get('model')
+        self.many = kwargs.get('many', False)
+
+    def __get__(self, obj, owner):
+        if obj is None:
+            return self
+
+        data = obj.data
+        value = None
+        for key in self.keys:
+            value = data.get(key)
+            if value is not None:
+                break
+        if self.model is None or value is None:
+            return value
+
+        decoded = obj._decoded
+        if decoded is None:
+            decoded = obj._decoded = {}
+        if self not in decoded:
+            # Resolved on every decode, the descriptor is shared by all instances and threads
+            model = self.model
+            if not isinstance(model, type):
+                model = globals()[model]
+            decoded[self] = [model(v) for v in value] if self.many else model(value)
+        return decoded[self]
+
+
+class EDSModel(object):
+    __slots__ = ('_raw', '_data', '_decoded')
+
+    def __init__(self, raw):
+        """
+        Base class of the EDS item models.
+
+        Args:
+            raw (dict/str/bytes): Parsed item or its json text
+        """
+        self._raw = raw
+        self._data = raw if isinstance(raw, dict) else None
+        self._decoded = None
+
+    @classmethod
+    def wrap(cls, items):
+        """
+        Args:
+            items (iter): Parsed items or their json text
+
+        Returns:
+            generator: Yields a model per item
+        """
+        return (cls(item) for item in items)
+
+    @property
+    def raw(self):
+        """The item as passed in"""
+        return self._raw
+
+    @property
+    def data(self):
+        """The decoded item"""
+        if self._data is None:
+            raw = self._raw.decode('utf-8') if isinstance(self._raw, bytes) else self._raw
+            self._data = json.loads(raw)
+        return self._data
+
+    def get(self, key, default=None):
+        """Read any field of the item, by json key"""
+        return self.data.get(key, default)
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.data == other.data
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '<%s %r>' % (type(self).__name__, getattr(self, 'id', None))
+
+
+class Image(EDSModel):
+    __slots__ = ()
+
+    id = Field('ID', 'Id')
+    url = Field('Url')
+    resize_url = Field('ResizeUrl')
+    purpose = Field('Purpose')
+    width = Field('Width')
+    height = Field('Height')
+
+
+class ParentalRating(EDSModel):
+    __slots__ = ()
+
+    id = Field('RatingId')
+    rating = Field('Rating')
+    system = Field('RatingSystem')
+    localized_details = Field('LocalizedDetails')
+
+
+class ScheduleInformation(EDSModel):
+    __slots__ = ()
+
+    start_time = Field('StartTime')
+    end_time = Field('EndTime')
+
+    @property
+    def start(self):
+        """datetime: Start of the airing, `None` if missing"""
+        return to_datetime(self.start_time) if self.start_time else None
+
+    @property
+    def end(self):
+        """datetime: End of the airing, `None` if missing"""
+        return to_datetime(self.end_time) if self.end_time else None
+
+    @property
+    def duration(self):
+        """timedelta: Length of the airing, `None` if start or end is missing"""
+        start, end = self.start, self.end
+        return end - start if start and end else None
+
+
+class MediaItem(EDSModel):
+    __slots__ = ()
+
+    id = Field('ID', ScheduleDetailsField.ID)
+    name = Field(ScheduleDetailsField.NAME)
+    description = Field(ScheduleDetailsField.DESCRIPTION)
+    media_item_type = Field('MediaItemType')
+    release_date = Field('ReleaseDate')
+    images = Field(ScheduleDetailsField.IMAGES, model=Image, many=True)
+    parental_rating = Field(MediaItemField.PARENTAL_RATING, model=ParentalRating)
+    parental_ratings = Field(MediaItemField.PARENTAL_RATINGS, model=ParentalRating, many=True)
+    parent_series = Field(ScheduleDetailsField.PARENT_SERIES, model='MediaItem')
+
+    @property
+    def media_group(self):
+        """str: Member of :class:`MediaGroup`, derived from the media item type if not sent"""
+        return self.data.get('MediaGroup') or MEDIA_ITEM_GROUPS.get(self.media_item_type)
+
+    def image(self, purpose):
+        """
+        Args:
+            purpose (str): Image purpose, e.g. 'BoxArt' or 'Logo'
+
+        Returns:
+            Image: First image with the given purpose, `None` if there is none
+        """
+        for image in self.images or []:
+            if image.purpose == purpose:
+                return image
+        return None
+
+
+class ScheduleEntry(MediaItem):
+    """
+    Program slot of a channel, as returned by `tvchannellineupguide` with the :class:`ScheduleDetailsField` fields.
+    """
+    __slots__ = ()
+
+    schedule_information = Field(ScheduleDetailsField.SCHEDULE_INFO, model=ScheduleInformation)
+
+    @property
+    def start(self):
+        """datetime: Start of the airing"""
+        start_time = self.data.get('StartTime') or (self.schedule_information and self.schedule_information.start_time)
+        return to_datetime(start_time) if start_time else None
+
+    @property
+    def end(self):
+        """datetime: End of the airing"""
+        end_time = self.data.get('EndTime') or (self.schedule_information and self.schedule_information.end_time)
+        return to_datetime(end_time) if end_time else None
+
+
+class Channel(EDSModel):
+    __slots__ = ()
+
+    id = Field('Id', 'ID', 'ChannelId')
+    name = Field('Name')
+    call_sign = Field('CallSign')
+    channel_number = Field('ChannelNumber')
+    images = Field('Images', model=Image, many=True)
+    programs = Field('Programs', model=ScheduleEntry, many=True)
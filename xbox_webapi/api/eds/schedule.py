@@ -0,0 +1,199 @@
+"""
+In-memory index over downloaded TV schedules, for "what's on" queries.
+
+Programs are kept per channel, sorted by start time, with a segment tree holding the maximum end time of every
+range of programs. A query bisects to the programs starting before its end and descends only into ranges that
+still hold a program ending after its start, so point and range queries cost O((k + 1) log n) for k results -
+long-running programs do not slow down queries for other times.
+"""
+import threading
+from bisect import bisect_left, bisect_right
+
+from xbox_webapi.api.eds.epg import GuideMerger, channel_id, program_start, program_end, program_key, to_datetime
+
+
+def _timestamp(value):
+    return to_datetime(value).timestamp()
+
+
+class _ChannelIndex(object):
+    def __init__(self, channel):
+        self.channel = channel
+        self.pending = []
+        self.starts = []
+        self.ends = []
+        self.programs = []
+        # Segment tree of maximum end times, leaves start at `_size`
+        self._tree = []
+        self._size = 0
+
+    def build(self):
+        if not self.pending:
+            return
+        slots = sorted(list(zip(self.starts, self.ends, self.programs)) + self.pending, key=lambda slot: slot[0])
+        self.pending = []
+        self.starts = [slot[0] for slot in slots]
+        self.ends = [slot[1] for slot in slots]
+        self.programs = [slot[2] for slot in slots]
+        self._build_tree()
+
+    def _build_tree(self):
+        size = 1
+        while size < len(self.ends):
+            size *= 2
+        tree = [float('-inf')] * (2 * size)
+        tree[size:size + len(self.ends)] = self.ends
+        for node in range(size - 1, 0, -1):
+            tree[node] = max(tree[2 * node], tree[2 * node + 1])
+        self._tree = tree
+        self._size = size
+
+    def remove(self, keys):
+        """Drop programs whose :func:`program_key` is in `keys`"""
+        self.build()
+        kept = [i for i, program in enumerate(self.programs) if program_key(program) not in keys]
+        if len(kept) == len(self.programs):
+            return
+        # Filtering keeps the order, no sorting needed
+        self.starts = [self.starts[i] for i in kept]
+        self.ends = [self.ends[i] for i in kept]
+        self.programs = [self.programs[i] for i in kept]
+        self._build_tree()
+
+    def overlapping(self, start, end):
+        """Programs airing at any time within [start, end), ordered by start time"""
+        self.build()
+        hi = bisect_left(self.starts, end) if end > start else bisect_right(self.starts, start)
+        tree, size = self._tree, self._size
+        result = []
+        # Depth-first over the ranges left of `hi`, left to right, skipping ranges ending before `start`
+        stack = [(1, 0, size)] if hi else []
+        while stack:
+            node, lo, node_hi = stack.pop()
+            if lo >= hi or tree[node] <= start:
+                continue
+            if node >= size:
+                result.append(self.programs[lo])
+                continue
+            middle = (lo + node_hi) // 2
+            stack.append((2 * node + 1, middle, node_hi))
+            stack.append((2 * node, lo, middle))
+        return result
+
+
+class ScheduleStore(object):
+    CHANNELS_KEY = GuideMerger.CHANNELS_KEY
+    PROGRAMS_KEY = GuideMerger.PROGRAMS_KEY
+
+    def __init__(self):
+        """
+        Queryable store of schedule data from `tvchannellineupguide` responses.
+
+        Programs need their start and end time, i.e. the `ScheduleDetailsField.SCHEDULE_INFO` field.
+        Indexes are (re)built lazily on the first query after adding programs.
+
+        Example:
+            store = ScheduleStore()
+            store.add(client.eds.download_schedule(lineup_id, start, end))
+            store.at('channel-id', '2016-07-11T21:50:00.000Z')
+        """
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    def add(self, guide):
+        """
+        Add a schedule response.
+
+        Args:
+            guide (dict): Parsed json of :meth:`EDSProvider.get_schedule_download` or the result of
+                :meth:`EDSProvider.download_schedule`
+        """
+        for channel in guide.get(self.CHANNELS_KEY) or []:
+            self.add_programs(channel, channel.get(self.PROGRAMS_KEY) or [])
+
+    def add_programs(self, channel, programs):
+        """
+        Add programs of a channel, programs without start or end time are skipped.
+
+        Args:
+            channel (dict): Channel item, its metadata is kept from the first call
+            programs (list): Program items
+        """
+        cid = channel_id(channel)
+        slots = []
+        for program in programs:
+            start, end = program_start(program), program_end(program)
+            if start and end:
+                slots.append((_timestamp(start), _timestamp(end), program))
+
+        with self._lock:
+            index = self._channels.get(cid)
+            if index is None:
+                metadata = dict((k, v) for k, v in channel.items() if k != self.PROGRAMS_KEY)
+                index = self._channels[cid] = _ChannelIndex(metadata)
+            index.pending.extend(slots)
+
+    def remove_programs(self, channel_id, programs):
+        """
+        Remove programs of a channel, matched by ID and start time.
+
+        Args:
+            channel_id (str): Channel ID
+            programs (list): Program items to remove
+        """
+        keys = set(program_key(program) for program in programs)
+        with self._lock:
+            index = self._channels.get(channel_id)
+            if index is not None and keys:
+                index.remove(keys)
+
+    def channels(self):
+        """
+        Returns:
+            dict: Mapping of channel ID to channel metadata
+        """
+        with self._lock:
+            return dict((cid, index.channel) for cid, index in self._channels.items())
+
+    def at(self, channel_id, when):
+        """
+        Get the programs airing on a channel at a point in time.
+
+        Args:
+            channel_id (str): Channel ID
+            when (str/datetime): Point in time
+
+        Returns:
+            list: Program items, usually one, empty if nothing is scheduled
+        """
+        when = _timestamp(when)
+        with self._lock:
+            index = self._channels.get(channel_id)
+            return index.overlapping(when, when) if index else []
+
+    def between(self, start, end, channel_ids=None):
+        """
+        Get everything airing within a time range.
+
+        Args:
+            start (str/datetime): Start of the range
+            end (str/datetime): End of the range (exclusive)
+            channel_ids (list): Restrict the query to these channels, default: all
+
+        Returns:
+            dict: Mapping of channel ID to list of program items, ordered by start time. Channels without
+            programs in the range are omitted.
+        """
+        start, end = _timestamp(start), _timestamp(end)
+        result = {}
+        with self._lock:
+            for cid in (channel_ids if channel_ids is not None else list(self._channels)):
+                index = self._channels.get(cid)
+                programs = index.overlapping(start, end) if index else []
+                if programs:
+                    result[cid] = programs
+        return result
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(index.programs) + len(index.pending) for index in self._channels.values())
@@ -0,0 +1,302 @@
+"""
+Incremental decoding of large EDS responses like `tvchannellineupguide` and `tvchannels`.
+
+The items of the response's item list are decoded and handed out one by one while the body is still arriving,
+so memory use depends on the size of a single item instead of the whole response.
+"""
+import re
+import json
+import codecs
+
+from xbox_webapi.common.exceptions import XboxException
+
+WHITESPACE = re.compile(r'\s*')
+# Characters that matter when looking for the end of a value: outside of strings, within strings, after a scalar
+STRUCTURE = re.compile(r'[\[\]{}"]')
+STRING_END = re.compile(r'["\\]')
+SCALAR_END = re.compile(r'[\s,\]}]')
+
+
+class _State(object):
+    START = 0
+    KEY = 1
+    COLON = 2
+    VALUE = 3
+    AFTER_VALUE = 4
+    ITEMS_START = 5
+    ITEM = 6
+    AFTER_ITEM = 7
+    DONE = 8
+
+
+class _ValueScanner(object):
+    def __init__(self):
+        """
+        Finds the end of a json value arriving in pieces, every character is looked at only once.
+
+        Tracks bracket depth and whether the scan position is within a string or after an escape character,
+        so decoding can wait until a value is complete instead of being retried on every chunk.
+        """
+        self.reset()
+
+    def reset(self):
+        self.started = False
+        self.scalar = False
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+
+    def scan(self, text, pos, final=False):
+        """
+        Continue the scan with `text[pos:]`, which follows the text of the previous calls.
+
+        Args:
+            text (str): Text containing the value or its continuation
+            pos (int): Offset to continue at, the start of the value on the first call
+            final (bool): Whether no more text follows
+
+        Returns:
+            int: Offset after the end of the value in `text`, `None` if the value continues after `text`
+        """
+        if not self.started:
+            self.started = True
+            self.scalar = text[pos] not in '{["'
+        if self.scalar:
+            # Numbers and literals end at the next delimiter, or with the stream
+            match = SCALAR_END.search(text, pos)
+            if match:
+                return match.start()
+            return len(text) if final else None
+
+        while True:
+            if self.escape:
+                if pos >= len(text):
+                    return None
+                pos += 1
+                self.escape = False
+            match = (STRING_END if self.in_string else STRUCTURE).search(text, pos)
+            if match is None:
+                return None
+            char, pos = match.group(), match.end()
+            if self.in_string:
+                if char == '\\':
+                    self.escape = True
+                else:
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char in '[{':
+                self.depth += 1
+            else:
+                self.depth -= 1
+            if self.depth == 0 and not self.in_string:
+                return pos
+
+
+class ItemStreamParser(object):
+    def __init__(self, items_key, object_pairs_hook=None, raw=False):
+        """
+        Push parser for a json object whose list at `items_key` is decoded item by item.
+
+        Other members of the object are collected in `document`. With `raw`, items are handed out as their json
+        text without decoding them, e.g. to wrap them in :class:`EDSModel` views that decode on first access.
+        Raw items are not validated.
+
+        Example:
+            parser = ItemStreamParser('Channels')
+            for chunk in response.iter_content(65536):
+                for channel in parser.feed(chunk):
+                    ...
+            parser.close()
+
+        Args:
+            items_key (str): Key of the item list
+            object_pairs_hook (callable): Passed to :class:`json.JSONDecoder`, e.g.
+                :meth:`StringPool.object_pairs_hook`
+            raw (bool): Hand out items as json text instead of decoded
+        """
+        self.items_key = items_key
+        self.raw = raw
+        self.document = {}
+        self._decoder = json.JSONDecoder(object_pairs_hook=object_pairs_hook)
+        self._text = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._pos = 0
+        self._state = _State.START
+        self._key = None
+        self._scanner = _ValueScanner()
+        # Pieces of a value that is not complete yet, `None` if the parser is not waiting for one
+        self._chunks = None
+        # End of the value at the current position, once known
+        self._value_end = None
+
+    def feed(self, data):
+        """
+        Add received data.
+
+        Args:
+            data (bytes): Next chunk of the response body
+
+        Raises:
+            XboxException: On malformed json
+
+        Returns:
+            list: Items completed by this chunk
+        """
+        self._append(self._text.decode(data), final=False)
+        return self._parse(final=False)
+
+    def close(self):
+        """
+        Signal the end of the body.
+
+        Raises:
+            XboxException: If the body is truncated or malformed
+
+        Returns:
+            list: Remaining items
+        """
+        self._append(self._text.decode(b'', final=True), final=True)
+        items = self._parse(final=True)
+        if self._state != _State.DONE:
+            raise XboxException('Truncated json stream')
+        return items
+
+    def _skip_whitespace(self):
+        self._pos = WHITESPACE.match(self._buffer, self._pos).end()
+        return self._pos < len(self._buffer)
+
+    def _expect(self, chars):
+        char = self._buffer[self._pos]
+        if char not in chars:
+            raise XboxException('Unexpected %r at offset %i of json stream, expected one of %r' %
+                                (char, self._pos, chars))
+        self._pos += 1
+        return char
+
+    def _append(self, text, final):
+        if self._chunks is None:
+            self._buffer = self._buffer[self._pos:] + text
+            self._pos = 0
+            return
+
+        # Within an incomplete value: only scan the new text, join the pieces once the value is complete
+        self._chunks.append(text)
+        end = self._scanner.scan(text, 0, final)
+        if end is None:
+            if final:
+                raise XboxException('Truncated json stream')
+            return
+        self._value_end = sum(len(chunk) for chunk in self._chunks[:-1]) + end
+        self._buffer = ''.join(self._chunks)
+        self._pos = 0
+        self._chunks = None
+
+    def _decode(self, final, raw=False):
+        """Decode the value at the current position or with `raw` cut out its text, `None` if it is incomplete"""
+        end = self._value_end
+        if end is None:
+            end = self._scanner.scan(self._buffer, self._pos, final)
+            if end is None:
+                if final:
+                    raise XboxException('Truncated json stream')
+                self._chunks = [self._buffer[self._pos:]]
+                self._buffer = ''
+                self._pos = 0
+                return None, False
+
+        self._scanner.reset()
+        self._value_end = None
+        if raw:
+            value = self._buffer[self._pos:end]
+            self._pos = end
+            return value, True
+        try:
+            value, stop = self._decoder.raw_decode(self._buffer, self._pos)
+        except ValueError:
+            stop = None
+        if stop != end:
+            raise XboxException('Malformed json stream at offset %i' % self._pos)
+        self._pos = end
+        return value, True
+
+    def _parse(self, final):
+        items = []
+        while self._state != _State.DONE and self._skip_whitespace():
+            state = self._state
+            if state == _State.START:
+                self._expect('{')
+                self._state = _State.KEY
+            elif state == _State.KEY:
+                if self._buffer[self._pos] == '}':
+                    self._pos += 1
+                    self._state = _State.DONE
+                    continue
+                key, complete = self._decode(final)
+                if not complete:
+                    break
+                self._key = key
+                self._state = _State.COLON
+            elif state == _State.COLON:
+                self._expect(':')
+                self._state = _State.ITEMS_START if self._key == self.items_key else _State.VALUE
+            elif state == _State.VALUE:
+                value, complete = self._decode(final)
+                if not complete:
+                    break
+                self.document[self._key] = value
+                self._state = _State.AFTER_VALUE
+            elif state == _State.AFTER_VALUE:
+                self._state = _State.KEY if self._expect(',}') == ',' else _State.DONE
+            elif state == _State.ITEMS_START:
+                if self._buffer[self._pos] == 'n':
+                    # "Channels": null
+                    self._state = _State.VALUE
+                    continue
+                self._expect('[')
+                self._state = _State.ITEM
+            elif state == _State.ITEM:
+                if self._buffer[self._pos] == ']':
+                    self._pos += 1
+                    self._state = _State.AFTER_VALUE
+                    continue
+                item, complete = self._decode(final, self.raw)
+                if not complete:
+                    break
+                items.append(item)
+                self._state = _State.AFTER_ITEM
+            elif state == _State.AFTER_ITEM:
+                self._state = _State.ITEM if self._expect(',]') == ',' else _State.AFTER_VALUE
+        return items
+
+
+def iter_items(chunks, items_key, parser=None):
+    """
+    Yield the items of a json response as its chunks arrive.
+
+    Args:
+        chunks (iter): Chunks of the response body, e.g. :meth:`requests.Response.iter_content`
+        items_key (str): Key of the item list
+        parser (ItemStreamParser): Parser to use, to access its `document` afterwards
+
+    Raises:
+        XboxException: On malformed or truncated json
+    """
+    parser = parser or ItemStreamParser(items_key)
+    for chunk in chunks:
+        for item in parser.feed(chunk):
+            yield item
+    for item in parser.close():
+        yield item
+
+
+async def aiter_items(chunks, items_key, parser=None):
+    """
+    Async version of :func:`iter_items`, for chunks from an async iterator.
+    """
+    parser = parser or ItemStreamParser(items_key)
+    async for chunk in chunks:
+        for item in parser.feed(chunk):
+            yield item
+    for item in parser.close():
+        yield item
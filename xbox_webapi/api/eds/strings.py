@@ -0,0 +1,155 @@
+"""
+Deduplication of repeated strings in decoded EDS payloads.
+
+Catalog and schedule results repeat the same keys and values over and over: field names, media item types,
+rating systems, genres, channel names, image URLs. :class:`StringPool` makes equal strings share one object,
+so a large in-memory catalog keeps each distinct value only once.
+"""
+import sys
+import json
+import threading
+
+from six import string_types
+
+
+class StringPool(object):
+    def __init__(self, max_length=256, max_strings=1000000):
+        """
+        Thread-safe pool of shared strings.
+
+        Example:
+            pool = StringPool()
+            client = XboxLiveClient(userhash, token, xuid, string_pool=pool)
+            guide = client.eds.download_schedule(lineup_id, start, end)
+            print(pool.report())
+
+        Args:
+            max_length (int): Longer strings (e.g. descriptions) are not pooled, they rarely repeat
+            max_strings (int): Maximum number of distinct strings kept, once reached only existing ones are shared
+        """
+        self.max_length = max_length
+        self.max_strings = max_strings
+        self.lookups = 0
+        self.deduplicated = 0
+        self.bytes_saved = 0
+        self._strings = {}
+        self._lock = threading.Lock()
+
+    def _share(self, value, counts):
+        if len(value) > self.max_length:
+            return value
+        counts[0] += 1
+        shared = self._strings.get(value)
+        if shared is None:
+            if len(self._strings) < self.max_strings:
+                shared = self._strings.setdefault(value, value)
+            else:
+                return value
+        if shared is not value:
+            counts[1] += 1
+            counts[2] += sys.getsizeof(value)
+        return shared
+
+    def _count(self, counts):
+        with self._lock:
+            self.lookups += counts[0]
+            self.deduplicated += counts[1]
+            self.bytes_saved += counts[2]
+
+    def intern(self, value):
+        """
+        Args:
+            value (str): String to share
+
+        Returns:
+            str: The pooled string equal to `value`
+        """
+        counts = [0, 0, 0]
+        value = self._share(value, counts)
+        self._count(counts)
+        return value
+
+    def object_pairs_hook(self, pairs):
+        """
+        `object_pairs_hook` for :mod:`json`, builds a dict with pooled keys and string values.
+        """
+        counts = [0, 0, 0]
+        share = self._share
+        result = {}
+        for key, value in pairs:
+            if isinstance(value, string_types):
+                value = share(value, counts)
+            elif isinstance(value, list):
+                for i, element in enumerate(value):
+                    if isinstance(element, string_types):
+                        value[i] = share(element, counts)
+            result[share(key, counts)] = value
+        self._count(counts)
+        return result
+
+    def loads(self, data):
+        """
+        Decode json with pooled strings.
+
+        Args:
+            data (str/bytes): Json text
+
+        Returns:
+            object: Decoded json
+        """
+        if isinstance(data, bytes):
+            data = data.decode('utf-8')
+        return json.loads(data, object_pairs_hook=self.object_pairs_hook)
+
+    def dedupe(self, obj):
+        """
+        Pool the strings of already decoded json, in place.
+
+        Args:
+            obj (dict/list): Decoded json
+
+        Returns:
+            object: `obj`, or the pooled string if `obj` is a string
+        """
+        counts = [0, 0, 0]
+        obj = self._dedupe(obj, counts)
+        self._count(counts)
+        return obj
+
+    def _dedupe(self, obj, counts):
+        if isinstance(obj, string_types):
+            return self._share(obj, counts)
+        if isinstance(obj, dict):
+            items = [(self._share(key, counts), self._dedupe(value, counts)) for key, value in obj.items()]
+            obj.clear()
+            obj.update(items)
+        elif isinstance(obj, list):
+            for i, value in enumerate(obj):
+                obj[i] = self._dedupe(value, counts)
+        return obj
+
+    def report(self):
+        """
+        Memory report of the pool.
+
+        Returns:
+            dict: 'strings': distinct strings pooled, 'pool_bytes': their size, 'lookups': strings checked,
+            'deduplicated': duplicates replaced by a pooled string, 'bytes_saved': size of the replaced duplicates
+        """
+        with self._lock:
+            strings = list(self._strings)
+            return {
+                'strings': len(strings),
+                'pool_bytes': sum(sys.getsizeof(s) for s in strings),
+                'lookups': self.lookups,
+                'deduplicated': self.deduplicated,
+                'bytes_saved': self.bytes_saved
+            }
+
+    def clear(self):
+        """Drop all pooled strings, strings in use by decoded items stay valid"""
+        with self._lock:
+            self._strings.clear()
+
+    def __len__(self):
+        return len(self._strings)
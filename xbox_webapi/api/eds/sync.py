@@ -0,0 +1,305 @@
+"""
+Incremental EPG sync: keep a guide up to date without downloading the whole schedule on every refresh.
+
+The time span is split into windows aligned to the window length, so consecutive syncs share window boundaries.
+A window is downloaded again only if it was never fetched, its TTL passed or it is close to the current time,
+where late schedule changes are most likely. A content hash per (lineup, window) detects unchanged windows, only
+programs that actually differ are reported and applied.
+"""
+import json
+import time
+import hashlib
+import logging
+import threading
+from functools import partial
+from datetime import datetime, timedelta
+
+from dateutil.tz import tzutc
+
+from xbox_webapi.api.eds.epg import EPGDownloader, AsyncEPGDownloader, GuideMerger, channel_id, program_key, \
+    format_time, to_datetime
+
+log = logging.getLogger('xbox.api.eds.sync')
+
+EPOCH = datetime(1970, 1, 1, tzinfo=tzutc())
+
+
+def content_hash(data):
+    """
+    Args:
+        data (dict/list): Parsed json
+
+    Returns:
+        str: Hash of the content, independent of key order
+    """
+    return hashlib.sha1(json.dumps(data, sort_keys=True, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+
+def aligned_windows(start_time, end_time, window):
+    """
+    Split a time range into windows aligned to multiples of `window` since the unix epoch.
+
+    Args:
+        start_time (str/datetime): Start of the range
+        end_time (str/datetime): End of the range
+        window (timedelta): Length of a window
+
+    Returns:
+        list: List of (start, end) tuples of formatted timestamps, covering at least the requested range
+    """
+    start = to_datetime(start_time)
+    end = to_datetime(end_time)
+    current = EPOCH + window * ((start - EPOCH) // window)
+    windows = []
+    while current < end:
+        windows.append((format_time(current), format_time(current + window)))
+        current += window
+    return windows
+
+
+class EPGChanges(object):
+    def __init__(self):
+        """
+        Result of a sync.
+
+        Attributes:
+            added (list): (channel_id, program) tuples of new programs
+            changed (list): (channel_id, old_program, new_program) tuples of modified programs
+            removed (list): (channel_id, program) tuples of programs that disappeared
+            fetched (list): Windows downloaded with changed content
+            unchanged (list): Windows downloaded with identical content
+            skipped (list): Windows that were still fresh and not downloaded
+        """
+        self.added = []
+        self.changed = []
+        self.removed = []
+        self.fetched = []
+        self.unchanged = []
+        self.skipped = []
+
+    def __bool__(self):
+        return bool(self.added or self.changed or self.removed)
+
+    __nonzero__ = __bool__
+
+
+class _WindowState(object):
+    def __init__(self, end, digest, fetched_at, keys):
+        self.end = end
+        self.digest = digest
+        self.fetched_at = fetched_at
+        self.keys = keys
+
+
+class _ProgramState(object):
+    def __init__(self, digest, program):
+        self.digest = digest
+        self.program = program
+        self.windows = set()
+
+
+class EPGSync(EPGDownloader):
+    def __init__(self, eds, window=timedelta(hours=6), ttl=timedelta(hours=6), near_now=timedelta(hours=3),
+                 page_size=None, max_workers=8, progress=None, store=None, projection=None):
+        """
+        Incrementally synced guide of one or more lineups.
+
+        :class:`ScheduleStore` indexes programs by channel ID only, so with a `store` all syncs must be for the same
+        lineup.
+
+        Example:
+            sync = EPGSync(client.eds, store=ScheduleStore())
+            changes = sync.sync(lineup_id, now, now + timedelta(days=7))
+            # Later, only stale windows get downloaded again
+            changes = sync.sync(lineup_id, now, now + timedelta(days=7))
+
+        Args:
+            eds (EDSProvider): EDS provider to download with
+            window (timedelta): Length of the time windows the span is split into
+            ttl (timedelta): Age after which a window is downloaded again
+            near_now (timedelta): Windows overlapping this distance around the current time are always downloaded
+            page_size (int): Number of channels per request
+            max_workers (int): Maximum number of windows downloaded concurrently
+            progress (callable): Called with (windows_done, windows_total) after each finished window
+            store (ScheduleStore): Store to apply the changes of a single lineup to, if any
+            projection (str/list): Program fields, see :meth:`EDSProvider.iter_schedule_download`
+        """
+        super(EPGSync, self).__init__(eds, window, page_size, max_workers, progress, projection)
+        self.ttl = ttl
+        self.near_now = near_now
+        self.store = store
+        self._store_lineup = None
+        self._windows = {}
+        self._programs = {}
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    def plan(self, lineup_id, start_time, end_time, now=None):
+        """
+        Get the windows a sync would download.
+
+        Args:
+            lineup_id (str): Channel lineup ID
+            start_time (str/datetime): Start of the time span
+            end_time (str/datetime): End of the time span
+            now (datetime): Current time, for testing
+
+        Returns:
+            tuple: (stale, fresh) lists of (start, end) windows
+        """
+        now = to_datetime(now or datetime.now(tzutc()))
+        stale, fresh = [], []
+        with self._lock:
+            for window in aligned_windows(start_time, end_time, self.window):
+                state = self._windows.get((lineup_id, window[0]))
+                near = to_datetime(window[0]) < now + self.near_now and to_datetime(window[1]) > now - self.near_now
+                expired = state is None or time.time() - state.fetched_at >= self.ttl.total_seconds()
+                (stale if near or expired else fresh).append(window)
+        return stale, fresh
+
+    def sync(self, lineup_id, start_time, end_time):
+        """
+        Download stale windows and apply their changes.
+
+        Windows ending before `start_time` are dropped, their programs are reported as removed.
+
+        Args:
+            lineup_id (str): Channel lineup ID
+            start_time (str/datetime): Start of the time span
+            end_time (str/datetime): End of the time span
+
+        Raises:
+            InvalidRequest: When a page can not be fetched
+            ValueError: When the `store` already holds another lineup
+
+        Returns:
+            EPGChanges: Changes since the previous sync
+        """
+        self._bind_store(lineup_id)
+        changes = EPGChanges()
+        stale, changes.skipped = self.plan(lineup_id, start_time, end_time)
+        self._download_windows(lineup_id, stale, partial(self._apply, lineup_id, changes=changes))
+        self._expire(lineup_id, start_time, changes)
+        self._update_store(lineup_id, changes)
+        return changes
+
+    def guide(self, lineup_id):
+        """
+        Returns:
+            dict: Current guide of a lineup: {'Channels': [...]}, each channel holding its 'Programs'
+        """
+        merger = GuideMerger()
+        with self._lock:
+            channels = {}
+            for (lineup, cid, _, _), state in self._programs.items():
+                if lineup == lineup_id:
+                    channels.setdefault(cid, []).append(state.program)
+            merger.add(dict(self._channels[(lineup_id, cid)], **{GuideMerger.PROGRAMS_KEY: programs})
+                       for cid, programs in channels.items())
+        return merger.guide()
+
+    def _apply(self, lineup_id, window, channels, changes):
+        digest = content_hash(channels)
+        with self._lock:
+            state = self._windows.get((lineup_id, window[0]))
+            if state is not None and state.digest == digest:
+                state.fetched_at = time.time()
+                changes.unchanged.append(window)
+                return
+
+            programs = {}
+            for channel in channels:
+                cid = channel_id(channel)
+                self._channels[(lineup_id, cid)] = dict(
+                    (k, v) for k, v in channel.items() if k != GuideMerger.PROGRAMS_KEY
+                )
+                for program in channel.get(GuideMerger.PROGRAMS_KEY) or []:
+                    programs[(lineup_id, cid) + program_key(program)] = program
+
+            self._replace_window(window[0], state.keys if state else set(), programs, changes)
+            self._windows[(lineup_id, window[0])] = _WindowState(window[1], digest, time.time(), set(programs))
+            changes.fetched.append(window)
+
+    def _replace_window(self, window_start, old_keys, programs, changes):
+        for key in old_keys - set(programs):
+            state = self._programs[key]
+            state.windows.discard(window_start)
+            if not state.windows:
+                del self._programs[key]
+                changes.removed.append((key[1], state.program))
+
+        for key, program in programs.items():
+            digest = content_hash(program)
+            state = self._programs.get(key)
+            if state is None:
+                state = self._programs[key] = _ProgramState(digest, program)
+                changes.added.append((key[1], program))
+            elif state.digest != digest:
+                changes.changed.append((key[1], state.program, program))
+                state.digest, state.program = digest, program
+            state.windows.add(window_start)
+
+    def _expire(self, lineup_id, start_time, changes):
+        start = to_datetime(start_time)
+        with self._lock:
+            for (lineup, window_start), state in list(self._windows.items()):
+                if lineup == lineup_id and to_datetime(state.end) <= start:
+                    del self._windows[(lineup, window_start)]
+                    self._replace_window(window_start, state.keys, {}, changes)
+
+    def _bind_store(self, lineup_id):
+        if self.store is None:
+            return
+        with self._lock:
+            if self._store_lineup is None:
+                self._store_lineup = lineup_id
+            elif self._store_lineup != lineup_id:
+                raise ValueError('Store of this sync holds lineup %s, can not add lineup %s' %
+                                 (self._store_lineup, lineup_id))
+
+    def _update_store(self, lineup_id, changes):
+        if self.store is None:
+            return
+        # One store call per channel, each call re-filters the channel index
+        removed, added = {}, {}
+        for cid, program in changes.removed + [(cid, old) for cid, old, _ in changes.changed]:
+            removed.setdefault(cid, []).append(program)
+        for cid, program in changes.added + [(cid, new) for cid, _, new in changes.changed]:
+            added.setdefault(cid, []).append(program)
+
+        # Removals first: a changed program is removed and added under the same key
+        for cid, programs in removed.items():
+            self.store.remove_programs(cid, programs)
+        with self._lock:
+            channels = dict((cid, self._channels[(lineup_id, cid)]) for cid in added)
+        for cid, programs in added.items():
+            self.store.add_programs(channels[cid], programs)
+
+
+class AsyncEPGSync(EPGSync, AsyncEPGDownloader):
+    """
+    :class:`EPGSync` for :class:`AsyncEDSProvider`, `sync` is a coroutine.
+    """
+    async def sync(self, lineup_id, start_time, end_time):
+        """
+        Download stale windows and apply their changes, see :meth:`EPGSync.sync`.
+
+        Args:
+            lineup_id (str): Channel lineup ID
+            start_time (str/datetime): Start of the time span
+            end_time (str/datetime): End of the time span
+
+        Raises:
+            InvalidRequest: When a page can not be fetched
+            ValueError: When the `store` already holds another lineup
+
+        Returns:
+            EPGChanges: Changes since the previous sync
+        """
+        self._bind_store(lineup_id)
+        changes = EPGChanges()
+        stale, changes.skipped = self.plan(lineup_id, start_time, end_time)
+        await self._download_windows(lineup_id, stale, partial(self._apply, lineup_id, changes=changes))
+        self._expire(lineup_id, start_time, changes)
+        self._update_store(lineup_id, changes)
+        return changes
@@ -95,6 +95,51 @@ class ScheduleDetailsField(Enum):
     PARENT_SERIES = "ParentSeries"
     SCHEDULE_INFO = "ScheduleInformation"
 
+class MediaItemField(Enum):
+    """
+    Fields of media items, for projections via the `projection` parameter of :class:`EDSProvider` methods.
+    Includes the :class:`ScheduleDetailsField` fields.
+    """
+    ID = "ID"
+    NAME = "Name"
+    REDUCED_NAME = "ReducedName"
+    SORT_NAME = "SortName"
+    DESCRIPTION = "Description"
+    REDUCED_DESCRIPTION = "ReducedDescription"
+    MEDIA_ITEM_TYPE = "MediaItemType"
+    MEDIA_GROUP = "MediaGroup"
+    IMAGES = "Images"
+    RELEASE_DATE = "ReleaseDate"
+    DURATION = "Duration"
+    GENRES = "Genres"
+    PARENTAL_RATING = "ParentalRating"
+    PARENTAL_RATINGS = "ParentalRatings"
+    RATING = "AllTimeAverageRating"
+    RATING_COUNT = "AllTimeRatingCount"
+    ALTERNATE_IDS = "AlternateIds"
+    TITLE_ID = "TitleId"
+    DEVELOPER = "DeveloperName"
+    PUBLISHER = "PublisherName"
+    PARENT_SERIES = "ParentSeries"
+    PARENT_SEASON = "ParentSeason"
+    SEASON_NUMBER = "SeasonNumber"
+    EPISODE_NUMBER = "EpisodeNumber"
+    SCHEDULE_INFO = "ScheduleInformation"
+    PROVIDERS = "Providers"
+    AVAILABILITIES = "Availabilities"
+
+class FieldPreset(Enum):
+    """
+    Named projections, see `EDSProvider.FIELD_PRESETS`
+
+    MINIMAL: Identity only, for scans over IDs
+    LISTING: What a list or grid view shows
+    FULL: Complete payload
+    """
+    MINIMAL = "minimal"
+    LISTING = "listing"
+    FULL = "full"
+
 class Domain(Enum):
     XBOX_360 = "Xbox360"
     XBOX_ONE = "Modern"
@@ -46,4 +46,128 @@ class XboxLiveLanguage(object):
     Switzerland_FR = XboxLiveLocale("Switzerland (FR)", "CH", "fr_CH", "fr-CH")
     United_Arab_Emirates = XboxLiveLocale("United Arab Emirates", "AE", "en_AE", "en-AE")
     United_States = XboxLiveLocale("United States", "US", "en_US", "en-US")
-    Ireland = XboxLiveLocale("Ireland", "IE", "en_IE", "en-IE")
\ No newline at end of file
+    Ireland = XboxLiveLocale("Ireland", "IE", "en_IE", "en-IE")
+
+class XboxLiveLanguageRegistry(object):
+    # Short IDs shared by several locales, mapped to the locale returned by `by_short_id`
+    PRIMARY_LOCALES = {
+        'CA': 'en-CA',
+        'CH': 'de-CH',
+        'NL': 'nl-NL'
+    }
+
+    def __init__(self, languages=XboxLiveLanguage):
+        """
+        Index of :class:`XboxLiveLanguage` for constant-time lookups.
+
+        Locales and identifiers are matched case-insensitively and interchangeably, so 'de-DE', 'de_DE' and
+        'DE-de' all resolve to `XboxLiveLanguage.Germany`.
+
+        Example:
+            language = language_registry['en_GB']
+            client = XboxLiveClient(userhash, token, xuid, language=language)
+
+        Args:
+            languages (class): Class holding :class:`XboxLiveLocale` attributes
+        """
+        self.languages = [value for value in vars(languages).values() if isinstance(value, XboxLiveLocale)]
+        self._by_locale = {}
+        self._by_name = {}
+        self._by_short_id = {}
+        for language in self.languages:
+            self._by_locale[self.normalize(language.locale)] = language
+            self._by_locale[self.normalize(language.identifier)] = language
+            self._by_name[language.name.lower()] = language
+            self._by_short_id.setdefault(language.short_id.upper(), []).append(language)
+
+        self._primary = {}
+        for short_id, candidates in self._by_short_id.items():
+            primary = self.PRIMARY_LOCALES.get(short_id)
+            self._primary[short_id] = self._by_locale[self.normalize(primary)] if primary else candidates[0]
+
+    @staticmethod
+    def normalize(locale):
+        return locale.strip().replace('_', '-').lower()
+
+    def get(self, locale, default=None):
+        """
+        Look up a language by locale ('de-DE') or identifier ('de_DE').
+
+        Args:
+            locale (str): Locale or identifier
+            default (object): Returned if the locale is unknown
+
+        Returns:
+            XboxLiveLocale: The language
+        """
+        return self._by_locale.get(self.normalize(locale), default)
+
+    def by_name(self, name, default=None):
+        """
+        Args:
+            name (str): Display name, e.g. 'Great Britain'
+            default (object): Returned if the name is unknown
+
+        Returns:
+            XboxLiveLocale: The language
+        """
+        return self._by_name.get(name.lower(), default)
+
+    def by_short_id(self, short_id, default=None):
+        """
+        Look up a language by market short ID, e.g. 'DE'.
+
+        Some short IDs are shared, e.g. 'CA' by en-CA and fr-CA, they resolve to the entry of `PRIMARY_LOCALES`.
+        Use :meth:`all_by_short_id` to get every match.
+
+        Args:
+            short_id (str): Short ID
+            default (object): Returned if the short ID is unknown
+
+        Returns:
+            XboxLiveLocale: The language
+        """
+        return self._primary.get(short_id.upper(), default)
+
+    def all_by_short_id(self, short_id):
+        """
+        Args:
+            short_id (str): Short ID
+
+        Returns:
+            list: All languages of the short ID, in definition order
+        """
+        return list(self._by_short_id.get(short_id.upper(), []))
+
+    def resolve(self, language):
+        """
+        Args:
+            language (XboxLiveLocale/str): Language, or its locale / identifier
+
+        Raises:
+            KeyError: If the locale is unknown
+
+        Returns:
+            XboxLiveLocale: The language
+        """
+        if isinstance(language, XboxLiveLocale):
+            return language
+        return self[language]
+
+    def __getitem__(self, locale):
+        language = self.get(locale)
+        if language is None:
+            raise KeyError(locale)
+        return language
+
+    def __contains__(self, locale):
+        return self.normalize(locale) in self._by_locale
+
+    def __iter__(self):
+        return iter(self.languages)
+
+    def __len__(self):
+        return len(self.languages)
+
+
+language_registry = XboxLiveLanguageRegistry()
@@ -0,0 +1,230 @@
+"""
+Configurable, shareable HTTP connection pools.
+
+A single :class:`ConnectionPools` instance can be handed to several clients (and authentication managers), they will
+then all reuse the same keep-alive connections instead of setting up new TLS sessions each.
+"""
+import time
+import logging
+import threading
+
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+log = logging.getLogger('xbox.api.pool')
+
+
+class PoolConfig(object):
+    def __init__(self, pool_size=100, max_connections=None, keepalive_timeout=60.0):
+        """
+        Connection pool settings for a single host.
+
+        Args:
+            pool_size (int): Number of idle keep-alive connections kept per host
+            max_connections (int): Hard limit of concurrent connections per host, requests wait for a free
+                connection once it is reached. `None` for no limit - surplus connections get closed after use.
+            keepalive_timeout (float): Seconds an idle connection is kept before it gets closed instead of reused,
+                `None` to keep it until the server drops it
+        """
+        self.pool_size = pool_size
+        self.max_connections = max_connections
+        self.keepalive_timeout = keepalive_timeout
+
+
+class ConnectionStats(object):
+    def __init__(self):
+        """
+        Thread-safe counters of newly established vs. reused connections, per host.
+        """
+        self._lock = threading.Lock()
+        self._new = {}
+        self._reused = {}
+
+    def record(self, host, reused):
+        """
+        Count a connection handed out for a request.
+
+        Args:
+            host (str): Hostname the connection belongs to
+            reused (bool): `True` if an established keep-alive connection was used
+        """
+        counter = self._reused if reused else self._new
+        with self._lock:
+            counter[host] = counter.get(host, 0) + 1
+
+    def snapshot(self):
+        """
+        Get the current counters.
+
+        Returns:
+            dict: Mapping of hostname to dict with keys 'new' and 'reused'
+        """
+        with self._lock:
+            return dict(
+                (host, {'new': self._new.get(host, 0), 'reused': self._reused.get(host, 0)})
+                for host in set(self._new) | set(self._reused)
+            )
+
+    def reset(self):
+        """Reset all counters"""
+        with self._lock:
+            self._new.clear()
+            self._reused.clear()
+
+
+def _tracking_pool_class(base, config, stats):
+    """
+    Subclass a urllib3 connection pool, to expire idle connections and count connection reuse.
+    """
+    class TrackingConnectionPool(base):
+        def _get_conn(self, timeout=None):
+            conn = super(TrackingConnectionPool, self)._get_conn(timeout=timeout)
+            idle_since = getattr(conn, '_idle_since', None)
+            if conn.sock is not None and config.keepalive_timeout is not None and idle_since is not None and \
+                    time.time() - idle_since > config.keepalive_timeout:
+                log.debug('Closing connection to %s, idle for more than %ss' % (self.host, config.keepalive_timeout))
+                # Connection gets re-established on first use
+                conn.close()
+            stats.record(self.host, reused=conn.sock is not None)
+            return conn
+
+        def _put_conn(self, conn):
+            if conn is not None:
+                conn._idle_since = time.time()
+            super(TrackingConnectionPool, self)._put_conn(conn)
+
+    return TrackingConnectionPool
+
+
+class XboxLiveAdapter(HTTPAdapter):
+    def __init__(self, config, stats):
+        """
+        Transport adapter for :class:`requests.Session`, applying a :class:`PoolConfig`.
+
+        Args:
+            config (PoolConfig): Pool settings
+            stats (ConnectionStats): Counters to update
+        """
+        self.pool_config = config
+        self.stats = stats
+        maxsize = config.max_connections or config.pool_size
+        super(XboxLiveAdapter, self).__init__(pool_maxsize=maxsize, pool_block=config.max_connections is not None)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super(XboxLiveAdapter, self).init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _tracking_pool_class(HTTPConnectionPool, self.pool_config, self.stats),
+            'https': _tracking_pool_class(HTTPSConnectionPool, self.pool_config, self.stats)
+        }
+
+
+class ConnectionPools(object):
+    def __init__(self, default=None, hosts=None):
+        """
+        Connection pools to share between :class:`XboxLiveClient` and :class:`AuthenticationManager` instances.
+
+        Example:
+            pools = ConnectionPools(hosts={EDSProvider.EDS_URL: PoolConfig(pool_size=200)})
+            client = XboxLiveClient(userhash, token, xuid, pools=pools)
+            print(pools.stats.snapshot())
+
+        Args:
+            default (PoolConfig): Settings for any host without explicit configuration
+            hosts (dict): Mapping of base URL (e.g. 'https://eds.xboxlive.com') to :class:`PoolConfig`
+        """
+        self.default = default or PoolConfig()
+        self.hosts = dict(hosts or {})
+        self.stats = ConnectionStats()
+        self._lock = threading.Lock()
+        self._adapters = {}
+        self._connector = None
+
+    def adapter(self, prefix):
+        """
+        Get the transport adapter for an URL prefix, create it on first use.
+
+        Args:
+            prefix (str): Base URL from `hosts` or a scheme like 'https://'
+
+        Returns:
+            XboxLiveAdapter: The shared adapter
+        """
+        with self._lock:
+            if prefix not in self._adapters:
+                config = self.hosts.get(prefix, self.default)
+                self._adapters[prefix] = XboxLiveAdapter(config, self.stats)
+            return self._adapters[prefix]
+
+    def mount(self, session):
+        """
+        Mount the shared adapters on a :class:`requests.Session`.
+
+        Args:
+            session (requests.Session): Session to set up
+
+        Returns:
+            requests.Session: The passed session
+        """
+        session.mount('http://', self.adapter('http://'))
+        session.mount('https://', self.adapter('https://'))
+        for prefix in self.hosts:
+            session.mount(prefix, self.adapter(prefix))
+        return session
+
+    def connector(self):
+        """
+        Get the shared :class:`aiohttp.TCPConnector`, create it on first use.
+
+        aiohttp applies one configuration to all hosts, so the `default` :class:`PoolConfig` is used.
+        Must be called while the event loop is running.
+
+        Returns:
+            aiohttp.TCPConnector: The shared connector
+        """
+        with self._lock:
+            if self._connector is None or self._connector.closed:
+                self._connector = aiohttp.TCPConnector(
+                    limit=0,
+                    limit_per_host=self.default.max_connections or 0,
+                    keepalive_timeout=self.default.keepalive_timeout
+                )
+            return self._connector
+
+    def trace_config(self):
+        """
+        Create an :class:`aiohttp.TraceConfig` feeding `stats`.
+
+        Returns:
+            aiohttp.TraceConfig: Trace config to pass to :class:`aiohttp.ClientSession`
+        """
+        async def on_request_start(session, context, params):
+            context.host = params.url.host
+
+        async def on_connection_create_end(session, context, params):
+            self.stats.record(context.host, reused=False)
+
+        async def on_connection_reuseconn(session, context, params):
+            self.stats.record(context.host, reused=True)
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace_config
+
+    def close(self):
+        """Close all pooled connections of the requests adapters"""
+        with self._lock:
+            for adapter in self._adapters.values():
+                adapter.close()
+            self._adapters.clear()
+
+    async def close_async(self):
+        """Close the shared aiohttp connector"""
+        if self._connector is not None and not self._connector.closed:
+            await self._connector.close()
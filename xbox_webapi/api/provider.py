@@ -1,17 +1,18 @@
 import logging
 
-import requests
-
-from xbox_webapi.api.eds.eds import EDSProvider
+from xbox_webapi.api.eds.eds import EDSProvider, AsyncEDSProvider
 from xbox_webapi.api.lists.lists import ListsProvider
 from xbox_webapi.api.gamerpics.gamerpics import GamerpicsProvider
-from xbox_webapi.api.language import XboxLiveLanguage
+from xbox_webapi.api.language import XboxLiveLanguage, language_registry
+from xbox_webapi.api.session import XboxLiveSession, AsyncSession, XboxLiveAuth
 
 log = logging.getLogger('xbox.api')
 
 
 class XboxLiveClient(object):
-    def __init__(self, userhash, auth_token, xuid, language=XboxLiveLanguage.United_States):
+    def __init__(self, userhash, auth_token, xuid, language=XboxLiveLanguage.United_States, pools=None,
+                 rate_limiter=None, retry=None, circuit_breakers=None, timeout=(10.0, 60.0),
+                 cache=None, coalesce=False, string_pool=None):
         """
         Provide various Web API from Xbox Live
 
@@ -19,12 +20,28 @@ class XboxLiveClient(object):
             userhash (str): Userhash obtained by authentication with Xbox Live Server
             auth_token (str): Authentication Token (XSTS), obtained by authentication with Xbox Live Server
             xuid (str/int): Xbox User Identification of your Xbox Live Account
-            language (object): Member of :class:`XboxLiveLanguage`
+            language (object): Member of :class:`XboxLiveLanguage`, or its locale (e.g. 'de-DE')
+            pools (ConnectionPools): Connection pools to use, may be shared with other clients
+            rate_limiter (RateLimiter): Paces requests per host and endpoint and backs off when getting throttled
+            retry (RetryPolicy): Retries failed idempotent requests with exponential backoff
+            circuit_breakers (CircuitBreakers): Rejects requests to failing hosts early, may be shared
+            timeout (float/tuple): Request timeout in seconds or tuple of (connect, read) timeout, `None` to wait
+                forever
+            cache (ResponseCache): Opt-in cache for EDS responses, may be shared between accounts
+            coalesce (bool): Let concurrent identical GET requests share a single upstream request
+            string_pool (StringPool): Share repeated strings between decoded EDS items, may be shared
         """
-        authorization_header = {'Authorization': 'XBL3.0 x=%s;%s' % (userhash, auth_token)}
+        self.string_pool = string_pool
+        self.pools = pools
+        self.rate_limiter = rate_limiter
+        self.retry = retry
+        self.circuit_breakers = circuit_breakers
+        self.timeout = timeout
+        self.cache = cache
+        self.coalesce = coalesce
+        self.auth = XboxLiveAuth(userhash, auth_token)
 
-        self._session = requests.session()
-        self._session.headers.update(authorization_header)  # Set authorization header for whole session
+        self._session = self._create_session(self.auth)
 
         if isinstance(xuid, str):
             self.xuid = int(xuid)
@@ -33,11 +50,20 @@ class XboxLiveClient(object):
         else:
             log.error("Xuid was passed in wrong format, neither int nor string")
 
-        self.lang = language
+        self.lang = language_registry.resolve(language)
         self.eds = EDSProvider(self)
         self.lists = ListsProvider(self)
         self.gamerpics = GamerpicsProvider(self)
 
+    def _create_session(self, auth):
+        session = XboxLiveSession(rate_limiter=self.rate_limiter, retry=self.retry,
+                                  circuit_breakers=self.circuit_breakers, timeout=self.timeout,
+                                  cache=self.cache, coalesce=self.coalesce)
+        session.auth = auth  # Set authorization header for every request of the session
+        if self.pools:
+            self.pools.mount(session)
+        return session
+
     @property
     def session(self):
         """
@@ -46,4 +72,84 @@ class XboxLiveClient(object):
         Returns:
             object: Instance of :class:`requests.session` - Xbox Live Authorization header is set.
         """
-        return self._session
\ No newline at end of file
+        return self._session
+
+    @property
+    def transfer_stats(self):
+        """
+        Transferred and decoded response bytes per endpoint, e.g. `client.transfer_stats.snapshot()`
+
+        Returns:
+            TransferStats: Counters of the client's session
+        """
+        return self._session.transfer_stats
+
+    def update_tokens(self, ts):
+        """
+        Use refreshed tokens for all following requests, without recreating the session.
+
+        Can be registered as callback of a :class:`TokenRefresher`: `refresher.add_callback(client.update_tokens)`
+
+        Args:
+            ts (Tokenstore): Tokenstore holding XSTS-Token and userinfo
+        """
+        self.auth.update_from_tokenstore(ts)
+
+
+class AsyncXboxLiveClient(XboxLiveClient):
+    def __init__(self, userhash, auth_token, xuid, language=XboxLiveLanguage.United_States, pools=None,
+                 rate_limiter=None, retry=None, circuit_breakers=None, timeout=(10.0, 60.0),
+                 cache=None, coalesce=False, connector=None, string_pool=None):
+        """
+        Provide various Web API from Xbox Live via asyncio
+
+        Every provider method (e.g. `client.eds.get_details`) returns an awaitable instead of blocking, resolving
+        to a :class:`requests.Response` with its content already read.
+
+        Args:
+            userhash (str): Userhash obtained by authentication with Xbox Live Server
+            auth_token (str): Authentication Token (XSTS), obtained by authentication with Xbox Live Server
+            xuid (str/int): Xbox User Identification of your Xbox Live Account
+            language (object): Member of :class:`XboxLiveLanguage`, or its locale (e.g. 'de-DE')
+            pools (ConnectionPools): Connection pools to use, may be shared with other clients
+            rate_limiter (RateLimiter): Paces requests per host and endpoint and backs off when getting throttled
+            retry (RetryPolicy): Retries failed idempotent requests with exponential backoff
+            circuit_breakers (CircuitBreakers): Rejects requests to failing hosts early, may be shared
+            timeout (float/tuple): Request timeout in seconds or tuple of (connect, read) timeout, `None` to wait
+                forever
+            cache (ResponseCache): Opt-in cache for EDS responses, may be shared between accounts
+            coalesce (bool): Let concurrent identical GET requests share a single upstream request
+            connector (aiohttp.BaseConnector): Connection pool, pass the same one to several clients to share
+                keep-alive connections. Ignored if `pools` is given.
+            string_pool (StringPool): Share repeated strings between decoded EDS items, may be shared
+        """
+        self._connector = connector
+        super(AsyncXboxLiveClient, self).__init__(userhash, auth_token, xuid, language, pools, rate_limiter, retry,
+                                                  circuit_breakers, timeout, cache, coalesce, string_pool)
+        self.eds = AsyncEDSProvider(self)
+
+    def _create_session(self, auth):
+        return AsyncSession(connector=self._connector, pools=self.pools,
+                            rate_limiter=self.rate_limiter, retry=self.retry,
+                            circuit_breakers=self.circuit_breakers, timeout=self.timeout,
+                            cache=self.cache, coalesce=self.coalesce, auth=auth)
+
+    @property
+    def session(self):
+        """
+        Wrapper around asyncio session
+
+        Returns:
+            object: Instance of :class:`AsyncSession` - Xbox Live Authorization header is set.
+        """
+        return self._session
+
+    async def close(self):
+        """Close the underlying session"""
+        await self._session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
@@ -0,0 +1,199 @@
+"""
+Client-side rate limiting, per host and endpoint.
+
+Each (host, endpoint) pair gets its own token bucket. Throttling responses (HTTP 429 / 503) halve the bucket's rate
+and pause it for the duration announced via `Retry-After`, successful responses let the rate recover gradually.
+"""
+import time
+import logging
+import threading
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+
+from dateutil.tz import tzutc
+
+try:
+    # Python 3
+    from urllib.parse import urlparse
+except ImportError:
+    # Python 2
+    from urlparse import urlparse
+
+log = logging.getLogger('xbox.api.ratelimit')
+
+THROTTLE_STATUS_CODES = (429, 503)
+
+
+def parse_retry_after(value):
+    """
+    Parse the value of a `Retry-After` header.
+
+    Args:
+        value (str): Either delay in seconds or a HTTP-date
+
+    Returns:
+        float: Seconds to wait, `None` if value is missing or malformed
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_date.tzinfo is None:
+        retry_date = retry_date.replace(tzinfo=tzutc())
+    return max(0.0, (retry_date - datetime.now(tzutc())).total_seconds())
+
+
+def endpoint_key(url):
+    """
+    Get the (host, endpoint) pair a request URL gets rate limited by.
+
+    The endpoint is the last path segment, e.g. 'details' for '/media/en-US/details', so all locales of an
+    endpoint share a bucket.
+
+    Args:
+        url (str): Request URL
+
+    Returns:
+        tuple: (host, endpoint)
+    """
+    parsed = urlparse(url)
+    return parsed.hostname, parsed.path.rstrip('/').rsplit('/', 1)[-1]
+
+
+class RateLimit(object):
+    def __init__(self, rate=10.0, burst=20, min_rate=0.5):
+        """
+        Rate limit settings.
+
+        Args:
+            rate (float): Sustained requests per second
+            burst (int): Number of requests that may be sent at once after an idle period
+            min_rate (float): Requests per second the rate never drops below when getting throttled
+        """
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+
+
+class TokenBucket(object):
+    RECOVERY_STEP = 0.05
+
+    def __init__(self, limit):
+        """
+        Thread-safe token bucket with additive-increase / multiplicative-decrease of its rate.
+
+        Args:
+            limit (RateLimit): Settings of this bucket
+        """
+        self.limit = limit
+        self.rate = limit.rate
+        self.tokens = float(limit.burst)
+        self.blocked_until = 0.0
+        self._timestamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Take a token from the bucket.
+
+        Returns:
+            float: Seconds the caller has to wait before sending its request
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(float(self.limit.burst), self.tokens + (now - self._timestamp) * self.rate)
+            self._timestamp = now
+            self.tokens -= 1
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(delay, self.blocked_until - now)
+
+    def throttled(self, retry_after=None):
+        """
+        Slow down after the server signaled throttling.
+
+        Args:
+            retry_after (float): Seconds announced via `Retry-After`, if any
+        """
+        with self._lock:
+            self.rate = max(self.limit.min_rate, self.rate / 2)
+            self.tokens = min(self.tokens, 0.0)
+            if retry_after:
+                self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+
+    def succeeded(self):
+        """Speed up again after a successful request"""
+        with self._lock:
+            if self.rate < self.limit.rate:
+                self.rate = min(self.limit.rate, self.rate + self.limit.rate * self.RECOVERY_STEP)
+
+
+class RateLimiter(object):
+    def __init__(self, default=None, limits=None):
+        """
+        Rate limiter keeping one :class:`TokenBucket` per host and endpoint.
+
+        Example:
+            limiter = RateLimiter(RateLimit(rate=20.0), limits={'eds.xboxlive.com/details': RateLimit(rate=5.0)})
+            client = XboxLiveClient(userhash, token, xuid, rate_limiter=limiter)
+
+        Args:
+            default (RateLimit): Limit for any endpoint without explicit configuration
+            limits (dict): Mapping of 'host' or 'host/endpoint' to :class:`RateLimit`, see :func:`endpoint_key`
+        """
+        self.default = default or RateLimit()
+        self.limits = dict(limits or {})
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url):
+        """
+        Get the token bucket responsible for an URL, create it on first use.
+
+        Args:
+            url (str): Request URL
+
+        Returns:
+            TokenBucket: The bucket
+        """
+        host, endpoint = endpoint_key(url)
+        key = '%s/%s' % (host, endpoint)
+        with self._lock:
+            if key not in self._buckets:
+                limit = self.limits.get(key) or self.limits.get(host) or self.default
+                self._buckets[key] = TokenBucket(limit)
+            return self._buckets[key]
+
+    def acquire(self, url):
+        """
+        Reserve a request slot for an URL.
+
+        Args:
+            url (str): Request URL
+
+        Returns:
+            float: Seconds to wait before the request may be sent
+        """
+        return self.bucket(url).reserve()
+
+    def update(self, url, response):
+        """
+        Adjust the rate of an URL's bucket according to a response.
+
+        Args:
+            url (str): Request URL
+            response (requests.Response): The response received
+        """
+        bucket = self.bucket(url)
+        if response.status_code in THROTTLE_STATUS_CODES:
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            log.warning('Throttled by %s (HTTP %i), slowing down to %.2f req/s' %
+                        (url, response.status_code, max(bucket.limit.min_rate, bucket.rate / 2)))
+            bucket.throttled(retry_after)
+        else:
+            bucket.succeeded()
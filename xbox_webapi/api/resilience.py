@@ -0,0 +1,211 @@
+"""
+Failure handling for Xbox Live Web-API requests: retries with exponential backoff and per-host circuit breakers.
+"""
+import time
+import random
+import logging
+import threading
+
+try:
+    # Python 3
+    from urllib.parse import urlparse
+except ImportError:
+    # Python 2
+    from urlparse import urlparse
+
+log = logging.getLogger('xbox.api.resilience')
+
+
+def base_url(url):
+    """
+    Get scheme and host of an URL, e.g. 'https://eds.xboxlive.com'.
+
+    Args:
+        url (str): Request URL
+
+    Returns:
+        str: Base URL
+    """
+    parsed = urlparse(url)
+    return '%s://%s' % (parsed.scheme, parsed.netloc)
+
+
+class RetryPolicy(object):
+    def __init__(self, total=3, backoff_factor=0.5, max_backoff=30.0,
+                 status_forcelist=(429, 500, 502, 503, 504), methods=('GET', 'HEAD')):
+        """
+        Retry idempotent requests on connection errors, timeouts and transient HTTP errors.
+
+        Backoff is exponential with "full jitter": the n-th retry waits a random time between 0 and
+        `backoff_factor * 2 ** n` seconds, capped at `max_backoff`. A `Retry-After` header raises the wait time.
+
+        Args:
+            total (int): Maximum number of retries per request
+            backoff_factor (float): Base of the exponential backoff in seconds
+            max_backoff (float): Upper bound of a single backoff in seconds
+            status_forcelist (tuple): HTTP status codes to retry
+            methods (tuple): HTTP methods considered safe to retry
+        """
+        self.total = total
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.status_forcelist = status_forcelist
+        self.methods = methods
+
+    def should_retry(self, method, attempt, status_code=None):
+        """
+        Check if a request should be sent again.
+
+        Args:
+            method (str): HTTP method of the request
+            attempt (int): Number of retries done so far
+            status_code (int): Status code of the response, `None` if the request failed without response
+
+        Returns:
+            bool: `True` if the request should be retried
+        """
+        if attempt >= self.total or method.upper() not in self.methods:
+            return False
+        return status_code is None or status_code in self.status_forcelist
+
+    def backoff(self, attempt, retry_after=None):
+        """
+        Get the time to wait before the next retry.
+
+        Args:
+            attempt (int): Number of retries done so far
+            retry_after (float): Seconds announced via `Retry-After` header, if any
+
+        Returns:
+            float: Seconds to wait
+        """
+        delay = random.uniform(0, min(self.max_backoff, self.backoff_factor * (2 ** attempt)))
+        if retry_after:
+            delay = max(delay, min(self.max_backoff, retry_after))
+        return delay
+
+
+class CircuitState(object):
+    """
+    Enumeration of circuit breaker states
+    """
+    CLOSED = 0
+    OPEN = 1
+    HALF_OPEN = 2
+
+
+class CircuitBreaker(object):
+    def __init__(self, failure_threshold=5, recovery_timeout=30.0):
+        """
+        Thread-safe circuit breaker for a single host.
+
+        After `failure_threshold` consecutive failures the circuit opens and requests get rejected locally.
+        Once `recovery_timeout` passed, a single trial request is let through: its success closes the circuit,
+        its failure opens it again. A cancelled trial is given up via :meth:`release`, a trial that never reports
+        back at all is replaced by a new one after another `recovery_timeout`.
+
+        Args:
+            failure_threshold (int): Consecutive failures that open the circuit
+            recovery_timeout (float): Seconds to stay open before sending a trial request
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_at = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Check if a request may be sent.
+
+        Returns:
+            float: 0 if the request may be sent, otherwise seconds until the next trial request
+        """
+        with self._lock:
+            if self.state == CircuitState.CLOSED:
+                return 0.0
+
+            now = time.monotonic()
+            if self.state == CircuitState.OPEN:
+                remaining = self._opened_at + self.recovery_timeout - now
+            else:
+                # A trial request is in flight
+                remaining = self._trial_at + self.recovery_timeout - now
+            if remaining <= 0:
+                self.state = CircuitState.HALF_OPEN
+                self._trial_at = now
+                return 0.0
+            return remaining
+
+    def record_success(self):
+        """Reset the failure count, close the circuit"""
+        with self._lock:
+            self.state = CircuitState.CLOSED
+            self.failures = 0
+
+    def release(self):
+        """
+        Give up a pending trial request without counting a failure.
+
+        Called for requests aborted by the caller (e.g. cancelled), their outcome says nothing about the host.
+        """
+        with self._lock:
+            if self.state == CircuitState.HALF_OPEN:
+                # The next request may take over the trial right away
+                self.state = CircuitState.OPEN
+                self._opened_at = time.monotonic() - self.recovery_timeout
+
+    def record_failure(self):
+        """Count a failure, open the circuit when the threshold is reached"""
+        with self._lock:
+            self.failures += 1
+            if self.state == CircuitState.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != CircuitState.OPEN:
+                    log.warning('Opening circuit after %i consecutive failures' % self.failures)
+                self.state = CircuitState.OPEN
+                self._opened_at = time.monotonic()
+
+
+class CircuitBreakers(object):
+    FAILURE_STATUS_CODES = (500, 502, 503, 504)
+
+    def __init__(self, failure_threshold=5, recovery_timeout=30.0):
+        """
+        Registry of :class:`CircuitBreaker` instances, one per base URL (e.g. `EDSProvider.EDS_URL`).
+
+        Args:
+            failure_threshold (int): Consecutive failures that open a circuit
+            recovery_timeout (float): Seconds a circuit stays open before sending a trial request
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        """
+        Get the circuit breaker responsible for an URL, create it on first use.
+
+        Args:
+            url (str): Request URL
+
+        Returns:
+            CircuitBreaker: The breaker of the URL's host
+        """
+        key = base_url(url)
+        with self._lock:
+            if key not in self._breakers:
+                self._breakers[key] = CircuitBreaker(self.failure_threshold, self.recovery_timeout)
+            return self._breakers[key]
+
+    def states(self):
+        """
+        Get the state of all known circuits.
+
+        Returns:
+            dict: Mapping of base URL to member of :class:`CircuitState`
+        """
+        with self._lock:
+            return dict((key, breaker.state) for key, breaker in self._breakers.items())
@@ -0,0 +1,582 @@
+"""
+HTTP session layer shared by the Xbox Live Web-API providers.
+
+The providers only ever call `get`, `post`, `put` and `delete` on `client.session`, so the same
+provider classes run on top of the blocking :class:`requests.Session` and on top of :class:`AsyncSession`.
+"""
+import time
+import zlib
+import asyncio
+import logging
+
+import requests
+from requests.auth import AuthBase
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+try:
+    import aiohttp
+    from yarl import URL
+except ImportError:
+    aiohttp = None
+
+from xbox_webapi.api.coalesce import SingleFlight, AsyncSingleFlight
+from xbox_webapi.api.compression import ACCEPT_ENCODING, Decompressor, TransferStats, decompress
+from xbox_webapi.api.ratelimit import parse_retry_after
+from xbox_webapi.api.resilience import CircuitBreakers, base_url
+from xbox_webapi.common.exceptions import CircuitOpenException, InvalidRequest
+
+log = logging.getLogger('xbox.api.session')
+
+# Request headers selecting the caller's identity or the response representation, requests only share a response
+# if they agree on all of them
+COALESCE_HEADERS = ('Authorization', 'Accept-Language', 'x-xbl-contract-version')
+
+
+def prepare_url(url, params=None):
+    """
+    Encode query parameters into `url` exactly like :class:`requests.Session` would.
+
+    Args:
+        url (str): Request URL, may end with '?'
+        params (dict): Query parameters, `None` values are dropped
+
+    Returns:
+        str: Fully encoded URL
+    """
+    prepared = requests.models.PreparedRequest()
+    prepared.prepare_url(url, params)
+    return prepared.url
+
+
+def prepare_body(data, headers):
+    """
+    Encode a form body exactly like :class:`requests.Session` would.
+
+    aiohttp form-encodes `None` values as the string 'None', requests drops them.
+
+    Args:
+        data (dict/list/bytes/str): Request body, dicts and lists of tuples get form-encoded
+        headers (dict): Request headers, `Content-Type` is set for form-encoded bodies
+
+    Returns:
+        bytes/str: Encoded body, `data` itself if it needs no encoding
+    """
+    if data is None or isinstance(data, (bytes, str)) or hasattr(data, 'read'):
+        return data
+    prepared = requests.models.PreparedRequest()
+    prepared.headers = CaseInsensitiveDict()
+    prepared.prepare_body(data, None)
+    content_type = prepared.headers.get('Content-Type')
+    if content_type and not any(name.lower() == 'content-type' for name in headers):
+        headers['Content-Type'] = content_type
+    return prepared.body
+
+
+def build_response(method, url, status_code, reason, headers, content):
+    """
+    Assemble a :class:`requests.Response` from raw response data.
+
+    Used to hand out identical response objects no matter which transport fetched them.
+
+    Args:
+        method (str): HTTP method of the originating request
+        url (str): Final URL of the response
+        status_code (int): HTTP status code
+        reason (str): HTTP reason phrase
+        headers (dict): Response headers
+        content (bytes): Response body
+
+    Returns:
+        requests.Response: Response with its content already loaded
+    """
+    response = requests.Response()
+    response.status_code = status_code
+    response.reason = reason
+    response.headers = CaseInsensitiveDict(headers)
+    response.url = url
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.request = requests.Request(method, url).prepare()
+    response._content = content
+    return response
+
+
+def coalesce_key(method, url, headers):
+    """
+    Get the single-flight key of a request.
+
+    Args:
+        method (str): HTTP method
+        url (str): Fully encoded request URL
+        headers (dict): Request headers
+
+    Returns:
+        tuple: (method, url, values of :data:`COALESCE_HEADERS`)
+    """
+    headers = CaseInsensitiveDict(headers)
+    return (method.upper(), url) + tuple(headers.get(name) for name in COALESCE_HEADERS)
+
+
+def copy_response(response):
+    """
+    Create an independent copy of a response whose content was already read.
+
+    Args:
+        response (requests.Response): Response to copy
+
+    Returns:
+        requests.Response: The copy, sharing the body bytes of the original
+    """
+    method = response.request.method if response.request is not None else 'GET'
+    return build_response(method, response.url, response.status_code, response.reason, response.headers,
+                          response.content)
+
+
+class XboxLiveAuth(AuthBase):
+    def __init__(self, userhash, token):
+        """
+        Xbox Live `Authorization` header, exchangeable while requests are running.
+
+        Every request reads the current header when it is sent, requests already in flight keep the header they
+        were sent with. Connections, caches and other session state are left untouched by an update.
+
+        Example:
+            refresher = TokenRefresher(auth_mgr, ts)
+            refresher.add_callback(client.update_tokens)
+            refresher.start()
+
+        Args:
+            userhash (str): Userhash obtained by authentication with Xbox Live Server
+            token (str/XSTSToken): Authentication Token (XSTS)
+        """
+        self.header = None
+        self.update(userhash, token)
+
+    def update(self, userhash, token):
+        """
+        Args:
+            userhash (str): Userhash obtained by authentication with Xbox Live Server
+            token (str/XSTSToken): Authentication Token (XSTS)
+        """
+        # A single attribute assignment, concurrent requests see either the old or the new header
+        self.header = 'XBL3.0 x=%s;%s' % (userhash, token)
+
+    def update_from_tokenstore(self, ts):
+        """
+        Args:
+            ts (Tokenstore): Tokenstore holding XSTS-Token and userinfo, e.g. after a refresh
+        """
+        self.update(ts.userinfo.userhash, ts.xsts_token)
+
+    def apply(self, headers):
+        """Set the header in a dict of request headers"""
+        headers['Authorization'] = self.header
+        return headers
+
+    def __call__(self, request):
+        request.headers['Authorization'] = self.header
+        return request
+
+
+class XboxLiveSession(requests.Session):
+    def __init__(self, rate_limiter=None, retry=None, circuit_breakers=None, timeout=None, cache=None,
+                 coalesce=False):
+        """
+        :class:`requests.Session` applying the client-side request policies of :class:`XboxLiveClient`.
+
+        Compressed transfer is negotiated for every request, `transfer_stats` counts the transferred and decoded
+        body bytes per endpoint.
+
+        Args:
+            rate_limiter (RateLimiter): Rate limiter to pace requests with, optional
+            retry (RetryPolicy): Retry policy for failed idempotent requests, optional
+            circuit_breakers (CircuitBreakers): Per-host circuit breakers, optional
+            timeout (float/tuple): Default timeout in seconds, or tuple of (connect, read) timeout
+            cache (ResponseCache): Cache for EDS responses, optional
+            coalesce (bool): Let concurrent identical GET requests share a single upstream request
+        """
+        super(XboxLiveSession, self).__init__()
+        self.headers['Accept-Encoding'] = ACCEPT_ENCODING
+        self.transfer_stats = TransferStats()
+        self.rate_limiter = rate_limiter
+        self.retry = retry
+        self.circuit_breakers = circuit_breakers
+        self.timeout = timeout
+        self.cache = cache
+        self.single_flight = SingleFlight() if coalesce else None
+
+    def send(self, request, **kwargs):
+        if kwargs.get('stream'):
+            return self._send(request, **kwargs)
+
+        key = entry = None
+        if self.cache is not None:
+            key, entry, response = self.cache.lookup(request.method, request.url, request.headers)
+            if response is not None:
+                return response
+
+        if self.single_flight is not None and request.method == 'GET':
+            flight_key = coalesce_key(request.method, request.url, request.headers)
+            response, shared = self.single_flight.do(flight_key, self._fetch, request, key, entry, **kwargs)
+            return copy_response(response) if shared else response
+        return self._fetch(request, key, entry, **kwargs)
+
+    def record_transfer(self, url, response, decoded=None):
+        """
+        Count the body of a response in `transfer_stats`.
+
+        Args:
+            url (str): Request URL
+            response (requests.Response): Response, its body read
+            decoded (int): Decoded body size, for streamed responses
+        """
+        if decoded is None:
+            decoded = len(response.content)
+        tell = getattr(response.raw, 'tell', None)
+        self.transfer_stats.record(url, tell() if tell else decoded, decoded)
+
+    def _fetch(self, request, cache_key, cache_entry, **kwargs):
+        response = self._send(request, **kwargs)
+        if self.cache is not None:
+            response = self.cache.update(cache_key, cache_entry, request.method, request.url, response)
+        return response
+
+    def _send(self, request, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+
+        breaker = self.circuit_breakers.get(request.url) if self.circuit_breakers else None
+        attempt = 0
+        while True:
+            if breaker:
+                retry_in = breaker.acquire()
+                if retry_in:
+                    raise CircuitOpenException(base_url(request.url), retry_in)
+
+            if self.rate_limiter:
+                delay = self.rate_limiter.acquire(request.url)
+                if delay > 0:
+                    log.debug('Rate limit: delaying request to %s by %.3fs' % (request.url, delay))
+                    time.sleep(delay)
+
+            try:
+                response = super(XboxLiveSession, self).send(request, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if breaker:
+                    breaker.record_failure()
+                if not self.retry or not self.retry.should_retry(request.method, attempt):
+                    raise
+                delay = self.retry.backoff(attempt)
+                log.debug('Request to %s failed (%s), retry in %.3fs' % (request.url, e, delay))
+            except requests.RequestException:
+                # Protocol errors, e.g. a broken body encoding
+                if breaker:
+                    breaker.record_failure()
+                raise
+            except BaseException:
+                # Aborted by the caller, e.g. KeyboardInterrupt: not a failure of the host
+                if breaker:
+                    breaker.release()
+                raise
+            else:
+                if not kwargs.get('stream'):
+                    self.record_transfer(request.url, response)
+                if self.rate_limiter:
+                    self.rate_limiter.update(request.url, response)
+                if breaker:
+                    if response.status_code in CircuitBreakers.FAILURE_STATUS_CODES:
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+                if not self.retry or not self.retry.should_retry(request.method, attempt, response.status_code):
+                    return response
+                delay = self.retry.backoff(attempt, parse_retry_after(response.headers.get('Retry-After')))
+                log.debug('Request to %s got HTTP %i, retry in %.3fs' % (request.url, response.status_code, delay))
+                response.close()
+
+            time.sleep(delay)
+            attempt += 1
+
+
+class AsyncSession(object):
+    CONNECTION_LIMIT = 500
+
+    def __init__(self, headers=None, connector=None, pools=None, rate_limiter=None, retry=None,
+                 circuit_breakers=None, timeout=None, cache=None, coalesce=False, auth=None):
+        """
+        Asyncio counterpart of :class:`requests.Session`, backed by :class:`aiohttp.ClientSession`.
+
+        Every request method is a coroutine returning a :class:`requests.Response` with the body already read,
+        so callers handle the same response objects as with the blocking client.
+
+        Compressed transfer is negotiated for every request and decoded by the session itself, `transfer_stats`
+        counts the transferred and decoded body bytes per endpoint.
+
+        Args:
+            headers (dict): Headers sent with every request
+            connector (aiohttp.BaseConnector): Connection pool to use. Pass the same connector to several
+                sessions to share keep-alive connections; it is not closed by this session.
+            pools (ConnectionPools): Shared pools, their connector and connection statistics are used.
+                Takes precedence over `connector`.
+            rate_limiter (RateLimiter): Rate limiter to pace requests with, optional
+            retry (RetryPolicy): Retry policy for failed idempotent requests, optional
+            circuit_breakers (CircuitBreakers): Per-host circuit breakers, optional
+            timeout (float/tuple): Default timeout in seconds, or tuple of (connect, read) timeout
+            cache (ResponseCache): Cache for EDS responses, optional
+            coalesce (bool): Let concurrent identical GET requests share a single upstream request
+            auth (XboxLiveAuth): Sets the `Authorization` header of each request when it is sent, optional
+        """
+        if aiohttp is None:
+            raise ImportError("aiohttp is required for asyncio support, install it via 'pip install aiohttp'")
+
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.headers.setdefault('Accept-Encoding', ACCEPT_ENCODING)
+        self.transfer_stats = TransferStats()
+        self.pools = pools
+        self.rate_limiter = rate_limiter
+        self.retry = retry
+        self.circuit_breakers = circuit_breakers
+        self.timeout = timeout
+        self.cache = cache
+        self.single_flight = AsyncSingleFlight() if coalesce else None
+        self.auth = auth
+        self._connector = connector
+        self._connector_owner = connector is None and pools is None
+        self._session = None
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            trace_configs = None
+            if self.pools:
+                connector = self.pools.connector()
+                trace_configs = [self.pools.trace_config()]
+            elif self._connector:
+                connector = self._connector
+            else:
+                connector = aiohttp.TCPConnector(limit=self.CONNECTION_LIMIT)
+            # Bodies are decoded in `_decode`, to count the transferred bytes
+            self._session = aiohttp.ClientSession(connector=connector, connector_owner=self._connector_owner,
+                                                  trace_configs=trace_configs, auto_decompress=False)
+        return self._session
+
+    def _request_headers(self, headers):
+        request_headers = dict(self.headers)
+        if self.auth is not None:
+            self.auth.apply(request_headers)
+        if headers:
+            request_headers.update(headers)
+        return request_headers
+
+    def _decode(self, url, resp, content):
+        decoded = decompress(content, resp.headers.get('Content-Encoding'))
+        self.transfer_stats.record(url, len(content), len(decoded))
+        return decoded
+
+    @staticmethod
+    def _client_timeout(timeout):
+        if timeout is None:
+            return aiohttp.ClientTimeout(total=None)
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+        else:
+            connect = read = timeout
+        return aiohttp.ClientTimeout(total=None, sock_connect=connect, sock_read=read)
+
+    async def request(self, method, url, params=None, data=None, json=None, headers=None, allow_redirects=True,
+                      timeout=None):
+        """
+        Send a HTTP request.
+
+        Args:
+            method (str): HTTP method
+            url (str): Request URL
+            params (dict): Query parameters
+            data (dict/bytes): Request body
+            json (dict): Request body, serialized as JSON
+            headers (dict): Additional headers, merged over the session headers
+            allow_redirects (bool): Follow redirects
+            timeout (float/tuple): Timeout in seconds, or tuple of (connect, read) timeout
+
+        Raises:
+            CircuitOpenException: When the circuit breaker of the host is open
+
+        Returns:
+            requests.Response: Response with its content already loaded
+        """
+        request_headers = self._request_headers(headers)
+        data = prepare_body(data, request_headers)
+
+        url = prepare_url(url, params)
+        if timeout is None:
+            timeout = self.timeout
+
+        key = entry = None
+        if self.cache is not None:
+            key, entry, response = self.cache.lookup(method, url, request_headers)
+            if response is not None:
+                return response
+
+        args = (method, url, data, json, request_headers, allow_redirects, timeout, key, entry)
+        if self.single_flight is not None and method.upper() == 'GET':
+            flight_key = coalesce_key(method, url, request_headers)
+            response, shared = await self.single_flight.do(flight_key, self._fetch, *args)
+            return copy_response(response) if shared else response
+        return await self._fetch(*args)
+
+    async def _fetch(self, method, url, data, json, headers, allow_redirects, timeout, cache_key, cache_entry):
+        response = await self._send(method, url, data, json, headers, allow_redirects, timeout)
+        if self.cache is not None:
+            response = self.cache.update(cache_key, cache_entry, method, url, response)
+        return response
+
+    async def _send(self, method, url, data, json, headers, allow_redirects, timeout):
+        client_timeout = self._client_timeout(timeout)
+        breaker = self.circuit_breakers.get(url) if self.circuit_breakers else None
+        attempt = 0
+        while True:
+            if breaker:
+                retry_in = breaker.acquire()
+                if retry_in:
+                    raise CircuitOpenException(base_url(url), retry_in)
+
+            if self.rate_limiter:
+                delay = self.rate_limiter.acquire(url)
+                if delay > 0:
+                    log.debug('Rate limit: delaying request to %s by %.3fs' % (url, delay))
+                    await asyncio.sleep(delay)
+
+            try:
+                session = self._get_session()
+                async with session.request(method, URL(url, encoded=True), data=data, json=json,
+                                           headers=headers, allow_redirects=allow_redirects,
+                                           timeout=client_timeout) as resp:
+                    content = self._decode(url, resp, await resp.read())
+                    response = build_response(method, str(resp.url), resp.status, resp.reason, resp.headers,
+                                              content)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if breaker:
+                    breaker.record_failure()
+                if not self.retry or not self.retry.should_retry(method, attempt):
+                    raise
+                delay = self.retry.backoff(attempt)
+                log.debug('Request to %s failed (%r), retry in %.3fs' % (url, e, delay))
+            except (aiohttp.ClientError, zlib.error):
+                # Protocol errors, e.g. a truncated payload or a broken body encoding
+                if breaker:
+                    breaker.record_failure()
+                raise
+            except BaseException:
+                # Aborted by the caller, e.g. cancelled by `asyncio.wait_for`: not a failure of the host
+                if breaker:
+                    breaker.release()
+                raise
+            else:
+                if self.rate_limiter:
+                    self.rate_limiter.update(url, response)
+                if breaker:
+                    if response.status_code in CircuitBreakers.FAILURE_STATUS_CODES:
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+                if not self.retry or not self.retry.should_retry(method, attempt, response.status_code):
+                    return response
+                delay = self.retry.backoff(attempt, parse_retry_after(response.headers.get('Retry-After')))
+                log.debug('Request to %s got HTTP %i, retry in %.3fs' % (url, response.status_code, delay))
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def iter_content(self, method, url, params=None, headers=None, timeout=None, chunk_size=65536):
+        """
+        Send a HTTP request and yield the response body in chunks as they arrive.
+
+        Cache, single-flight and retries are bypassed, the body is consumed while it is being received.
+
+        Args:
+            method (str): HTTP method
+            url (str): Request URL
+            params (dict): Query parameters
+            headers (dict): Additional headers, merged over the session headers
+            timeout (float/tuple): Timeout in seconds, or tuple of (connect, read) timeout
+            chunk_size (int): Maximum size of a chunk in bytes
+
+        Raises:
+            CircuitOpenException: When the circuit breaker of the host is open
+            InvalidRequest: When the response status is not HTTP 200
+        """
+        request_headers = self._request_headers(headers)
+
+        url = prepare_url(url, params)
+        breaker = self.circuit_breakers.get(url) if self.circuit_breakers else None
+        if breaker:
+            retry_in = breaker.acquire()
+            if retry_in:
+                raise CircuitOpenException(base_url(url), retry_in)
+
+        if self.rate_limiter:
+            delay = self.rate_limiter.acquire(url)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        session = self._get_session()
+        recorded = False
+        try:
+            async with session.request(method, URL(url, encoded=True), headers=request_headers,
+                                       timeout=self._client_timeout(timeout if timeout is not None
+                                                                    else self.timeout)) as resp:
+                if resp.status != 200:
+                    response = build_response(method, str(resp.url), resp.status, resp.reason, resp.headers,
+                                              self._decode(url, resp, await resp.read()))
+                    if self.rate_limiter:
+                        self.rate_limiter.update(url, response)
+                    if breaker:
+                        if resp.status in CircuitBreakers.FAILURE_STATUS_CODES:
+                            breaker.record_failure()
+                        else:
+                            breaker.record_success()
+                    recorded = True
+                    raise InvalidRequest('Streaming request failed with HTTP %i' % resp.status, response)
+
+                if self.rate_limiter:
+                    self.rate_limiter.bucket(url).succeeded()
+                if breaker:
+                    breaker.record_success()
+                recorded = True
+                decompressor = Decompressor(resp.headers.get('Content-Encoding'))
+                transferred = decoded = 0
+                async for chunk in resp.content.iter_chunked(chunk_size):
+                    transferred += len(chunk)
+                    chunk = decompressor.decompress(chunk)
+                    decoded += len(chunk)
+                    if chunk:
+                        yield chunk
+                chunk = decompressor.flush()
+                self.transfer_stats.record(url, transferred, decoded + len(chunk))
+                if chunk:
+                    yield chunk
+        except (aiohttp.ClientError, asyncio.TimeoutError, zlib.error):
+            if breaker:
+                breaker.record_failure()
+            raise
+        except BaseException:
+            # Aborted by the caller, e.g. cancelled or the generator closed early
+            if breaker and not recorded:
+                breaker.release()
+            raise
+
+    async def get(self, url, **kwargs):
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request('POST', url, **kwargs)
+
+    async def put(self, url, **kwargs):
+        return await self.request('PUT', url, **kwargs)
+
+    async def delete(self, url, **kwargs):
+        return await self.request('DELETE', url, **kwargs)
+
+    async def close(self):
+        """Close the underlying :class:`aiohttp.ClientSession`"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
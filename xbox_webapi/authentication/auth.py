@@ -1,11 +1,23 @@
 import json
+import asyncio
 import requests
 import re
-import demjson
 import logging
 import io
+import os
+import tempfile
+import threading
 
 import xml.dom.minidom as minidom
+from datetime import datetime, timedelta
+
+from dateutil.tz import tzutc
+
+try:
+    # Only needed to parse the login pages of credential authentication
+    import demjson
+except ImportError:
+    demjson = None
 
 try:
     # Python 3
@@ -14,7 +26,9 @@ except ImportError:
     # Python 2
     from urlparse import urlparse, parse_qs
 
-from xbox_webapi.authentication.two_factor import TwoFactorAuthentication
+from xbox_webapi.api.coalesce import SingleFlight, AsyncSingleFlight
+from xbox_webapi.api.session import AsyncSession
+from xbox_webapi.authentication.two_factor import TwoFactorAuthentication, AsyncTwoFactorAuthentication
 from xbox_webapi.authentication.token import Token, Tokenstore
 from xbox_webapi.authentication.token import AccessToken, RefreshToken, UserToken, DeviceToken, TitleToken, XSTSToken
 from xbox_webapi.common.exceptions import AuthenticationException
@@ -22,21 +36,47 @@ from xbox_webapi.common.userinfo import XboxLiveUserInfo
 
 log = logging.getLogger('authentication')
 
+# Authentications in flight, shared by all managers: concurrent logins of the same account run only once
+_authentications = SingleFlight()
+_async_authentications = AsyncSingleFlight()
+_token_file_lock = threading.Lock()
+
+
+class AuthenticationStep(object):
+    TOKEN_REFRESH = 'token_refresh'
+    USER_AUTHENTICATE = 'user_authenticate'
+    XSTS_AUTHORIZE = 'xsts_authorize'
+
+
+TOKENSTORE_FIELDS = ('access_token', 'refresh_token', 'user_token', 'device_token', 'title_token', 'xsts_token',
+                     'userinfo')
+
 class AuthenticationManager(object):
-    def __init__(self, token_filepath=None):
+    # Tokens expiring sooner are renewed by `authenticate`, so they do not run out right after
+    MIN_VALIDITY = timedelta(minutes=1)
+
+    def __init__(self, token_filepath=None, pools=None):
         """
         Authenticate with Windows Live Server and Xbox Live.
 
         Args:
             token_filepath (str): path to json tokenfile
+            pools (ConnectionPools): Connection pools to use, may be shared with :class:`XboxLiveClient`
 
         In case Two-Factor authentication is requested from provided account, the user is asked for input via
         standard-input.
         """
-        self.session = requests.session()
+        self.pools = pools
+        self.session = self._create_session()
         self.authenticated = False
         self.token_filepath = token_filepath
 
+    def _create_session(self):
+        session = requests.session()
+        if self.pools:
+            self.pools.mount(session)
+        return session
+
     def load_token_files(self, ts):
         """
         Load Tokens from self.token_filepath IF NEEDED (e.g. passed tokens are invalid)
@@ -54,8 +94,8 @@ class AuthenticationManager(object):
             return ts
 
         try:
-            with io.open(self.token_filepath, 'r') as f:
-                json_file = json.load(f, encoding='utf-8')
+            with io.open(self.token_filepath, 'r', encoding='utf-8') as f:
+                json_file = json.load(f)
         except Exception as e:
             log.error('Loading tokens from file failed! Msg: %s' % e)
             return ts
@@ -68,7 +108,11 @@ class AuthenticationManager(object):
 
         file_tokens = json_file.get('tokens')
         for token in file_tokens:
-            t = Token.from_dict(token)
+            try:
+                t = Token.from_dict(token)
+            except ValueError as e:
+                log.error('Skipping token from file: %s' % e)
+                continue
             log.info('Loaded token %s from file' % type(t))
             if isinstance(t, AccessToken) and should_replace(ts.access_token, t):
                 ts.access_token = t
@@ -114,15 +158,120 @@ class AuthenticationManager(object):
 
         json_file['userinfo'] = ts.userinfo.to_dict()
 
-        with io.open(self.token_filepath, 'w') as f:
-            json.dump(json_file, f, indent=2)
+        # Write to a temporary file and swap it in, so concurrent readers never see a partially written file
+        directory = os.path.dirname(os.path.abspath(self.token_filepath))
+        with _token_file_lock:
+            fd, tmp_path = tempfile.mkstemp(prefix='.tokens', dir=directory)
+            try:
+                with io.open(fd, 'w') as f:
+                    json.dump(json_file, f, indent=2)
+                os.replace(tmp_path, self.token_filepath)
+            except Exception:
+                os.remove(tmp_path)
+                raise
+
+    def _account_key(self, email_address, ts):
+        """Identity of the account to authenticate, `None` if unknown"""
+        if self.token_filepath:
+            return 'file', os.path.abspath(self.token_filepath)
+        if email_address:
+            return 'email', email_address.lower()
+        if ts and ts.refresh_token:
+            return 'refresh_token', ts.refresh_token.token
+        return None
+
+    @staticmethod
+    def _share_tokens(result, ts):
+        """Copy the tokens of an authentication shared with another caller into the passed tokenstore"""
+        if ts is None or ts is result:
+            return result
+        for field in TOKENSTORE_FIELDS:
+            setattr(ts, field, getattr(result, field))
+        return ts
+
+    def _covers(self, result, refreshed, do_refresh, min_validity):
+        """Check if the tokens of an authentication shared with another caller meet this caller's demands"""
+        return (refreshed or not do_refresh) and not self.plan(result, False, min_validity)
+
+    @staticmethod
+    def _token_from_response(token_cls, json_data):
+        """
+        Build a User- or XSTS-Token from an Xbox Live response, dates the response lacks are read from the token
+        claims.
+        """
+        if json_data.get('NotAfter'):
+            return token_cls(json_data['Token'], json_data.get('IssueInstant') or datetime.now(tzutc()),
+                             json_data['NotAfter'])
+        try:
+            return token_cls.from_jwt(json_data['Token'])
+        except ValueError:
+            raise AuthenticationException("Response carries no token expiry")
+
+    @staticmethod
+    def _userinfo_from_response(json_data, xsts_token):
+        """Userinfo of an XSTS response, read from the token claims if the response lacks display claims"""
+        xui = (json_data.get('DisplayClaims') or {}).get('xui')
+        if xui:
+            return XboxLiveUserInfo.from_dict(xui[0])
+        userinfo = XboxLiveUserInfo.from_claims(xsts_token.claims)
+        if not userinfo:
+            raise AuthenticationException("Response carries no userinfo")
+        return userinfo
+
+    def _userinfo_from_claims(self, ts):
+        """Fill missing userinfo from the claims of the XSTS-Token, if readable, instead of authorizing again"""
+        if ts.userinfo or not ts.xsts_token:
+            return
+        ts.userinfo = XboxLiveUserInfo.from_claims(ts.xsts_token.claims)
+        if ts.userinfo:
+            log.debug('Took userinfo from XSTS-Token claims')
+
+    def plan(self, ts, do_refresh=False, min_validity=None):
+        """
+        Work out the steps of the authentication chain needed to get a valid XSTS-Token.
+
+        Every token is derived from the previous one: Refresh-Token -> Access-Token -> User-Token -> XSTS-Token.
+        A step only runs if the token it produces, and every later one, is missing or expires within
+        `min_validity`. With all tokens still valid no step - and no request - is needed.
+
+        Args:
+            ts (object): Instance of :class:`Tokenstore`
+            do_refresh (bool): Refresh Access- and Refresh Token even if still valid
+            min_validity (timedelta): Renew tokens expiring within this time, default: `MIN_VALIDITY`
+
+        Returns:
+            list: Members of :class:`AuthenticationStep`, in order of execution
+        """
+        min_validity = min_validity or self.MIN_VALIDITY
+
+        def valid(token):
+            return token is not None and token.is_valid_for(min_validity)
+
+        authorize = not valid(ts.xsts_token) or not ts.userinfo
+        authenticate = authorize and not valid(ts.user_token)
+        refresh = do_refresh or (authenticate and not valid(ts.access_token))
+
+        steps = []
+        if refresh:
+            steps.append(AuthenticationStep.TOKEN_REFRESH)
+        if authenticate:
+            steps.append(AuthenticationStep.USER_AUTHENTICATE)
+        if authorize:
+            steps.append(AuthenticationStep.XSTS_AUTHORIZE)
+        return steps
 
-    def authenticate(self, email_address=None, password=None, ts=None, do_refresh=True):
+    def authenticate(self, email_address=None, password=None, ts=None, do_refresh=True, min_validity=None):
         """
         Authenticate with Xbox Live using either tokens or user credentials.
 
         After being called, its property `authenticated` should be checked for success.
 
+        Concurrent calls for the same account - same token file, email address or refresh token - share a single
+        authentication: the first caller runs it, the others wait for it and receive its tokens (or exception).
+        A caller the shared authentication falls short for runs its own right after: if it failed and the caller
+        passed credentials, if the caller passed `do_refresh` but the first one did not, or if its tokens expire
+        within the caller's `min_validity`.
+
         Raises:
             AuthenticationException: When neither token and credential authentication is successful
 
@@ -131,12 +280,41 @@ class AuthenticationManager(object):
             password (str): Microsoft Account password
             ts (object): Instance of :class:`Tokenstore`
             do_refresh (bool): Refresh Access- and Refresh Token even if still valid, default: True
+            min_validity (timedelta): Renew tokens expiring within this time, default: `MIN_VALIDITY`
 
         Returns:
             object: On success return instance of :class:`Tokenstore`
         """
+        key = self._account_key(email_address, ts)
+        if key is None:
+            return self._authenticate(email_address, password, ts, do_refresh, min_validity)
+
+        for attempt in range(2):
+            leader = []
+
+            def run():
+                leader.append(True)
+                return self._authenticate(email_address, password, ts, do_refresh, min_validity), do_refresh
+
+            try:
+                (result, refreshed), shared = _authentications.do(key, run)
+            except AuthenticationException:
+                if leader or attempt or not (email_address and password):
+                    raise
+                log.debug('Authentication in flight for %s failed, retrying with credentials' % key[0])
+                continue
+
+            if not shared:
+                return result
+            if attempt or self._covers(result, refreshed, do_refresh, min_validity):
+                log.debug('Joined authentication in flight for %s' % key[0])
+                self.authenticated = True
+                return self._share_tokens(result, ts)
+            log.debug('Authentication in flight for %s falls short, authenticating again' % key[0])
 
+    def _authenticate(self, email_address, password, ts, do_refresh, min_validity):
         full_authentication_required = False
+        self.authenticated = False
 
         if not ts:
             log.debug('Creating new tokenstore')
@@ -144,19 +322,16 @@ class AuthenticationManager(object):
 
         if self.token_filepath:
             ts = self.load_token_files(ts)
+        self._userinfo_from_claims(ts)
 
         try:
-            # Refresh and Access Token
-            if not do_refresh and ts.access_token and ts.refresh_token and \
-                    ts.access_token.is_valid and ts.refresh_token.is_valid:
-                pass
-            else:
+            steps = self.plan(ts, do_refresh, min_validity)
+            log.debug('Authentication steps: %s' % (', '.join(steps) or 'none'))
+
+            if AuthenticationStep.TOKEN_REFRESH in steps:
                 ts.access_token, ts.refresh_token = self._windows_live_token_refresh(ts.refresh_token)
 
-            # User Token
-            if ts.user_token and ts.user_token.is_valid:
-                pass
-            else:
+            if AuthenticationStep.USER_AUTHENTICATE in steps:
                 ts.user_token = self._xbox_live_authenticate(ts.access_token)
 
             '''
@@ -174,12 +349,9 @@ class AuthenticationManager(object):
                 ts.title_token = self._xbox_live_title_auth(ts.device_token, ts.access_token)
             '''
 
-            # XSTS Token
-            if ts.xsts_token and ts.xsts_token.is_valid and ts.userinfo:
-                self.authenticated = True
-            else:
+            if AuthenticationStep.XSTS_AUTHORIZE in steps:
                 ts.xsts_token, ts.userinfo = self._xbox_live_authorize(ts.user_token)
-                self.authenticated = True
+            self.authenticated = True
         except AuthenticationException:
             full_authentication_required = True
 
@@ -199,7 +371,8 @@ class AuthenticationManager(object):
             raise AuthenticationException("AuthenticationManager was not able to authenticate "
                                           "with provided tokens or user credentials!")
 
-        self.save_token_files(ts)
+        if self.token_filepath:
+            self.save_token_files(ts)
         return ts
 
     def _extract_js_object(self, body, obj_name):
@@ -218,6 +391,9 @@ class AuthenticationManager(object):
         server_data_re = r"%s(?:.*?)=(?:.*?)({(?:.*?)});" % (obj_name)
         matches = re.findall(server_data_re, body, re.MULTILINE | re.IGNORECASE | re.DOTALL)
         if len(matches):
+            if demjson is None:
+                raise ImportError("demjson is required for authentication via credentials, "
+                                  "install it via 'pip install demjson'")
             return demjson.decode(matches[0])
 
     def _windows_live_authenticate(self, email_address, password):
@@ -238,7 +414,7 @@ class AuthenticationManager(object):
         Returns:
             tuple: If authentication succeeds, `tuple` of (AccessToken, RefreshToken) is returned
         """
-        response = self.__window_live_authenticate_request(email_address, password)
+        response = self._window_live_authenticate_request(email_address, password)
 
         proof_type = self._extract_js_object(response.content.decode("utf-8"), "PROOF.Type")
         if proof_type:
@@ -275,7 +451,7 @@ class AuthenticationManager(object):
             tuple: If authentication succeeds, `tuple` of (AccessToken, RefreshToken) is returned
         """
         if refresh_token and refresh_token.is_valid:
-            resp = self.__window_live_token_refresh_request(refresh_token)
+            resp = self._window_live_token_refresh_request(refresh_token)
             response = json.loads(resp.content.decode('utf-8'))
 
             if 'access_token' not in response:
@@ -301,8 +477,8 @@ class AuthenticationManager(object):
             object: If authentication succeeds, returns :class:`UserToken`
         """
         if access_token and access_token.is_valid:
-            json_data = self.__xbox_live_authenticate_request(access_token).json()
-            return UserToken(json_data['Token'], json_data['IssueInstant'], json_data['NotAfter'])
+            json_data = self._xbox_live_authenticate_request(access_token).json()
+            return self._token_from_response(UserToken, json_data)
         else:
             raise AuthenticationException("No valid AccessToken")
 
@@ -320,7 +496,7 @@ class AuthenticationManager(object):
              object: If authentication succeeds, returns :class:`DeviceToken`
          """
         if access_token and access_token.is_valid:
-            json_data = self.__device_authenticate_request(access_token)
+            json_data = self._device_authenticate_request(access_token)
             print(json_data.status_code)
             print(json_data.headers)
             print(json_data.content)
@@ -344,7 +520,7 @@ class AuthenticationManager(object):
              object: If authentication succeeds, returns :class:`TitleToken`
          """
         if access_token and access_token.is_valid and device_token and device_token.is_valid:
-            json_data = self.__title_authenticate_request(device_token, access_token).json()
+            json_data = self._title_authenticate_request(device_token, access_token).json()
             return TitleToken(json_data['Token'], json_data['IssueInstant'], json_data['NotAfter'])
         else:
             raise AuthenticationException("No valid AccessToken/DeviceToken")
@@ -362,14 +538,11 @@ class AuthenticationManager(object):
             tuple: If authentication succeeds, returns tuple of (:class:`XSTSToken`, :class:`XboxLiveUserInfo`)
         """
         if user_token and user_token.is_valid:
-            json_data = self.__xbox_live_authorize_request(user_token, device_token, title_token).json()
-            userinfo = json_data['DisplayClaims']['xui'][0]
-            userinfo = XboxLiveUserInfo.from_dict(userinfo)
-
-            xsts_token = XSTSToken(json_data['Token'], json_data['IssueInstant'], json_data['NotAfter'])
-            return xsts_token, userinfo
+            json_data = self._xbox_live_authorize_request(user_token, device_token, title_token).json()
+            xsts_token = self._token_from_response(XSTSToken, json_data)
+            return xsts_token, self._userinfo_from_response(json_data, xsts_token)
 
-    def __window_live_authenticate_request(self, email, password):
+    def _window_live_authenticate_request(self, email, password):
         """
         Authenticate with Windows Live Server.
 
@@ -388,6 +561,19 @@ class AuthenticationManager(object):
             requests.Response: Response of the final POST-Request
         """
 
+        resp = self._window_live_authorize_page_request()
+
+        # Extract ServerData javascript-object via regex, convert it to proper JSON
+        server_data = self._extract_js_object(resp.content.decode("utf-8"), "ServerData")
+        return self._window_live_credentials_request(server_data, email, password)
+
+    def _window_live_authorize_page_request(self):
+        """
+        Query the Windows Live OAuth authorization page, it holds the `ServerData` javascript-object.
+
+        Returns:
+            requests.Response: Response of HTTP-GET
+        """
         base_url = 'https://login.live.com/oauth20_authorize.srf?'
 
         params = {
@@ -398,10 +584,20 @@ class AuthenticationManager(object):
             'scope': 'service::user.auth.xboxlive.com::MBI_SSL',
             'locale': 'en',
         }
-        resp = self.session.get(base_url, params=params)
+        return self.session.get(base_url, params=params)
 
-        # Extract ServerData javascript-object via regex, convert it to proper JSON
-        server_data = self._extract_js_object(resp.content.decode("utf-8"), "ServerData")
+    def _window_live_credentials_request(self, server_data, email, password):
+        """
+        Send user-credentials via HTTP-POST to the Post-URL announced by the authorization page.
+
+        Args:
+            server_data (dict): Parsed javascript-object `ServerData` of the authorization page
+            email (str): Microsoft account email-address
+            password (str): Corresponding password
+
+        Returns:
+            requests.Response: Response of HTTP-POST
+        """
         # Extract PPFT value
         ppft = server_data.get('sFTTag')
         ppft = minidom.parseString(ppft).getElementsByTagName("input")[0].getAttribute("value")
@@ -419,7 +615,7 @@ class AuthenticationManager(object):
 
         return self.session.post(server_data.get('urlPost'), data=post_data, allow_redirects=False)
 
-    def __window_live_token_refresh_request(self, refresh_token):
+    def _window_live_token_refresh_request(self, refresh_token):
         """
         Refresh the Windows Live Token by sending HTTP-GET Request containing Refresh-token in query to a static URL.
 
@@ -439,7 +635,7 @@ class AuthenticationManager(object):
 
         return self.session.get(base_url, params=params)
 
-    def __xbox_live_authenticate_request(self, access_token):
+    def _xbox_live_authenticate_request(self, access_token):
         """
         Authenticate with Xbox Live by sending HTTP-POST containing Windows-Live Access-Token to User-Auth endpoint.
 
@@ -463,7 +659,7 @@ class AuthenticationManager(object):
 
         return self.session.post(url, json=data, headers=headers)
 
-    def __xbox_live_authorize_request(self, user_token, device_token=None, title_token=None):
+    def _xbox_live_authorize_request(self, user_token, device_token=None, title_token=None):
         """
         Authorize with Xbox Live by sending Xbox-Live User-Token via HTTP Post to the XSTS-Authorize endpoint.
 
@@ -493,7 +689,7 @@ class AuthenticationManager(object):
 
         return self.session.post(url, json=data, headers=headers)
 
-    def __title_authenticate_request(self, device_token, access_token):
+    def _title_authenticate_request(self, device_token, access_token):
         """
         Authenticate Title / App with Xbox Live.
 
@@ -521,7 +717,7 @@ class AuthenticationManager(object):
 
         return self.session.post(url, json=data, headers=headers)
 
-    def __device_authenticate_request(self, access_token):
+    def _device_authenticate_request(self, access_token):
         """
         Authenticate your current device with Xbox Live.
 
@@ -543,4 +739,234 @@ class AuthenticationManager(object):
             }
         }
 
-        return self.session.post(url, json=data, headers=headers)
\ No newline at end of file
+        return self.session.post(url, json=data, headers=headers)
+
+class AsyncAuthenticationManager(AuthenticationManager):
+    def __init__(self, token_filepath=None, pools=None, connector=None):
+        """
+        Authenticate with Windows Live Server and Xbox Live via asyncio.
+
+        Mirrors :class:`AuthenticationManager`, but `authenticate` and every step of the authentication chain
+        are coroutines, so a single event loop can run many logins concurrently.
+
+        Args:
+            token_filepath (str): path to json tokenfile
+            pools (ConnectionPools): Connection pools to use, may be shared with :class:`AsyncXboxLiveClient`
+            connector (aiohttp.BaseConnector): Connection pool to use, may be shared with other sessions.
+                Ignored if `pools` is given.
+
+        In case Two-Factor authentication is requested from provided account, the user is asked for input via
+        standard-input.
+        """
+        self._connector = connector
+        super(AsyncAuthenticationManager, self).__init__(token_filepath, pools)
+
+    def _create_session(self):
+        return AsyncSession(connector=self._connector, pools=self.pools)
+
+    async def close(self):
+        """Close the underlying session"""
+        await self.session.close()
+
+    async def authenticate(self, email_address=None, password=None, ts=None, do_refresh=True,
+                           min_validity=None):
+        """
+        Authenticate with Xbox Live using either tokens or user credentials.
+
+        After being called, its property `authenticated` should be checked for success.
+
+        Concurrent calls for the same account - same token file, email address or refresh token - share a single
+        authentication: the first caller runs it, the others wait for it and receive its tokens (or exception).
+        A caller the shared authentication falls short for runs its own right after: if it failed and the caller
+        passed credentials, if the caller passed `do_refresh` but the first one did not, or if its tokens expire
+        within the caller's `min_validity`.
+
+        Raises:
+            AuthenticationException: When neither token and credential authentication is successful
+
+        Args:
+            email_address (str): Microsoft Account Email address
+            password (str): Microsoft Account password
+            ts (object): Instance of :class:`Tokenstore`
+            do_refresh (bool): Refresh Access- and Refresh Token even if still valid, default: True
+            min_validity (timedelta): Renew tokens expiring within this time, default: `MIN_VALIDITY`
+
+        Returns:
+            object: On success return instance of :class:`Tokenstore`
+        """
+        key = self._account_key(email_address, ts)
+        if key is None:
+            return await self._authenticate(email_address, password, ts, do_refresh, min_validity)
+
+        # In-flight futures belong to their event loop
+        key = (id(asyncio.get_event_loop()),) + key
+        for attempt in range(2):
+            leader = []
+
+            async def run():
+                leader.append(True)
+                return await self._authenticate(email_address, password, ts, do_refresh, min_validity), do_refresh
+
+            try:
+                (result, refreshed), shared = await _async_authentications.do(key, run)
+            except AuthenticationException:
+                if leader or attempt or not (email_address and password):
+                    raise
+                log.debug('Authentication in flight for %s failed, retrying with credentials' % key[1])
+                continue
+
+            if not shared:
+                return result
+            if attempt or self._covers(result, refreshed, do_refresh, min_validity):
+                log.debug('Joined authentication in flight for %s' % key[1])
+                self.authenticated = True
+                return self._share_tokens(result, ts)
+            log.debug('Authentication in flight for %s falls short, authenticating again' % key[1])
+
+    async def _authenticate(self, email_address, password, ts, do_refresh, min_validity):
+        full_authentication_required = False
+        self.authenticated = False
+        loop = asyncio.get_event_loop()
+
+        if not ts:
+            log.debug('Creating new tokenstore')
+            ts = Tokenstore()
+
+        if self.token_filepath:
+            ts = await loop.run_in_executor(None, self.load_token_files, ts)
+        self._userinfo_from_claims(ts)
+
+        try:
+            steps = self.plan(ts, do_refresh, min_validity)
+            log.debug('Authentication steps: %s' % (', '.join(steps) or 'none'))
+
+            if AuthenticationStep.TOKEN_REFRESH in steps:
+                ts.access_token, ts.refresh_token = await self._windows_live_token_refresh(ts.refresh_token)
+
+            if AuthenticationStep.USER_AUTHENTICATE in steps:
+                ts.user_token = await self._xbox_live_authenticate(ts.access_token)
+
+            if AuthenticationStep.XSTS_AUTHORIZE in steps:
+                ts.xsts_token, ts.userinfo = await self._xbox_live_authorize(ts.user_token)
+            self.authenticated = True
+        except AuthenticationException:
+            full_authentication_required = True
+
+        # Authentication via credentials
+        if full_authentication_required and email_address and password:
+            ts.access_token, ts.refresh_token = await self._windows_live_authenticate(email_address, password)
+            ts.user_token = await self._xbox_live_authenticate(ts.access_token)
+            ts.xsts_token, ts.userinfo = await self._xbox_live_authorize(ts.user_token)
+            self.authenticated = True
+
+        if not self.authenticated:
+            raise AuthenticationException("AuthenticationManager was not able to authenticate "
+                                          "with provided tokens or user credentials!")
+
+        if self.token_filepath:
+            # File I/O off the event loop
+            await loop.run_in_executor(None, self.save_token_files, ts)
+        return ts
+
+    async def _windows_live_authenticate(self, email_address, password):
+        """
+        Internal method to authenticate with Windows Live, called by `self.authenticate`
+
+        Args:
+            email_address (str): Microsoft Account Email address
+            password (str):  Microsoft Account password
+
+        Raises:
+            AuthenticationException: When two-factor-authentication fails or returned headers do not contain
+            Access-/Refresh-Tokens.
+
+        Returns:
+            tuple: If authentication succeeds, `tuple` of (AccessToken, RefreshToken) is returned
+        """
+        resp = await self._window_live_authorize_page_request()
+        server_data = self._extract_js_object(resp.content.decode("utf-8"), "ServerData")
+        response = await self._window_live_credentials_request(server_data, email_address, password)
+
+        proof_type = self._extract_js_object(response.content.decode("utf-8"), "PROOF.Type")
+        if proof_type:
+            log.info("Two Factor Authentication required!")
+            twofactor = AsyncTwoFactorAuthentication(self.session)
+            server_data = self._extract_js_object(response.content.decode("utf-8"), "ServerData")
+            response = await twofactor.authenticate(email_address, server_data)
+            if not response:
+                raise AuthenticationException("Two Factor Authentication failed!")
+
+        if 'Location' not in response.headers:
+            # we can only assume the login failed
+            raise AuthenticationException("Could not log in with supplied credentials")
+
+        # the access token is included in fragment of the location header
+        location = urlparse(response.headers['Location'])
+        fragment = parse_qs(location.fragment)
+
+        access_token = AccessToken(fragment['access_token'][0], fragment['expires_in'][0])
+        refresh_token = RefreshToken(fragment['refresh_token'][0])
+        return access_token, refresh_token
+
+    async def _windows_live_token_refresh(self, refresh_token):
+        """
+        Internal method to refresh Windows Live Token, called by `self.authenticate`
+
+        Raises:
+            AuthenticationException: When provided Refresh-Token is invalid.
+
+        Args:
+            refresh_token (object): Instance of :class:`RefreshToken`
+
+        Returns:
+            tuple: If authentication succeeds, `tuple` of (AccessToken, RefreshToken) is returned
+        """
+        if refresh_token and refresh_token.is_valid:
+            resp = await self._window_live_token_refresh_request(refresh_token)
+            response = json.loads(resp.content.decode('utf-8'))
+
+            if 'access_token' not in response:
+                raise AuthenticationException("Could not refresh token via RefreshToken")
+
+            access_token = AccessToken(response['access_token'], response['expires_in'])
+            refresh_token = RefreshToken(response['refresh_token'])
+            return access_token, refresh_token
+        else:
+            raise AuthenticationException("No valid RefreshToken")
+
+    async def _xbox_live_authenticate(self, access_token):
+        """
+        Internal method to authenticate with Xbox Live, called by `self.authenticate`
+
+        Args:
+            access_token (object): Instance of :class:`AccessToken`
+
+        Raises:
+            AuthenticationException: When provided Access-Token is invalid
+
+        Returns:
+            object: If authentication succeeds, returns :class:`UserToken`
+        """
+        if access_token and access_token.is_valid:
+            json_data = (await self._xbox_live_authenticate_request(access_token)).json()
+            return self._token_from_response(UserToken, json_data)
+        else:
+            raise AuthenticationException("No valid AccessToken")
+
+    async def _xbox_live_authorize(self, user_token, device_token=None, title_token=None):
+        """
+        Internal method to authorize with Xbox Live, called by `self.authenticate`
+
+        Args:
+            user_token (object): Instance of :class:`UserToken`
+            device_token (object): Instance of :class:`DeviceToken`
+            title_token (object): Instance of :class:`TitleToken`
+
+        Returns:
+            tuple: If authentication succeeds, returns tuple of (:class:`XSTSToken`, :class:`XboxLiveUserInfo`)
+        """
+        if user_token and user_token.is_valid:
+            resp = await self._xbox_live_authorize_request(user_token, device_token, title_token)
+            json_data = resp.json()
+            xsts_token = self._token_from_response(XSTSToken, json_data)
+            return xsts_token, self._userinfo_from_response(json_data, xsts_token)
@@ -0,0 +1,65 @@
+"""
+Local decoding of token claims.
+
+Tokens in JWS compact form (`header.payload.signature`) carry their claims readable in the payload, so expiry and
+display claims are available without asking the server. Encrypted tokens (JWE, five segments) and opaque tokens
+have no readable claims, decoding them returns `None`.
+
+The signature is not verified, claims are only used to avoid requests - the server still validates the token.
+"""
+import json
+import base64
+import binascii
+from datetime import datetime
+
+from dateutil.tz import tzutc
+
+
+def decode_segment(segment):
+    """
+    Args:
+        segment (str): Base64url encoded segment, padding optional
+
+    Returns:
+        bytes: Decoded segment
+    """
+    segment = segment.encode('ascii') if not isinstance(segment, bytes) else segment
+    return base64.urlsafe_b64decode(segment + b'=' * (-len(segment) % 4))
+
+
+def decode_claims(token):
+    """
+    Args:
+        token (str): JWT in compact form
+
+    Returns:
+        dict: Claims of the token, `None` if they are not readable (encrypted or opaque token)
+    """
+    parts = str(token).split('.')
+    if len(parts) != 3:
+        return None
+    try:
+        claims = json.loads(decode_segment(parts[1]).decode('utf-8'))
+    except (ValueError, TypeError, binascii.Error, UnicodeError):
+        return None
+    return claims if isinstance(claims, dict) else None
+
+
+def claim_datetime(claims, name):
+    """
+    Args:
+        claims (dict): Decoded claims
+        name (str): Name of a NumericDate claim, e.g. 'exp'
+
+    Returns:
+        datetime: Claim as timezone aware datetime, `None` if missing or malformed
+    """
+    value = claims.get(name) if claims else None
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        return None
+    try:
+        return datetime.fromtimestamp(value, tzutc())
+    except (OverflowError, OSError, ValueError):
+        # Out of the platform's time_t or datetime range, or NaN
+        return None
+
@@ -0,0 +1,235 @@
+"""
+Proactive token renewal for long-running services.
+
+A refresher watches the expiry dates (`date_valid`) of the tokens in a :class:`Tokenstore` and renews them a
+margin before they expire, so requests never run with an expired XSTS token or wait for a refresh round trip.
+"""
+import asyncio
+import logging
+import threading
+from datetime import datetime, timedelta
+
+from dateutil.tz import tzutc
+
+log = logging.getLogger('authentication.refresh')
+
+# Tokens renewed by the refresher, in order of the authentication chain
+TRACKED_TOKENS = ('access_token', 'user_token', 'xsts_token')
+
+
+class TokenRefresher(object):
+    # Seconds to wait after a failed refresh before trying again
+    RETRY_INTERVAL = 60.0
+    # Minimum seconds between two refreshes, in case tokens are issued with a lifetime shorter than the margin
+    MIN_INTERVAL = 30.0
+    # Maximum seconds to sleep at once, expiry dates get re-checked afterwards (e.g. after system suspend)
+    MAX_SLEEP = 300.0
+
+    def __init__(self, auth_mgr, ts, margin=timedelta(minutes=5), callback=None):
+        """
+        Renew Access-, User- and XSTS-Token in a background thread before they expire.
+
+        Only tokens expiring within `margin` are renewed: the Access-Token via the Refresh-Token, the User-Token via
+        the Access-Token and the XSTS-Token via the User-Token. Renewal runs through `auth_mgr.authenticate`, so
+        it follows :meth:`AuthenticationManager.plan` and joins an authentication of the same account already in
+        flight. Renewed tokens are written into `ts` and saved to the token file of `auth_mgr`, if it has one.
+
+        Example:
+            ts = auth_mgr.authenticate(do_refresh=False)
+            refresher = TokenRefresher(auth_mgr, ts, margin=timedelta(minutes=10))
+            refresher.start()
+
+        Args:
+            auth_mgr (AuthenticationManager): Authentication manager to renew tokens with
+            ts (Tokenstore): Tokens to keep fresh, typically the result of `auth_mgr.authenticate`
+            margin (timedelta): Renew tokens this long before they expire
+            callback (callable): Called with `ts` after tokens were renewed
+        """
+        self.auth_mgr = auth_mgr
+        self.ts = ts
+        self.margin = margin
+        self.last_error = None
+        self._callbacks = [callback] if callback else []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add_callback(self, callback):
+        """
+        Args:
+            callback (callable): Called with the :class:`Tokenstore` after tokens were renewed
+        """
+        self._callbacks.append(callback)
+
+    def next_refresh(self):
+        """
+        Earlier tokens of the chain are only needed to renew the XSTS-Token, they get renewed along with it.
+
+        Returns:
+            datetime: When the XSTS-Token needs to be renewed, may be in the past
+        """
+        xsts_token = self.ts.xsts_token
+        if xsts_token is None or not self.ts.userinfo:
+            return datetime.now(tzutc())
+        return xsts_token.date_valid - self.margin
+
+    def _seconds_until_refresh(self):
+        return (self.next_refresh() - datetime.now(tzutc())).total_seconds()
+
+    def _tokens(self):
+        return dict((name, str(getattr(self.ts, name))) for name in TRACKED_TOKENS)
+
+    def _renewed(self, before):
+        # Compared by value, an authentication shared with another caller copies all tokens into `ts`
+        after = self._tokens()
+        return [name for name in TRACKED_TOKENS if after[name] != before[name]]
+
+    def _notify(self, renewed):
+        log.info('Renewed %s' % ', '.join(renewed))
+        for callback in self._callbacks:
+            try:
+                callback(self.ts)
+            except Exception as e:
+                log.error('Token refresh callback failed: %s' % e)
+
+    def refresh(self, force=False):
+        """
+        Renew the tokens expiring within the margin.
+
+        Args:
+            force (bool): Refresh Access- and Refresh-Token even if still valid, like `do_refresh` of
+                :meth:`AuthenticationManager.authenticate`
+
+        Raises:
+            AuthenticationException: When a token can not be renewed
+
+        Returns:
+            list: Names of the renewed tokens, e.g. ['user_token', 'xsts_token']
+        """
+        with self._lock:
+            before = self._tokens()
+            self.auth_mgr.authenticate(ts=self.ts, do_refresh=force, min_validity=self.margin)
+            renewed = self._renewed(before)
+            if renewed:
+                self._notify(renewed)
+            return renewed
+
+    def start(self):
+        """Start the background thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='xbox-token-refresher')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stop the background thread, a running refresh is finished first"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            delay = self._seconds_until_refresh()
+            if delay > 0:
+                self._stop.wait(min(delay, self.MAX_SLEEP))
+                continue
+
+            try:
+                self.refresh()
+                self.last_error = None
+                delay = self.MIN_INTERVAL
+            except Exception as e:
+                log.error('Token refresh failed, retry in %.0fs: %s' % (self.RETRY_INTERVAL, e))
+                self.last_error = e
+                delay = self.RETRY_INTERVAL
+            self._stop.wait(delay)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+class AsyncTokenRefresher(TokenRefresher):
+    def __init__(self, auth_mgr, ts, margin=timedelta(minutes=5), callback=None):
+        """
+        Renew tokens in a background task before they expire, see :class:`TokenRefresher`.
+
+        Args:
+            auth_mgr (AsyncAuthenticationManager): Authentication manager to renew tokens with
+            ts (Tokenstore): Tokens to keep fresh, typically the result of `auth_mgr.authenticate`
+            margin (timedelta): Renew tokens this long before they expire
+            callback (callable): Called with `ts` after tokens were renewed
+        """
+        super(AsyncTokenRefresher, self).__init__(auth_mgr, ts, margin, callback)
+        self._async_lock = None
+        self._task = None
+
+    async def refresh(self, force=False):
+        """
+        Renew the tokens expiring within the margin.
+
+        Args:
+            force (bool): Refresh Access- and Refresh-Token even if still valid
+
+        Raises:
+            AuthenticationException: When a token can not be renewed
+
+        Returns:
+            list: Names of the renewed tokens
+        """
+        if self._async_lock is None:
+            self._async_lock = asyncio.Lock()
+
+        async with self._async_lock:
+            before = self._tokens()
+            await self.auth_mgr.authenticate(ts=self.ts, do_refresh=force, min_validity=self.margin)
+            renewed = self._renewed(before)
+            if renewed:
+                self._notify(renewed)
+            return renewed
+
+    def start(self):
+        """Start the background task on the running event loop"""
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        """Cancel the background task"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            delay = self._seconds_until_refresh()
+            if delay > 0:
+                await asyncio.sleep(min(delay, self.MAX_SLEEP))
+                continue
+
+            try:
+                await self.refresh()
+                self.last_error = None
+                delay = self.MIN_INTERVAL
+            except Exception as e:
+                log.error('Token refresh failed, retry in %.0fs: %s' % (self.RETRY_INTERVAL, e))
+                self.last_error = e
+                delay = self.RETRY_INTERVAL
+            await asyncio.sleep(delay)
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
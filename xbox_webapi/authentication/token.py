@@ -3,6 +3,8 @@ from dateutil.parser import parse
 from dateutil.tz import tzutc
 from datetime import datetime, timedelta
 
+from xbox_webapi.authentication.claims import decode_claims, claim_datetime
+
 
 class Token(object):
     def __init__(self, token, date_issued, date_valid):
@@ -34,7 +36,11 @@ class Token(object):
         Assemble a :class:`Token` object from a dict, for example from json config file.
 
         Args:
-            node (dict): Token as `dict` object. Mandatory fields: 'token', 'date_issued', 'date_valid'
+            node (dict): Token as `dict` object. Mandatory fields: 'name', 'token'. Without 'date_issued' and
+                'date_valid' they are read from the token claims, see :meth:`from_jwt`
+
+        Raises:
+            ValueError: On unknown token names, or missing dates that are not readable from the token either
 
         Returns:
             Token: Instance of :class:`Token`
@@ -55,10 +61,47 @@ class Token(object):
             raise ValueError('Invalid token type')
 
         token_cls = token_classes[name]
+        if not node.get('date_valid'):
+            # Bare token, e.g. copied from another client
+            return token_cls.from_jwt(node['token'])
         instance = token_cls.__new__(token_cls)
         super(token_cls, instance).__init__(node['token'], node['date_issued'], node['date_valid'])
         return instance
 
+    @classmethod
+    def from_jwt(cls, token):
+        """
+        Assemble a token from its JWT alone, issue and expiry date are read from its 'iat' and 'exp' claims.
+
+        Args:
+            token (str): The JWT Token
+
+        Raises:
+            ValueError: If the token has no readable claims or no expiry claim (e.g. encrypted tokens)
+
+        Returns:
+            Token: Instance of `cls`
+        """
+        claims = decode_claims(token)
+        date_valid = claim_datetime(claims, 'exp')
+        if date_valid is None:
+            raise ValueError('Token has no readable expiry claim')
+        date_issued = claim_datetime(claims, 'iat') or claim_datetime(claims, 'nbf') or datetime.now(tzutc())
+
+        instance = cls.__new__(cls)
+        Token.__init__(instance, token, date_issued, date_valid)
+        return instance
+
+    @property
+    def claims(self):
+        """
+        Claims of the token, decoded locally without verifying the signature.
+
+        Returns:
+            dict: Claims, `None` if the token is encrypted or opaque
+        """
+        return decode_claims(self.token)
+
     def to_dict(self):
         """
         Convert the `Token`-object to a `dict`-object, to use it in json-file for example.
@@ -82,6 +125,18 @@ class Token(object):
 
         """
         return self.date_valid > datetime.now(tzutc())
+
+    def is_valid_for(self, margin):
+        """
+        Check if token stays valid for a while.
+
+        Args:
+            margin (timedelta): Time the token has to stay valid
+
+        Returns:
+            bool: True if the token is valid for at least `margin`, False otherwise
+        """
+        return self.date_valid - margin > datetime.now(tzutc())
     
     def __str__(self):
         return self.token
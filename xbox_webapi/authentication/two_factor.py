@@ -1,6 +1,7 @@
 import struct
 import logging
 import time
+import asyncio
 
 from xbox_webapi.common.enum import Enum
 from xbox_webapi.common.exceptions import AuthenticationException
@@ -35,6 +36,9 @@ class TwoFactorAuthMethods(Enum):
 
 
 class TwoFactorAuthentication(object):
+    POLL_TIMEOUT = 120.0
+    POLL_INTERVAL = 1.0
+
     def __init__(self, session):
         """
         Handle Windows Live Two-Factor-Authentication (2FA).
@@ -76,10 +80,10 @@ class TwoFactorAuthentication(object):
         GIF_HEADER = b'GIF87a'
 
         if len(gif) < 35:
-            log.error('Got GIF image smaller than expected! Got %d instead of min. %d' % len(gif), 35)
+            log.error('Got GIF image smaller than expected! Got %d instead of min. %d' % (len(gif), 35))
             return AuthSessionState.ERROR
         elif gif[:GIF_HEADER_SIZE] != GIF_HEADER:
-            log.error('Returned image does not look like GIF -> Header: %b' % gif[:GIF_HEADER_SIZE])
+            log.error('Returned image does not look like GIF -> Header: %r' % gif[:GIF_HEADER_SIZE])
             return AuthSessionState.ERROR
 
         width, height = struct.unpack('<HH', gif[GIF_HEADER_SIZE:10])
@@ -209,7 +213,7 @@ class TwoFactorAuthentication(object):
         Returns:
             AuthSessionState: Current Session State
         """
-        max_time_seconds = 120.0
+        max_time_seconds = self.POLL_TIMEOUT
         time_now = time.time()
         time_end = time_now + max_time_seconds
 
@@ -220,7 +224,7 @@ class TwoFactorAuthentication(object):
         while time_now < time_end:
             gif = self.session.get(polling_url, params=params).content
             session_state = self.verify_authenticator_v2_gif(gif)
-            time.sleep(1)
+            time.sleep(self.POLL_INTERVAL)
             time_now = time.time()
             if session_state != AuthSessionState.PENDING:
                 break
@@ -245,6 +249,45 @@ class TwoFactorAuthentication(object):
             requests.Response: Instance of :class:`requests.Response`. Access / Refresh Tokens are contained in the
             Location-Header!
         """
+        auth_variant = self._prompt_auth_variant(server_data)
+        if not auth_variant:
+            return
+
+        auth_type, auth_data, auth_display = auth_variant
+        proof = self._prompt_proof(auth_type, auth_display)
+        slk = None
+        otc = None
+
+        if TwoFactorAuthMethods.TOTPAuthenticator != auth_type:
+            #TOTPAuthenticator V1 works without requesting anything
+            req_response = self.request_otc(email, server_data, auth_type, proof, auth_data)
+
+        if TwoFactorAuthMethods.TOTPAuthenticatorV2 == auth_type:
+            slk = req_response.json().get('SessionLookupKey')
+            if not slk:
+                log.error('Did not receive SessionLookupKey from Authenticator V2 request!')
+                return
+            session_state = self.poll_session_state(server_data, slk)
+            if session_state != AuthSessionState.APPROVED:
+                log.error('Request was not authenticated by Authenticator V2 App!')
+                return
+            # Do not send auth_data when submitting OTC
+            auth_data = None
+        else:
+            otc = self._prompt_otc()
+
+        return self.finish_auth(email, server_data, auth_type, auth_data, otc, slk, proof)
+
+    def _prompt_auth_variant(self, server_data):
+        """
+        Let the user choose one of the offered 2FA methods via stdin.
+
+        Args:
+            server_data (dict): Parsed javascript-object `serverData`, obtained from Windows Live Auth Request
+
+        Returns:
+            tuple: (auth_type, auth_data, auth_display) of the chosen method, `None` on invalid choice
+        """
         auth_variants = server_data.get('D', [])
         if not len(auth_variants):
             log.error('No TwoFactor Auth Methods available?! That\'s weird!')
@@ -268,32 +311,109 @@ class TwoFactorAuthentication(object):
             log.error('Invalid auth-method index chosen!')
             return
 
-        proof = None
-        slk = None
-        otc = None
+        return auth_type, auth_data, auth_display
 
+    def _prompt_proof(self, auth_type, auth_display):
+        """Ask the user to confirm phone number / email address via stdin, if the auth method requires it"""
         if TwoFactorAuthMethods.SMS == auth_type or \
             TwoFactorAuthMethods.Voice == auth_type:
-            proof = input("Enter last four digits of following phone number '{}': ".format(auth_display))
+            return input("Enter last four digits of following phone number '{}': ".format(auth_display))
         elif TwoFactorAuthMethods.Email == auth_type:
-            proof = input("Enter the full mail address '{}': ".format(auth_display))
+            return input("Enter the full mail address '{}': ".format(auth_display))
+
+    def _prompt_otc(self):
+        """Ask the user for the received One-Time-Code via stdin"""
+        return int(input("Input received OTC: "))
+
+
+class AsyncTwoFactorAuthentication(TwoFactorAuthentication):
+    def __init__(self, session):
+        """
+        Handle Windows Live Two-Factor-Authentication (2FA) via asyncio.
+
+        `request_otc`, `finish_auth`, `poll_session_state` and `authenticate` are coroutines. Polling the
+        MS Authenticator v2 does not block the event loop and stops as soon as its task gets cancelled.
+        User-input via stdin is read in the default executor.
+
+        Args:
+            session (AsyncSession): Instance of :class:`xbox_webapi.api.session.AsyncSession`
+        """
+        super(AsyncTwoFactorAuthentication, self).__init__(session)
+
+    async def poll_session_state(self, server_data, slk):
+        """
+        Poll MS Authenticator v2 SessionState.
+
+        Polling happens for maximum of `POLL_TIMEOUT` seconds if Authorization is not approved by the Authenticator
+        App. It will return earlier if request gets approved/rejected.
+
+        Args:
+            server_data (dict): Parsed javascript-object `serverData`, obtained from Windows Live Auth Request
+            slk (str): Session-Lookup-Key
+
+        Raises:
+            asyncio.CancelledError: When the polling task gets cancelled
+
+        Returns:
+            AuthSessionState: Current Session State
+        """
+        loop = asyncio.get_event_loop()
+        time_end = loop.time() + self.POLL_TIMEOUT
+        session_state = AuthSessionState.ERROR
+
+        polling_url = server_data.get('Ac')
+        params = {'slk': slk}
+        log.info('Polling Authenticator v2 Verification for {} seconds'.format(self.POLL_TIMEOUT))
+
+        while loop.time() < time_end:
+            resp = await self.session.get(polling_url, params=params)
+            session_state = self.verify_authenticator_v2_gif(resp.content)
+            if session_state != AuthSessionState.PENDING:
+                break
+            await asyncio.sleep(self.POLL_INTERVAL)
+
+        return session_state
+
+    async def authenticate(self, email, server_data):
+        """
+        Perform chain of Two-Factor-Authentication (2FA) with the Windows Live Server.
+
+        NOTE: This method prompts the user for text-input via stdin!
+
+        Args:
+            email (str): Email Address of the Windows Live Account
+            server_data (dict): Parsed javascript-object `serverData`, obtained from Windows Live Auth Request
+
+        Returns:
+            requests.Response: Instance of :class:`requests.Response`. Access / Refresh Tokens are contained in the
+            Location-Header!
+        """
+        loop = asyncio.get_event_loop()
+        auth_variant = await loop.run_in_executor(None, self._prompt_auth_variant, server_data)
+        if not auth_variant:
+            return
+
+        auth_type, auth_data, auth_display = auth_variant
+        proof = await loop.run_in_executor(None, self._prompt_proof, auth_type, auth_display)
+        slk = None
+        otc = None
 
         if TwoFactorAuthMethods.TOTPAuthenticator != auth_type:
             #TOTPAuthenticator V1 works without requesting anything
-            req_response = self.request_otc(email, server_data, auth_type, proof, auth_data)
+            req_response = await self.request_otc(email, server_data, auth_type, proof, auth_data)
 
         if TwoFactorAuthMethods.TOTPAuthenticatorV2 == auth_type:
             slk = req_response.json().get('SessionLookupKey')
             if not slk:
                 log.error('Did not receive SessionLookupKey from Authenticator V2 request!')
                 return
-            session_state = self.poll_session_state(server_data, slk)
+            session_state = await self.poll_session_state(server_data, slk)
             if session_state != AuthSessionState.APPROVED:
                 log.error('Request was not authenticated by Authenticator V2 App!')
                 return
             # Do not send auth_data when submitting OTC
             auth_data = None
         else:
-            otc = int(input("Input received OTC: "))
+            otc = await loop.run_in_executor(None, self._prompt_otc)
 
-        return self.finish_auth(email, server_data, auth_type, auth_data, otc, slk, proof)
+        return await self.finish_auth(email, server_data, auth_type, auth_data, otc, slk, proof)
@@ -25,3 +25,18 @@ class InvalidRequest(XboxException):
 class NotFoundException(XboxException):
     """Any exception raised due to a resource being missing will subclass this"""
     pass
+
+
+class CircuitOpenException(XboxException):
+    def __init__(self, base_url, retry_in):
+        """
+        Raised when requests to a host are rejected locally because its circuit breaker is open
+
+        Args:
+            base_url (str): Base URL of the failing host
+            retry_in (float): Seconds until the next trial request is let through
+        """
+        super(CircuitOpenException, self).__init__(
+            "Circuit breaker for %s is open, retry in %.1fs" % (base_url, retry_in))
+        self.base_url = base_url
+        self.retry_in = retry_in
@@ -13,6 +13,20 @@ class XboxLiveUserInfo(object):
         """Fill class via JSON node"""
         return cls(node['xid'], node['uhs'], node['gtg'], node['agg'], node['prv'], node['usr'])
 
+    @classmethod
+    def from_claims(cls, claims):
+        """
+        Fill class via the 'xui' display claims of a locally decoded token, see :attr:`Token.claims`
+
+        Returns `None` if the claims carry no xuid and userhash.
+        """
+        claims = claims or {}
+        xui = (claims.get('DisplayClaims') or {}).get('xui') or claims.get('xui')
+        node = xui[0] if isinstance(xui, list) and xui and isinstance(xui[0], dict) else {}
+        if 'xid' not in node or 'uhs' not in node:
+            return None
+        return cls(node['xid'], node['uhs'], node.get('gtg'), node.get('agg'), node.get('prv'), node.get('usr'))
+
     def to_dict(self):
         """Return userinfo as dict"""
         return {